@@ -5,10 +5,25 @@
 # from django.contrib import admin
 # from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils.translation import ugettext_lazy as _
+
+from manifest.exporters import UserExporter
 
 
 class UserAdmin(BaseUserAdmin):
-    pass
+    actions = ["export_csv", "export_ndjson"]
+
+    def export_csv(self, request, queryset):
+        return UserExporter(queryset.order_by("pk")).get_response()
+
+    export_csv.short_description = _("Export selected users as CSV")
+
+    def export_ndjson(self, request, queryset):
+        return UserExporter(
+            queryset.order_by("pk"), export_format="ndjson"
+        ).get_response()
+
+    export_ndjson.short_description = _("Export selected users as NDJSON")
 
 
 # admin.site.unregister(get_user_model())
@@ -24,10 +24,17 @@ from rest_framework.generics import (
 from rest_framework.parsers import FormParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from manifest import defaults, messages, serializers
-from manifest.mixins import EmailChangeMixin, SendActivationMailMixin
+from manifest import defaults, messages, metrics, serializers
+from manifest.mixins import (
+    EmailChangeMixin,
+    SendActivationMailMixin,
+    SparseFieldsetViewMixin,
+    ValuesQuerysetMixin,
+)
+from manifest.pagination import EstimatedCountPagination, KeysetPagination
 from manifest.signals import REGISTRATION_COMPLETE
 from manifest.utils import jwt_encode
 
@@ -137,6 +144,7 @@ class AuthRegisterAPIView(CreateAPIView, SendActivationMailMixin):
             )
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
+        metrics.REGISTRATIONS.inc()
         REGISTRATION_COMPLETE.send(
             sender=None, user=user, request=self.request
         )
@@ -175,6 +183,34 @@ class AuthActivateAPIView(GenericAPIView):
         return Response({"detail": self.success_message})
 
 
+class AuthActivateResendAPIView(GenericAPIView, SendActivationMailMixin):
+    """Resend the activation email of a pending account.
+
+    Accepts the following POST parameters: email
+    Returns the success message whether an account is found or not.
+    Repeated requests for the same email address in
+    ``MANIFEST_ACTIVATION_RESEND_COOLDOWN`` seconds send a single email.
+    """
+
+    serializer_class = serializers.ActivateResendSerializer
+    permission_classes = (AllowAny,)
+    success_message = messages.AUTH_ACTIVATE_RESEND_SUCCESS
+    email_subject_template_name = (
+        "manifest/emails/activation_email_subject.txt"
+    )
+    email_message_template_name = (
+        "manifest/emails/activation_email_message_api.txt"
+    )
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.resend_activation_mail(serializer.validated_data["email"])
+        return Response(
+            {"detail": self.success_message}, status=status.HTTP_200_OK
+        )
+
+
 class PasswordResetAPIView(GenericAPIView):
     """Calls Django Auth PasswordResetForm save method.
 
@@ -379,7 +415,10 @@ class PasswordChangeAPIView(GenericAPIView):
         return Response({"detail": self.success_message})
 
 
-class UserListAPIView(ListAPIView):
+# pylint: disable=bad-continuation
+class UserListAPIView(
+    ValuesQuerysetMixin, SparseFieldsetViewMixin, ListAPIView
+):
     """Lists active user profiles, accepts ``GET``.
 
     List view that lists active user profiles
@@ -391,6 +430,22 @@ class UserListAPIView(ListAPIView):
     permission_classes = (AllowAny,)
     queryset = get_user_model().objects.get_visible_profiles()
 
+    @property
+    def pagination_class(self):
+        """
+        Uses :class:`KeysetPagination
+        <manifest.pagination.KeysetPagination>` if
+        ``MANIFEST_CURSOR_PAGINATION`` setting is ``True``, or
+        :class:`EstimatedCountPagination
+        <manifest.pagination.EstimatedCountPagination>` if
+        ``MANIFEST_ESTIMATED_COUNT`` setting is ``True``.
+        """
+        if defaults.MANIFEST_CURSOR_PAGINATION:
+            return KeysetPagination
+        if defaults.MANIFEST_ESTIMATED_COUNT:
+            return EstimatedCountPagination
+        return api_settings.DEFAULT_PAGINATION_CLASS
+
     def get(self, request, *args, **kwargs):
         # pylint: disable=bad-continuation
         if (
@@ -401,7 +456,7 @@ class UserListAPIView(ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class UserDetailAPIView(RetrieveAPIView):
+class UserDetailAPIView(SparseFieldsetViewMixin, RetrieveAPIView):
     """Reads an active user profile by username, accepts ``GET``.
 
     Detail view that reads an active user profile by username,
@@ -6,6 +6,10 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
 from django.core import validators
 
+from manifest import metrics
+from manifest.hashers import check_legacy_password
+from manifest.queries import operation
+
 
 class AuthenticationBackend(ModelBackend):
     """
@@ -15,6 +19,7 @@ class AuthenticationBackend(ModelBackend):
     """
 
     # pylint: disable=arguments-differ,bad-continuation
+    @operation("authenticate")
     def authenticate(
         self, request, identification, password=None, check_password=True
     ):
@@ -32,6 +37,10 @@ class AuthenticationBackend(ModelBackend):
             without password if ``False``. This is only used for authenticate
             the user when visiting specific pages with a secret token.
 
+        Passwords imported with a hash of a legacy hasher, see
+        ``MANIFEST_LEGACY_HASHERS``, are checked by that hasher and upgraded
+        to the preferred hasher on a successful login.
+
         :return: The logged in :class:`User`.
 
         """
@@ -41,14 +50,25 @@ class AuthenticationBackend(ModelBackend):
             try:
                 user = user_model.objects.get(email__iexact=identification)
             except user_model.DoesNotExist:
+                metrics.LOGINS.inc(outcome="unknown_user")
                 return None
         except validators.ValidationError:
             try:
                 user = user_model.objects.get(username__iexact=identification)
             except user_model.DoesNotExist:
+                metrics.LOGINS.inc(outcome="unknown_user")
                 return None
-        if check_password and user.check_password(password):
+        if not check_password:
+            return None
+        if user.check_password(password):
+            metrics.LOGINS.inc(outcome="success")
+            return user
+        if check_legacy_password(password, user.password):
+            user.set_password(password)
+            user.save(update_fields=["password"])
+            metrics.LOGINS.inc(outcome="upgraded")
             return user
+        metrics.LOGINS.inc(outcome="invalid_password")
         return None
 
     def get_user(self, user_id):
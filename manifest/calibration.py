@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+""" Manifest Password Hasher Calibration
+"""
+
+import itertools
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from manifest.backends import AuthenticationBackend
+
+# Cost parameters of the hashers by algorithm, as tuples of the setting
+# of the manifest hasher, the attribute of the hasher and the values
+# measured in increasing cost.
+COST_PARAMETERS = {
+    "pbkdf2_sha256": (
+        (
+            "MANIFEST_PBKDF2_ITERATIONS",
+            "iterations",
+            (100000, 180000, 260000, 390000, 600000, 1000000),
+        ),
+    ),
+    "argon2": (
+        ("MANIFEST_ARGON2_TIME_COST", "time_cost", (1, 2, 3, 4, 6)),
+        (
+            "MANIFEST_ARGON2_MEMORY_COST",
+            "memory_cost",
+            (512, 19456, 47104, 65536, 102400),
+        ),
+    ),
+    "bcrypt_sha256": (
+        ("MANIFEST_BCRYPT_ROUNDS", "rounds", (10, 11, 12, 13, 14, 15)),
+    ),
+}
+
+# Hashers which read the settings of ``COST_PARAMETERS``.
+MANIFEST_HASHERS = {
+    "pbkdf2_sha256": "manifest.hashers.PBKDF2PasswordHasher",
+    "argon2": "manifest.hashers.Argon2PasswordHasher",
+    "bcrypt_sha256": "manifest.hashers.BCryptSHA256PasswordHasher",
+}
+
+PASSWORD = "correct horse battery staple"
+
+
+class Rollback(Exception):
+    pass
+
+
+def time_call(func, number):
+    """
+    Returns the median of the seconds taken by ``number`` calls of
+    ``func``.
+
+    """
+    timings = []
+    for _index in range(number):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def time_hasher(hasher, number):
+    """
+    Returns the median of the seconds taken to hash a password with
+    ``hasher``.
+
+    :raises ValueError: If the library of the hasher is not installed.
+
+    """
+    salt = hasher.salt()
+    return time_call(lambda: hasher.encode(PASSWORD, salt), number)
+
+
+def calibrate_hasher(hasher, target, number=3):
+    """
+    Measures ``hasher`` with the values of its cost parameters and
+    returns a list of ``(settings, seconds)`` tuples, where ``settings`` is
+    a dict of the ``MANIFEST_*`` settings.
+
+    Values are measured in increasing cost and combinations which cost at
+    least as much as a combination which exceeded ``target`` seconds are
+    skipped. Hashers without cost parameters are measured as they are.
+
+    :raises ValueError: If the library of the hasher is not installed.
+
+    """
+    parameters = COST_PARAMETERS.get(hasher.algorithm)
+    if not parameters:
+        return [({}, time_hasher(hasher, number))]
+    results, exceeded = [], []
+    for values in itertools.product(*(values for *_, values in parameters)):
+        if any(
+            all(value >= limit for value, limit in zip(values, limits))
+            for limits in exceeded
+        ):
+            continue
+        # Class attributes override the properties of manifest hashers.
+        calibrated = type(
+            hasher.__class__.__name__,
+            (hasher.__class__,),
+            {
+                attribute: value
+                for (_setting, attribute, _values), value in zip(
+                    parameters, values
+                )
+            },
+        )()
+        seconds = time_hasher(calibrated, number)
+        results.append(
+            (
+                {
+                    setting: value
+                    for (setting, _attribute, _values), value in zip(
+                        parameters, values
+                    )
+                },
+                seconds,
+            )
+        )
+        if seconds > target:
+            exceeded.append(values)
+    return results
+
+
+def recommend(results, target):
+    """
+    Returns the settings of ``results`` with the highest cost within
+    ``target`` seconds, or the cheapest settings if none of them are.
+
+    """
+    within = [result for result in results if result[1] <= target]
+    if within:
+        return max(within, key=lambda result: result[1])
+    return min(results, key=lambda result: result[1])
+
+
+def time_user_operations(number=3):
+    """
+    Returns the median of the seconds taken by ``create_user`` and by
+    authenticating with :class:`AuthenticationBackend
+    <manifest.backends.AuthenticationBackend>`, using the preferred hasher.
+
+    Users are created in a transaction which is rolled back.
+
+    """
+    user_model = get_user_model()
+    backend = AuthenticationBackend()
+    timings = {}
+    counter = itertools.count()
+
+    def create_user():
+        user_model.objects.create_user(
+            "calibration%d" % next(counter),
+            "calibration@example.com",
+            PASSWORD,
+            active=True,
+        )
+
+    try:
+        with transaction.atomic(using=user_model.objects.db):
+            timings["create_user"] = time_call(create_user, number)
+            timings["authenticate"] = time_call(
+                lambda: backend.authenticate(
+                    None, identification="calibration0", password=PASSWORD
+                ),
+                number,
+            )
+            raise Rollback
+    except Rollback:
+        pass
+    return timings
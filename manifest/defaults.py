@@ -15,6 +15,18 @@ MANIFEST_ACTIVATION_REQUIRED = getattr(
     settings, "MANIFEST_ACTIVATION_REQUIRED", True
 )
 
+MANIFEST_ACTIVATION_RESEND_COOLDOWN = getattr(
+    settings, "MANIFEST_ACTIVATION_RESEND_COOLDOWN", 300
+)
+
+MANIFEST_ARGON2_MEMORY_COST = getattr(
+    settings, "MANIFEST_ARGON2_MEMORY_COST", None
+)
+
+MANIFEST_ARGON2_TIME_COST = getattr(
+    settings, "MANIFEST_ARGON2_TIME_COST", None
+)
+
 MANIFEST_AVATAR_DEFAULT = getattr(
     settings, "MANIFEST_GRAVATAR_DEFAULT", "gravatar"
 )
@@ -22,10 +34,47 @@ MANIFEST_AVATAR_DEFAULT = getattr(
 MANIFEST_AVATAR_SIZE = getattr(settings, "MANIFEST_AVATAR_SIZE", 128)
 
 
+MANIFEST_BCRYPT_ROUNDS = getattr(settings, "MANIFEST_BCRYPT_ROUNDS", None)
+
+MANIFEST_COUNT_CACHE_TIMEOUT = getattr(
+    settings, "MANIFEST_COUNT_CACHE_TIMEOUT", 300
+)
+
+MANIFEST_CURSOR_PAGINATION = getattr(
+    settings, "MANIFEST_CURSOR_PAGINATION", False
+)
+
 MANIFEST_DISABLE_PROFILE_LIST = getattr(
     settings, "MANIFEST_DISABLE_PROFILE_LIST", False
 )
 
+MANIFEST_EMAIL_CONFIRMATION_DAYS = getattr(
+    settings, "MANIFEST_EMAIL_CONFIRMATION_DAYS", 7
+)
+
+MANIFEST_EMAIL_OUTBOX = getattr(settings, "MANIFEST_EMAIL_OUTBOX", False)
+
+MANIFEST_ESTIMATED_COUNT = getattr(settings, "MANIFEST_ESTIMATED_COUNT", False)
+
+MANIFEST_EXPORT_CHUNK_SIZE = getattr(
+    settings, "MANIFEST_EXPORT_CHUNK_SIZE", 2000
+)
+
+MANIFEST_EXPORT_FIELDS = getattr(
+    settings,
+    "MANIFEST_EXPORT_FIELDS",
+    (
+        "id",
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "is_active",
+        "date_joined",
+        "last_login",
+    ),
+)
+
 MANIFEST_FORBIDDEN_USERNAMES = getattr(
     settings,
     "MANIFEST_FORBIDDEN_USERNAMES",
@@ -55,6 +104,16 @@ MANIFEST_GRAVATAR_DEFAULT = getattr(
 
 MANIFEST_LANGUAGE_CODE = getattr(settings, "LANGUAGE_CODE", "en-us")
 
+MANIFEST_LEGACY_HASHERS = getattr(
+    settings,
+    "MANIFEST_LEGACY_HASHERS",
+    (
+        "manifest.hashers.MD5CryptPasswordHasher",
+        "django.contrib.auth.hashers.BCryptPasswordHasher",
+        "django.contrib.auth.hashers.SHA1PasswordHasher",
+    ),
+)
+
 MANIFEST_LOCALE_FIELD = getattr(settings, "MANIFEST_LOCALE_FIELD", "locale")
 
 MANIFEST_LOGIN_REDIRECT_URL = getattr(
@@ -63,6 +122,38 @@ MANIFEST_LOGIN_REDIRECT_URL = getattr(
 
 MANIFEST_LOGOUT_ON_GET = getattr(settings, "MANIFEST_LOGOUT_ON_GET", False)
 
+MANIFEST_METRICS_DIR = getattr(settings, "MANIFEST_METRICS_DIR", None)
+
+MANIFEST_METRICS_FLUSH_INTERVAL = getattr(
+    settings, "MANIFEST_METRICS_FLUSH_INTERVAL", 10
+)
+
+MANIFEST_METRICS_VIEW = getattr(settings, "MANIFEST_METRICS_VIEW", False)
+
+MANIFEST_OUTBOX_BATCH_SIZE = getattr(
+    settings, "MANIFEST_OUTBOX_BATCH_SIZE", 100
+)
+
+MANIFEST_OUTBOX_EMAIL_BACKEND = getattr(
+    settings, "MANIFEST_OUTBOX_EMAIL_BACKEND", None
+)
+
+MANIFEST_OUTBOX_LEASE_TIME = getattr(
+    settings, "MANIFEST_OUTBOX_LEASE_TIME", 300
+)
+
+MANIFEST_OUTBOX_MAX_ATTEMPTS = getattr(
+    settings, "MANIFEST_OUTBOX_MAX_ATTEMPTS", 5
+)
+
+MANIFEST_OUTBOX_RETRY_DELAY = getattr(
+    settings, "MANIFEST_OUTBOX_RETRY_DELAY", 60
+)
+
+MANIFEST_PBKDF2_ITERATIONS = getattr(
+    settings, "MANIFEST_PBKDF2_ITERATIONS", None
+)
+
 MANIFEST_PICTURE_FORMATS = getattr(
     settings, "MANIFEST_PICTURE_FORMATS", ["jpeg", "gif", "png"]
 )
@@ -77,6 +168,24 @@ MANIFEST_PICTURE_MAX_SIZE = getattr(
 
 MANIFEST_PICTURE_PATH = getattr(settings, "MANIFEST_PICTURE_PATH", "manifest")
 
+MANIFEST_PICTURE_STORAGE = getattr(settings, "MANIFEST_PICTURE_STORAGE", None)
+
+
+MANIFEST_PROFILE_DIR = getattr(settings, "MANIFEST_PROFILE_DIR", None)
+
+MANIFEST_PROFILE_MAX_FILES = getattr(
+    settings, "MANIFEST_PROFILE_MAX_FILES", 100
+)
+
+MANIFEST_PROFILE_MODE = getattr(settings, "MANIFEST_PROFILE_MODE", "cpu")
+
+MANIFEST_PROFILE_SAMPLE_RATE = getattr(
+    settings, "MANIFEST_PROFILE_SAMPLE_RATE", 0
+)
+
+MANIFEST_QUERY_COUNT_LIMIT = getattr(
+    settings, "MANIFEST_QUERY_COUNT_LIMIT", 50
+)
 
 MANIFEST_REDIRECT_ON_LOGOUT = getattr(
     settings, "MANIFEST_REDIRECT_ON_LOGOUT", "/"
@@ -86,10 +195,42 @@ MANIFEST_REMEMBER_DAYS = getattr(
     settings, "ACCOUNTS_REMEMBER_ME_DAYS", (("a month"), 30)
 )
 
+MANIFEST_SERVER_TIMING_HEADER = getattr(
+    settings, "MANIFEST_SERVER_TIMING_HEADER", True
+)
+
 MANIFEST_SESSION_LOGIN = getattr(settings, "MANIFEST_SESSION_LOGIN", True)
 
+MANIFEST_SIGNED_TOKENS = getattr(settings, "MANIFEST_SIGNED_TOKENS", False)
+
+MANIFEST_SLOW_QUERY_EXPLAIN = getattr(
+    settings, "MANIFEST_SLOW_QUERY_EXPLAIN", False
+)
+
+MANIFEST_SLOW_QUERY_MS = getattr(settings, "MANIFEST_SLOW_QUERY_MS", 100)
+
+MANIFEST_SMTP_MAX_MESSAGES = getattr(
+    settings, "MANIFEST_SMTP_MAX_MESSAGES", 100
+)
+
+MANIFEST_SMTP_POOL_IDLE_TIME = getattr(
+    settings, "MANIFEST_SMTP_POOL_IDLE_TIME", 60
+)
+
+MANIFEST_SMTP_POOL_SIZE = getattr(settings, "MANIFEST_SMTP_POOL_SIZE", 4)
+
+MANIFEST_STORAGE_CACHE_DIR = getattr(
+    settings, "MANIFEST_STORAGE_CACHE_DIR", None
+)
+
+MANIFEST_STORAGE_CACHE_SIZE = getattr(
+    settings, "MANIFEST_STORAGE_CACHE_SIZE", 64 * 1024 * 1024
+)
+
 MANIFEST_TIME_ZONE = getattr(settings, "TIME_ZONE", "Europe/Istanbul")
 
 MANIFEST_USE_HTTPS = getattr(settings, "MANIFEST_USE_HTTPS", False)
 
 MANIFEST_USE_MESSAGES = getattr(settings, "MANIFEST_USE_MESSAGES", True)
+
+MANIFEST_USE_TOKEN_TABLE = getattr(settings, "MANIFEST_USE_TOKEN_TABLE", False)
@@ -28,6 +28,10 @@ urlpatterns = [
         api_views.AuthActivateAPIView.as_view(),
         name='auth_activate_api'),
 
+    url(r'^activate/resend/$',
+        api_views.AuthActivateResendAPIView.as_view(),
+        name='auth_activate_resend_api'),
+
     # Reset password
     url(r'^password/reset/$',
         api_views.PasswordResetAPIView.as_view(),
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+""" Manifest User Exporters
+"""
+
+import csv
+import datetime
+import zlib
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from manifest import defaults
+
+# Fields which are never exported.
+PRIVATE_FIELDS = ("password", "activation_key", "email_confirmation_key")
+
+
+class Echo:
+    """
+    File-like object which returns what is written, so ``csv.writer`` can
+    format a single row without buffering.
+
+    """
+
+    @staticmethod
+    def write(value):
+        return value
+
+
+class UserExporter:
+    """
+    Streams users of ``queryset`` as CSV or newline delimited JSON.
+
+    Rows are read as tuples with ``QuerySet.iterator()`` in chunks of
+    ``chunk_size`` and are written out as they are read, so the memory
+    used doesn't depend on the number of users.
+
+    :param queryset:
+        Users to export.
+
+    :param fields:
+        Names of the fields to export. Defaults to ``MANIFEST_EXPORT_FIELDS``.
+
+    :param export_format:
+        ``"csv"`` or ``"ndjson"``.
+
+    :param chunk_size:
+        Number of rows fetched from the database at once. Defaults to
+        ``MANIFEST_EXPORT_CHUNK_SIZE``.
+
+    :raises ValueError:
+        If the format or a field is not supported.
+
+    """
+
+    formats = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+    buffer_size = 64 * 1024
+
+    def __init__(
+        self, queryset, fields=None, export_format="csv", chunk_size=None
+    ):
+        if export_format not in self.formats:
+            raise ValueError("Unsupported format: %s" % export_format)
+        self.fields = list(fields or defaults.MANIFEST_EXPORT_FIELDS)
+        concrete_fields = {"pk"} | {
+            field.name for field in queryset.model._meta.concrete_fields
+        }
+        invalid = [
+            field
+            for field in self.fields
+            if field not in concrete_fields or field in PRIVATE_FIELDS
+        ]
+        if invalid:
+            raise ValueError("Unsupported fields: %s" % ", ".join(invalid))
+        self.queryset = queryset
+        self.export_format = export_format
+        self.chunk_size = chunk_size or defaults.MANIFEST_EXPORT_CHUNK_SIZE
+
+    @property
+    def content_type(self):
+        return self.formats[self.export_format]
+
+    def get_rows(self):
+        return self.queryset.values_list(*self.fields).iterator(
+            chunk_size=self.chunk_size
+        )
+
+    def get_csv_lines(self):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.fields)
+        for row in self.get_rows():
+            yield writer.writerow(
+                [
+                    value.isoformat()
+                    if isinstance(value, (datetime.date, datetime.time))
+                    else value
+                    for value in row
+                ]
+            )
+
+    def get_ndjson_lines(self):
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for row in self.get_rows():
+            yield encoder.encode(dict(zip(self.fields, row))) + "\n"
+
+    def iter_text(self):
+        """
+        Yields the export in text chunks of about ``buffer_size``
+        characters.
+
+        """
+        if self.export_format == "csv":
+            lines = self.get_csv_lines()
+        else:
+            lines = self.get_ndjson_lines()
+        buffer, size = [], 0
+        for line in lines:
+            buffer.append(line)
+            size += len(line)
+            if size >= self.buffer_size:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+
+    def iter_bytes(self, compress=False):
+        """
+        Yields the export encoded in UTF-8, and compressed with gzip if
+        ``compress`` is ``True``.
+
+        """
+        if not compress:
+            for text in self.iter_text():
+                yield text.encode("utf-8")
+            return
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        for text in self.iter_text():
+            data = compressor.compress(text.encode("utf-8"))
+            if data:
+                yield data
+        yield compressor.flush()
+
+    def get_response(self, filename="users", compress=False):
+        """
+        Returns a ``StreamingHttpResponse`` which downloads the export.
+
+        """
+        filename = "%s.%s" % (filename, self.export_format)
+        if compress:
+            filename += ".gz"
+            content_type = "application/gzip"
+        else:
+            content_type = "%s; charset=utf-8" % self.content_type
+        response = StreamingHttpResponse(
+            self.iter_bytes(compress), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            'attachment; filename="%s"' % filename
+        )
+        return response
+
+
+def parse_filters(filters, model=None):
+    """
+    Returns ``QuerySet.filter()`` keyword arguments from a list of
+    ``lookup=value`` strings.
+
+    Lookups must start with a concrete field of ``model``, which defaults
+    to the user model, and can't span relations, so the private fields of
+    the user and of the related models can't be filtered.
+
+    :raises ValueError:
+        If a filter has no ``=`` or it filters an unsupported field.
+
+    """
+    opts = (model or get_user_model())._meta
+    allowed = {"pk"} | {
+        field.name
+        for field in opts.concrete_fields
+        if not field.is_relation and field.name not in PRIVATE_FIELDS
+    }
+    kwargs = {}
+    for item in filters or ():
+        lookup, separator, value = item.partition("=")
+        if not separator or not lookup:
+            raise ValueError("Invalid filter: %s" % item)
+        if lookup.split("__")[0] not in allowed:
+            raise ValueError("Unsupported filter: %s" % item)
+        # Other values are converted by the model fields.
+        if lookup.endswith("__in"):
+            value = value.split(",")
+        elif lookup.endswith("__isnull"):
+            value = value.lower() in ("1", "t", "true")
+        kwargs[lookup] = value
+    return kwargs
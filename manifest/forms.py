@@ -6,13 +6,16 @@ from datetime import datetime
 
 from django import forms
 from django.contrib.auth import authenticate, get_user_model
-from django.contrib.auth.forms import UserCreationForm
-from django.db.models import Q
+from django.contrib.auth.forms import (
+    PasswordResetForm as BasePasswordResetForm,
+    UserCreationForm,
+)
 from django.forms.widgets import ClearableFileInput
 from django.utils.translation import ugettext_lazy as _
 
 from manifest import defaults
 from manifest.messages import EMAIL_IN_USE_MESSAGE
+from manifest.mixins import SendMailMixin
 from manifest.utils import validate_picture
 
 ATTRS_DICT = {"class": "required"}
@@ -155,11 +158,7 @@ class RegisterForm(UserCreationForm):
         Validate that the email address is unique.
 
         """
-        # pylint: disable=bad-continuation
-        if get_user_model().objects.filter(
-            Q(email__iexact=self.cleaned_data["email"])
-            | Q(email_unconfirmed__iexact=self.cleaned_data["email"])
-        ):
+        if get_user_model().objects.email_in_use(self.cleaned_data["email"]):
             raise forms.ValidationError(EMAIL_IN_USE_MESSAGE)
         return self.cleaned_data["email"]
 
@@ -193,6 +192,19 @@ class RegisterFormToS(RegisterForm):
     )
 
 
+class ActivateResendForm(forms.Form):
+    """
+    Form for requesting the activation email again.
+
+    """
+
+    email = forms.EmailField(
+        label=_("Email"),
+        required=True,
+        widget=forms.TextInput(attrs=dict(ATTRS_DICT, maxlength=75)),
+    )
+
+
 class EmailChangeForm(forms.Form):
     """
     Form for changing user email address.
@@ -246,6 +258,31 @@ class EmailChangeForm(forms.Form):
         return self.user.change_email(self.cleaned_data["email"])
 
 
+class PasswordResetForm(SendMailMixin, BasePasswordResetForm):
+    """
+    Django ``PasswordResetForm`` that sends emails through
+    :class:`SendMailMixin <manifest.mixins.SendMailMixin>`, so they are
+    written to the outbox if ``MANIFEST_EMAIL_OUTBOX`` setting is ``True``.
+
+    """
+
+    # pylint: disable=arguments-differ,bad-continuation,too-many-arguments
+    def send_mail(
+        self,
+        subject_template_name,
+        email_template_name,
+        context,
+        from_email,
+        to_email,
+        html_email_template_name=None,
+    ):
+        self.email_subject_template_name = subject_template_name
+        self.email_message_template_name = email_template_name
+        self.email_html_template_name = html_email_template_name
+        self.from_email = from_email
+        SendMailMixin.send_mail(self, to_email, context)
+
+
 class ProfileUpdateForm(forms.ModelForm):
     """ Base form used for fields that are always required """
 
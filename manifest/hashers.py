@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+""" Manifest Password Hashers
+"""
+
+import functools
+import hashlib
+from collections import OrderedDict
+
+from django.contrib.auth import hashers
+from django.contrib.auth.hashers import (
+    BasePasswordHasher,
+    get_hashers_by_algorithm,
+    mask_hash,
+)
+from django.utils.crypto import constant_time_compare, get_random_string
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_noop as _
+
+from manifest import defaults
+from manifest.timing import timed
+
+ITOA64 = "./0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+MD5_CRYPT_MAGIC = "$1$"
+
+
+def md5_crypt(password, salt):
+    """
+    Returns the MD5-crypt hash of ``password``, as in ``$1$salt$hash``
+    passwords of ``/etc/shadow``, Apache and older PHP applications.
+
+    """
+    password = password.encode("utf-8")
+    salt = salt[:8]
+    magic, salt_bytes = MD5_CRYPT_MAGIC.encode(), salt.encode("utf-8")
+
+    final = hashlib.md5(password + salt_bytes + password).digest()
+    context = password + magic + salt_bytes
+    for length in range(len(password), 0, -16):
+        context += final[: min(16, length)]
+    length = len(password)
+    while length:
+        context += b"\x00" if length & 1 else password[:1]
+        length >>= 1
+    final = hashlib.md5(context).digest()
+
+    for index in range(1000):
+        context = password if index & 1 else final
+        if index % 3:
+            context += salt_bytes
+        if index % 7:
+            context += password
+        context += final if index & 1 else password
+        final = hashlib.md5(context).digest()
+
+    def to64(value, count):
+        chars = []
+        for _index in range(count):
+            chars.append(ITOA64[value & 0x3F])
+            value >>= 6
+        return "".join(chars)
+
+    encoded = "".join(
+        to64(final[first] << 16 | final[second] << 8 | final[third], 4)
+        for first, second, third in (
+            (0, 6, 12),
+            (1, 7, 13),
+            (2, 8, 14),
+            (3, 9, 15),
+            (4, 10, 5),
+        )
+    )
+    encoded += to64(final[11], 2)
+    return "%s%s$%s" % (MD5_CRYPT_MAGIC, salt, encoded)
+
+
+class MD5CryptPasswordHasher(BasePasswordHasher):
+    """
+    Verifies MD5-crypt password hashes imported from other systems, stored
+    as ``md5_crypt$$1$<salt>$<hash>``.
+
+    MD5-crypt is not secure, it is only meant to verify imported passwords
+    until they are upgraded on the next login.
+
+    """
+
+    algorithm = "md5_crypt"
+
+    def salt(self):
+        return get_random_string(8)
+
+    def encode(self, password, salt):
+        assert password is not None
+        assert salt and "$" not in salt
+        return "%s$%s" % (self.algorithm, md5_crypt(password, salt))
+
+    def decode(self, encoded):
+        algorithm, crypted = encoded.split("$", 1)
+        assert algorithm == self.algorithm
+        _empty, _magic, salt, hash_ = crypted.split("$")
+        return salt, hash_
+
+    def verify(self, password, encoded):
+        salt, _hash = self.decode(encoded)
+        return constant_time_compare(encoded, self.encode(password, salt))
+
+    def safe_summary(self, encoded):
+        salt, hash_ = self.decode(encoded)
+        return OrderedDict(
+            [
+                (_("algorithm"), self.algorithm),
+                (_("salt"), mask_hash(salt, show=2)),
+                (_("hash"), mask_hash(hash_)),
+            ]
+        )
+
+    def harden_runtime(self, password, encoded):
+        pass
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2 hasher with ``MANIFEST_PBKDF2_ITERATIONS`` iterations, which
+    defaults to the iterations of Django.
+
+    Passwords are rehashed on the next login when the setting changes.
+
+    """
+
+    @property
+    def iterations(self):
+        return defaults.MANIFEST_PBKDF2_ITERATIONS or super().iterations
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Argon2 hasher with ``MANIFEST_ARGON2_TIME_COST`` and
+    ``MANIFEST_ARGON2_MEMORY_COST`` settings, which default to the costs
+    of Django.
+
+    """
+
+    @property
+    def time_cost(self):
+        return defaults.MANIFEST_ARGON2_TIME_COST or super().time_cost
+
+    @property
+    def memory_cost(self):
+        return defaults.MANIFEST_ARGON2_MEMORY_COST or super().memory_cost
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """
+    BCrypt hasher with ``MANIFEST_BCRYPT_ROUNDS`` rounds, which defaults
+    to the rounds of Django.
+
+    """
+
+    @property
+    def rounds(self):
+        return defaults.MANIFEST_BCRYPT_ROUNDS or super().rounds
+
+
+@functools.lru_cache()
+def load_hashers(paths):
+    hashers = OrderedDict()
+    for path in paths:
+        hasher = import_string(path)()
+        hashers[hasher.algorithm] = hasher
+    return hashers
+
+
+def get_legacy_hashers():
+    """
+    Returns the hashers of ``MANIFEST_LEGACY_HASHERS`` setting by their
+    algorithm.
+
+    """
+    return load_hashers(tuple(defaults.MANIFEST_LEGACY_HASHERS))
+
+
+def is_usable_algorithm(algorithm):
+    """
+    Returns ``True`` if ``algorithm`` is one of the ``PASSWORD_HASHERS`` or
+    ``MANIFEST_LEGACY_HASHERS`` and the library of its hasher is installed.
+
+    """
+    hasher = get_hashers_by_algorithm().get(algorithm)
+    if hasher is None:
+        hasher = get_legacy_hashers().get(algorithm)
+    if hasher is None:
+        return False
+    if hasher.library is not None:
+        try:
+            hasher._load_library()  # pylint: disable=protected-access
+        except ValueError:
+            return False
+    return True
+
+
+@timed("hash")
+def check_legacy_password(password, encoded):
+    """
+    Checks ``password`` against an ``encoded`` hash of a legacy hasher,
+    which is not one of the ``PASSWORD_HASHERS``.
+
+    Returns ``False`` if the library of the hasher is not installed.
+
+    """
+    if password is None or not encoded or "$" not in encoded:
+        return False
+    hasher = get_legacy_hashers().get(encoded.split("$", 1)[0])
+    if hasher is None:
+        return False
+    try:
+        return hasher.verify(password, encoded)
+    except ValueError:
+        return False
+
+
+def import_password_hash(value):
+    """
+    Returns a password hash of another system in the format of the Django
+    hashers, so it can be stored as the password of a user.
+
+    Raw MD5-crypt (``$1$``) and bcrypt (``$2a$``, ``$2b$``, ``$2y$``)
+    hashes are prefixed with their algorithm. Hashes are accepted if their
+    algorithm is one of the ``PASSWORD_HASHERS`` or
+    ``MANIFEST_LEGACY_HASHERS`` and the library of its hasher is installed,
+    so the imported users can log in.
+
+    :raises ValueError: If the format of the hash is not supported.
+
+    """
+    if value.startswith(MD5_CRYPT_MAGIC):
+        value = "%s$%s" % (MD5CryptPasswordHasher.algorithm, value)
+    elif value[:4] in ("$2a$", "$2b$", "$2y$"):
+        # $2y$ of PHP is the same as $2b$.
+        value = "bcrypt$$2b$%s" % value[4:]
+    if "$" in value and is_usable_algorithm(value.split("$", 1)[0]):
+        return value
+    raise ValueError("Unsupported password hash.")
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+""" Manifest User Importers
+"""
+
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def read_csv(file):
+    """
+    Yields the rows of a CSV ``file`` with a header as dicts.
+
+    """
+    yield from csv.DictReader(file)
+
+
+def read_ndjson(file):
+    """
+    Yields the objects of a newline delimited JSON ``file``. Lines which
+    are not JSON objects are yielded as ``None``, so they can be reported
+    by their row number. Blank lines are skipped.
+
+    """
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+
+def read_rows(file, import_format):
+    """
+    Yields the rows of ``file`` in ``import_format``, one at a time.
+
+    :raises ValueError: If the format is not supported.
+
+    """
+    if import_format == "csv":
+        return read_csv(file)
+    if import_format == "ndjson":
+        return read_ndjson(file)
+    raise ValueError("Unsupported format: %s" % import_format)
+
+
+def iter_batches(rows, batch_size):
+    """
+    Yields lists of ``(row number, row)`` tuples of up to ``batch_size``
+    rows, numbering the rows from 1.
+
+    """
+    rows = enumerate(rows, 1)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class PasswordHasherPool:
+    """
+    Hashes passwords in a pool of ``workers`` processes, which defaults to
+    the number of CPUs. Passwords are hashed in the current process if
+    there would be a single worker.
+
+    Password hashers are slow by design, so hashing is the bottleneck of
+    creating many users and parallelizes well.
+
+    """
+
+    def __init__(self, workers=None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers if workers > 1 else 0
+        self.executor = None
+
+    def __enter__(self):
+        if self.workers:
+            # Spawned workers must set up Django to read the hashers.
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=django.setup
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def hash(self, passwords):
+        """
+        Returns the hashes of ``passwords`` in order. Missing passwords are
+        hashed as unusable passwords.
+
+        """
+        passwords = [password or None for password in passwords]
+        if self.executor is None:
+            return [make_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(
+            self.executor.map(make_password, passwords, chunksize=chunksize)
+        )
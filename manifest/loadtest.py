@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+""" Manifest Load Testing
+"""
+
+import bisect
+import collections
+import json
+import math
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from django.urls import reverse
+
+# Upper bounds of the latency histogram buckets in milliseconds.
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Maximum number of latencies kept per scenario for the percentiles.
+SAMPLE_SIZE = 10000
+
+DEFAULT_MIX = {
+    "login": 20,
+    "register": 5,
+    "activate": 5,
+    "profile_update": 10,
+    "user_list": 60,
+}
+
+
+def parse_mix(value):
+    """
+    Returns the weights of the scenarios from a ``name=weight,...``
+    string.
+
+    :raises ValueError: If a scenario is unknown or a weight is invalid.
+
+    """
+    mix = {}
+    for item in value.split(","):
+        name, _separator, weight = item.strip().partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError("Unknown scenario: %s" % name)
+        mix[name] = int(weight)
+        if mix[name] < 0:
+            raise ValueError("Invalid weight: %s" % item)
+    if not any(mix.values()):
+        raise ValueError("At least one scenario must have a weight.")
+    return mix
+
+
+class Latencies:
+    """
+    Count, maximum and histogram of the latencies of a scenario, with a
+    random sample of at most ``size`` latencies for the percentiles, so
+    the memory doesn't grow with the duration of the test.
+
+    """
+
+    def __init__(self, size=SAMPLE_SIZE):
+        self.size = size
+        self.count = 0
+        self.maximum = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sample = []
+        self.random = random.Random()
+
+    def add(self, seconds):
+        self.count += 1
+        self.maximum = max(self.maximum, seconds)
+        self.histogram[
+            bisect.bisect_left(LATENCY_BUCKETS, seconds * 1000)
+        ] += 1
+        if len(self.sample) < self.size:
+            self.sample.append(seconds)
+        else:
+            # Every latency is kept in the sample with the same chance.
+            index = self.random.randrange(self.count)
+            if index < self.size:
+                self.sample[index] = seconds
+
+    def get_percentiles(self):
+        """
+        Returns the 1st to 99th percentiles of the sample.
+
+        """
+        if len(self.sample) < 2:
+            return self.sample * 99
+        return statistics.quantiles(self.sample, n=100, method="inclusive")
+
+
+class Stats:
+    """
+    Collects the latencies and errors of the requests of every worker.
+
+    """
+
+    def __init__(self, sample_size=SAMPLE_SIZE):
+        self.lock = threading.Lock()
+        self.latencies = collections.defaultdict(
+            lambda: Latencies(sample_size)
+        )
+        self.errors = collections.Counter()
+
+    def record(self, scenario, seconds, error=None):
+        with self.lock:
+            self.latencies[scenario].add(seconds)
+            self.latencies["total"].add(seconds)
+            if error is not None:
+                self.errors[scenario, error] += 1
+
+    def summarize(self, elapsed):
+        """
+        Returns the throughput, error rate, latency percentiles and
+        histogram of each scenario, and of all of them as ``total``.
+
+        """
+        with self.lock:
+            errors = collections.defaultdict(dict)
+            for (scenario, error), count in self.errors.items():
+                errors[scenario][error] = count
+                errors["total"][error] = errors["total"].get(error, 0) + count
+            summary = {}
+            for scenario, latencies in self.latencies.items():
+                failed = errors.get(scenario, {})
+                percentiles = latencies.get_percentiles()
+                summary[scenario] = {
+                    "requests": latencies.count,
+                    "requests_per_second": round(latencies.count / elapsed, 1),
+                    "error_rate": round(
+                        sum(failed.values()) / latencies.count, 4
+                    ),
+                    "errors": failed,
+                    "p50_ms": round(percentiles[49] * 1000, 2),
+                    "p90_ms": round(percentiles[89] * 1000, 2),
+                    "p99_ms": round(percentiles[98] * 1000, 2),
+                    "max_ms": round(latencies.maximum * 1000, 2),
+                    "histogram": dict(
+                        zip(
+                            ["<=%dms" % bound for bound in LATENCY_BUCKETS]
+                            + [">%dms" % LATENCY_BUCKETS[-1]],
+                            latencies.histogram,
+                        )
+                    ),
+                }
+        if "total" in summary:
+            # Report the total after the scenarios.
+            summary["total"] = summary.pop("total")
+        return summary
+
+
+class Worker:
+    """
+    State of a load test worker.
+
+    """
+
+    def __init__(self, number):
+        self.number = number
+        self.token = None
+        self.registered = 0
+
+
+class LoadTest:
+    """
+    Replays a weighted mix of API requests against a running server with
+    ``workers`` threads, for ``duration`` seconds or until ``requests``
+    requests are sent.
+
+    Every worker logs in once with a random one of ``users`` to update its
+    profile, and sends the requests with its own random generator seeded
+    from ``seed``. Activations use the ``(username, key)`` pairs of
+    ``activations`` once, and the scenario is skipped when they run out.
+
+    Requests are authenticated with JWT tokens, and cookies are not kept,
+    so session authentication and CSRF checks don't apply.
+
+    """
+
+    def __init__(
+        self,
+        base_url,
+        users,
+        password,
+        workers=4,
+        duration=60,
+        requests=None,
+        mix=None,
+        activations=(),
+        seed=0,
+        timeout=30,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.users = list(users)
+        self.password = password
+        self.workers = workers
+        self.duration = duration
+        self.requests = requests
+        self.mix = mix or DEFAULT_MIX
+        self.activations = collections.deque(activations)
+        self.seed = seed
+        self.timeout = timeout
+        self.stats = Stats()
+        # Usernames of registrations are unique across the runs.
+        self.run_id = "%x" % int(time.time())
+        self.sent = 0
+        self.pages = 1
+        self.lock = threading.Lock()
+        self.paths = {
+            "login": reverse("auth_login_api"),
+            "register": reverse("auth_register_api"),
+            "activate": reverse("auth_activate_api"),
+            "profile_update": reverse("profile_update_api"),
+            "user_list": reverse("user_list_api"),
+        }
+
+    def request(self, method, path, data=None, token=None):
+        """
+        Sends a JSON request and returns the status code and the decoded
+        response.
+
+        """
+        headers = {"Accept": "application/json"}
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        if token:
+            headers["Authorization"] = "JWT %s" % token
+        request = urllib.request.Request(
+            self.base_url + path, data=body, headers=headers, method=method
+        )
+        try:
+            with urllib.request.urlopen(
+                request, timeout=self.timeout
+            ) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as error:
+            status, content = error.code, error.read()
+        try:
+            return status, json.loads(content or b"null")
+        except ValueError:
+            return status, None
+
+    def login(self, rng):
+        return self.request(
+            "POST",
+            self.paths["login"],
+            {
+                "identification": rng.choice(self.users),
+                "password": self.password,
+            },
+        )
+
+    def scenario_login(self, rng, worker):
+        return self.login(rng)[0], 200
+
+    def scenario_register(self, rng, worker):
+        worker.registered += 1
+        username = "load%s%d_%d" % (
+            self.run_id,
+            worker.number,
+            worker.registered,
+        )
+        status, _data = self.request(
+            "POST",
+            self.paths["register"],
+            {
+                "username": username,
+                "email": "%s@example.com" % username,
+                "password1": self.password,
+                "password2": self.password,
+                "tos": True,
+            },
+        )
+        return status, 201
+
+    def scenario_activate(self, rng, worker):
+        try:
+            username, key = self.activations.popleft()
+        except IndexError:
+            return None, None
+        status, _data = self.request(
+            "POST",
+            self.paths["activate"],
+            {"username": username, "token": key},
+        )
+        return status, 200
+
+    def scenario_profile_update(self, rng, worker):
+        for _attempt in range(2):
+            if worker.token is None:
+                status, data = self.login(rng)
+                if status != 200:
+                    return status, 200
+                if not isinstance(data, dict) or "token" not in data:
+                    return "invalid login response", 200
+                worker.token = data["token"]
+            status, _data = self.request(
+                "PATCH",
+                self.paths["profile_update"],
+                {"firstName": "Load%d" % rng.randint(0, 999)},
+                token=worker.token,
+            )
+            if status != 401:
+                break
+            # The token is expired, log in again.
+            worker.token = None
+        return status, 200
+
+    def scenario_user_list(self, rng, worker):
+        page = rng.randint(1, self.pages)
+        status, data = self.request(
+            "GET", "%s?page=%d" % (self.paths["user_list"], page)
+        )
+        if page == 1 and isinstance(data, dict) and data.get("results"):
+            # Pages are known from the count and the size of the first page.
+            self.pages = max(
+                1, math.ceil(data.get("count", 0) / len(data["results"]))
+            )
+        return status, 200
+
+    def next_request(self, deadline):
+        with self.lock:
+            if time.monotonic() >= deadline:
+                return False
+            if self.requests is not None and self.sent >= self.requests:
+                return False
+            self.sent += 1
+            return True
+
+    def run_worker(self, worker, deadline):
+        rng = random.Random("%s-%d" % (self.seed, worker.number))
+        names = [name for name, weight in self.mix.items() if weight]
+        weights = [self.mix[name] for name in names]
+        while self.next_request(deadline):
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                status, expected = getattr(self, "scenario_%s" % name)(
+                    rng, worker
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                # Failures are counted, so the worker keeps running.
+                status, expected = error.__class__.__name__, None
+            seconds = time.perf_counter() - started
+            if status is None:
+                # Nothing left to replay, don't count the request.
+                with self.lock:
+                    self.sent -= 1
+                index = names.index(name)
+                del names[index], weights[index]
+                if not names:
+                    return
+                continue
+            error = None if status == expected else str(status)
+            self.stats.record(name, seconds, error)
+
+    def run(self):
+        """
+        Runs the workers until the duration or the number of requests is
+        reached, and returns the summary of :meth:`Stats.summarize`.
+
+        """
+        started = time.monotonic()
+        deadline = started + self.duration
+        threads = []
+        for number in range(self.workers):
+            worker = Worker(number)
+            thread = threading.Thread(
+                target=self.run_worker, args=(worker, deadline), daemon=True
+            )
+            threads.append(thread)
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.stats.summarize(time.monotonic() - started)
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+""" Manifest Email Backends
+"""
+
+import os
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.core.mail.backends import smtp
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models.signals import post_delete, post_save
+from django.template import loader
+
+from manifest import defaults
+from manifest.utils import get_protocol
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Email backend that stores messages in the outbox instead of sending them.
+
+    Messages are written with the current database transaction and
+    delivered later by ``manifest_send_outbox`` management command.
+
+    """
+
+    def send_messages(self, email_messages):
+        # pylint: disable=import-outside-toplevel
+        from manifest.models import OutboxMessage
+
+        count = 0
+        for message in email_messages:
+            if message.recipients():
+                OutboxMessage.objects.enqueue(message)
+                count += 1
+        return count
+
+
+class SMTPConnectionPool:
+    """
+    Process wide pool of idle SMTP connections, keyed by server settings.
+
+    A connection is reused for at most ``MANIFEST_SMTP_MAX_MESSAGES``
+    messages and dropped after ``MANIFEST_SMTP_POOL_IDLE_TIME`` seconds of
+    idleness. At most ``MANIFEST_SMTP_POOL_SIZE`` idle connections are kept
+    for each server.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._pid = os.getpid()
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            # Never share the sockets inherited from a parent process.
+            self._connections = {}
+            self._pid = os.getpid()
+
+    @staticmethod
+    def _is_alive(connection):
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _quit(connection):
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+    def acquire(self, key):
+        """
+        Returns a tuple of an idle, alive connection and the number of
+        messages sent over it, or ``(None, 0)`` if there is none.
+
+        """
+        while True:
+            with self._lock:
+                self._check_pid()
+                idle = self._connections.get(key)
+                if not idle:
+                    return None, 0
+                connection, sent, released = idle.pop()
+            idle_time = time.monotonic() - released
+            # pylint: disable=bad-continuation
+            if (
+                idle_time < defaults.MANIFEST_SMTP_POOL_IDLE_TIME
+                and self._is_alive(connection)
+            ):
+                return connection, sent
+            self._quit(connection)
+
+    def release(self, key, connection, sent):
+        """
+        Puts a connection back to the pool, or closes it if the pool is
+        full or the connection sent too many messages.
+
+        """
+        if sent < defaults.MANIFEST_SMTP_MAX_MESSAGES:
+            with self._lock:
+                self._check_pid()
+                idle = self._connections.setdefault(key, [])
+                if len(idle) < defaults.MANIFEST_SMTP_POOL_SIZE:
+                    idle.append((connection, sent, time.monotonic()))
+                    return
+        self._quit(connection)
+
+    def clear(self):
+        with self._lock:
+            self._check_pid()
+            connections, self._connections = self._connections, {}
+        for idle in connections.values():
+            for connection, _sent, _released in idle:
+                self._quit(connection)
+
+
+class PooledEmailBackend(smtp.EmailBackend):
+    """
+    SMTP email backend that keeps persistent connections in a process wide
+    :class:`SMTPConnectionPool`.
+
+    Closing the backend returns its connection to the pool, so consecutive
+    messages, even from different requests, are sent over the same SMTP
+    session without a new handshake and login for each message.
+
+    """
+
+    pool = SMTPConnectionPool()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent = 0
+
+    @property
+    def pool_key(self):
+        return (
+            self.host,
+            self.port,
+            self.username,
+            self.use_tls,
+            self.use_ssl,
+        )
+
+    def open(self):
+        if self.connection:
+            return False
+        connection, self.sent = self.pool.acquire(self.pool_key)
+        if connection is not None:
+            self.connection = connection
+            return True
+        return super().open()
+
+    def close(self):
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        self.pool.release(self.pool_key, connection, self.sent)
+
+    def _send(self, email_message):
+        sent = super()._send(email_message)
+        if sent:
+            self.sent += 1
+        return sent
+
+
+class EmailRenderer:
+    """
+    Renders email templates with compiled templates and the static
+    ``protocol`` and ``site`` context cached for the process lifetime.
+
+    Translations are applied while rendering, so a single compiled template
+    serves every locale. Caching is skipped when ``DEBUG`` is ``True`` to
+    pick up template changes.
+
+    """
+
+    def __init__(self):
+        self._templates = {}
+        self._contexts = {}
+
+    def get_template(self, template_name):
+        if settings.DEBUG:
+            return loader.get_template(template_name)
+        try:
+            return self._templates[template_name]
+        except KeyError:
+            template = loader.get_template(template_name)
+            self._templates[template_name] = template
+            return template
+
+    def get_context(self):
+        """
+        Returns a new context dict containing ``protocol`` and ``site``.
+
+        """
+        key = (getattr(settings, "SITE_ID", None), get_protocol())
+        try:
+            context = self._contexts[key]
+        except KeyError:
+            context = {"protocol": key[1], "site": Site.objects.get_current()}
+            self._contexts[key] = context
+        return dict(context)
+
+    def render(self, template_name, context):
+        return self.get_template(template_name).render(context)
+
+    def render_subject(self, template_name, context):
+        # Email subject *must not* contain newlines
+        return "".join(self.render(template_name, context).splitlines())
+
+    def clear(self, **kwargs):
+        self._templates.clear()
+        self._contexts.clear()
+
+
+email_renderer = EmailRenderer()
+post_save.connect(email_renderer.clear, sender=Site)
+post_delete.connect(email_renderer.clear, sender=Site)
+
+
+def get_connection(backend=None, fail_silently=False, **kwargs):
+    """
+    Returns an email backend instance.
+
+    Uses :class:`OutboxEmailBackend` if no ``backend`` is supplied and
+    ``MANIFEST_EMAIL_OUTBOX`` setting is ``True``, else Django's default.
+
+    """
+    if backend is None and defaults.MANIFEST_EMAIL_OUTBOX:
+        backend = "manifest.mail.OutboxEmailBackend"
+    return mail.get_connection(backend, fail_silently, **kwargs)
@@ -9,6 +9,9 @@ except ImportError:
 
 from django.contrib.auth import get_user_model
 
+from manifest import defaults
+from manifest.models import Token
+
 USER_MODEL = get_user_model()
 
 
@@ -17,10 +20,25 @@ class Command(BaseCommand):
     Search for users that still haven't verified their email after
     ``MANIFEST_ACTIVATION_DAYS`` and delete them.
 
+    Also clears the unconfirmed email addresses which are not confirmed
+    in ``MANIFEST_EMAIL_CONFIRMATION_DAYS`` and deletes the expired tokens
+    if ``MANIFEST_USE_TOKEN_TABLE`` setting is ``True``.
+
     """
 
-    help = "Deletes expired users."
+    help = "Deletes expired users and email confirmations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of email confirmations cleared in one query.",
+        )
 
     # pylint: disable=W0612,W0613
     def handle(self, *args, **kwargs):
         USER_MODEL.objects.delete_expired_users()  # noqa: F841
+        USER_MODEL.objects.delete_expired_confirmations(kwargs["batch_size"])
+        if defaults.MANIFEST_USE_TOKEN_TABLE:
+            Token.objects.delete_expired()
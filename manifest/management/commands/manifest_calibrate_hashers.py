@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+""" Manifest Calibrate Hashers Command
+"""
+
+import os
+import platform
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand, CommandError
+
+from manifest.calibration import (
+    MANIFEST_HASHERS,
+    calibrate_hasher,
+    recommend,
+    time_user_operations,
+)
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the ``PASSWORD_HASHERS`` on the current host with the cost
+    settings of the manifest hashers, and report the hashes per second of
+    a single core and the settings which hash a password within the target
+    latency.
+
+    Hashing is measured in a single process, so a host can hash about as
+    many passwords per second as the rate reported times its CPUs. The
+    recommended settings can be written to a file with ``--write``, to be
+    included in the settings of the project.
+
+    """
+
+    help = "Calibrates the cost of the password hashers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target-ms",
+            type=float,
+            default=250,
+            help="Target latency of hashing a password in milliseconds.",
+        )
+        parser.add_argument(
+            "--number",
+            type=int,
+            default=3,
+            help="Number of measurements of each setting.",
+        )
+        parser.add_argument(
+            "--write",
+            default=None,
+            help="Write the recommended settings to a file.",
+        )
+
+    def handle(self, *args, **options):
+        if options["target_ms"] <= 0 or options["number"] < 1:
+            raise CommandError("Target and number must be positive.")
+        target = options["target_ms"] / 1000
+        cpus = os.cpu_count() or 1
+        self.stdout.write(
+            "Host %s with %d CPUs, target %.0f ms."
+            % (platform.node(), cpus, options["target_ms"])
+        )
+        recommended = {}
+        for hasher in get_hashers():
+            try:
+                results = calibrate_hasher(hasher, target, options["number"])
+            except ValueError:
+                self.stdout.write(
+                    "%s: skipped, library is not installed." % hasher.algorithm
+                )
+                continue
+            self.stdout.write("%s:" % hasher.algorithm)
+            for values, seconds in results:
+                self.stdout.write(
+                    "  %-48s %9.1f ms %9.1f hashes/s per core"
+                    % (
+                        self.format_settings(values) or "default",
+                        seconds * 1000,
+                        1 / seconds,
+                    )
+                )
+            values, seconds = recommend(results, target)
+            if values:
+                recommended.update(values)
+                self.stdout.write(
+                    "  Recommended %s, %.1f hashes/s on %d CPUs."
+                    % (self.format_settings(values), cpus / seconds, cpus)
+                )
+        timings = time_user_operations(options["number"])
+        self.stdout.write(
+            "create_user %(create_user).1f ms, "
+            "AuthenticationBackend %(authenticate).1f ms."
+            % {key: value * 1000 for key, value in timings.items()}
+        )
+        if options["write"]:
+            self.write_settings(options["write"], recommended, options)
+
+    @staticmethod
+    def format_settings(values):
+        return ", ".join("%s=%s" % item for item in values.items())
+
+    def write_settings(self, path, recommended, options):
+        lines = [
+            "# Calibrated on %s for %.0f ms per password."
+            % (platform.node(), options["target_ms"])
+        ]
+        for algorithm, hasher in MANIFEST_HASHERS.items():
+            if hasher not in settings.PASSWORD_HASHERS:
+                lines.append(
+                    "# Use %s in PASSWORD_HASHERS to apply the %s settings."
+                    % (hasher, algorithm)
+                )
+        lines.extend(
+            "%s = %r" % (setting, value)
+            for setting, value in sorted(recommended.items())
+        )
+        with open(path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+        self.stdout.write("Wrote the recommended settings to %s." % path)
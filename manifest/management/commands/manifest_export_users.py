@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+""" Manifest Export Users Command
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldError, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from manifest.exporters import UserExporter, parse_filters
+
+
+class Command(BaseCommand):
+    """
+    Stream users to a file or to the standard output as CSV or newline
+    delimited JSON, without loading them all into memory.
+
+    Users can be filtered with ``--filter lookup=value`` options, eg.
+    ``--filter is_active=True --filter date_joined__gte=2020-01-01``.
+    Output files ending with ``.gz`` are compressed with gzip.
+
+    """
+
+    help = "Exports users as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=sorted(UserExporter.formats),
+            default="csv",
+            help="Output format.",
+        )
+        parser.add_argument(
+            "--fields",
+            default=None,
+            help="Comma separated names of the exported fields.",
+        )
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            dest="filters",
+            help="Filter users by a lookup=value expression.",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Output file, defaults to the standard output.",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress the output file with gzip.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Number of users fetched from the database at once.",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        compress = options["gzip"] or output.endswith(".gz")
+        if compress and output == "-":
+            raise CommandError("Compressed output requires --output.")
+        fields = options["fields"] and options["fields"].split(",")
+        try:
+            queryset = (
+                get_user_model()
+                .objects.filter(**parse_filters(options["filters"]))
+                .order_by("pk")
+            )
+            exporter = UserExporter(
+                queryset,
+                fields=fields,
+                export_format=options["format"],
+                chunk_size=options["chunk_size"],
+            )
+        except (FieldError, ValidationError, ValueError) as exc:
+            raise CommandError(exc)
+        if output == "-":
+            for text in exporter.iter_text():
+                self.stdout.write(text, ending="")
+            return
+        with open(output, "wb") as file:
+            for data in exporter.iter_bytes(compress):
+                file.write(data)
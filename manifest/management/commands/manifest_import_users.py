@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+""" Manifest Import Users Command
+"""
+
+import gzip
+import io
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from manifest.importers import IMPORT_FORMATS, read_rows
+
+
+class Command(BaseCommand):
+    """
+    Create users from a CSV or newline delimited JSON file, streaming the
+    rows instead of loading the file into memory.
+
+    CSV files must have a header with ``username``, ``email`` and
+    optionally ``password`` or ``password_hash``, ``first_name`` and
+    ``last_name`` columns. JSON objects have the same keys. Files ending
+    with ``.gz`` are decompressed.
+
+    Rows are created with :meth:`bulk_create_users
+    <manifest.managers.AccountActivationManager.bulk_create_users>`, and
+    the rejected rows are reported by their row number.
+
+    """
+
+    help = "Imports users from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="Input file, or - for the standard input."
+        )
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            default=None,
+            help="Input format, guessed from the file name by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of users validated and inserted at once.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of processes hashing passwords.",
+        )
+        parser.add_argument(
+            "--active", action="store_true", help="Create the users active.",
+        )
+
+    def open(self, path):
+        if path == "-":
+            return io.TextIOWrapper(
+                sys.stdin.buffer, encoding="utf-8-sig", newline=""
+            )
+        if path.endswith(".gz"):
+            return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+        return open(path, encoding="utf-8-sig", newline="")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["format"]
+        if import_format is None:
+            name = path[:-3] if path.endswith(".gz") else path
+            import_format = "ndjson" if name.endswith(".ndjson") else "csv"
+        started = time.monotonic()
+        try:
+            file = self.open(path)
+        except OSError as exc:
+            raise CommandError(exc)
+        with file:
+            created, errors = get_user_model().objects.bulk_create_users(
+                read_rows(file, import_format),
+                active=options["active"],
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+            )
+        for number, error in errors:
+            self.stderr.write("Row %d: %s" % (number, error))
+        self.stdout.write(
+            "Created %(created)d users, rejected %(rejected)d rows "
+            "in %(time).1fs."
+            % {
+                "created": created,
+                "rejected": len(errors),
+                "time": time.monotonic() - started,
+            }
+        )
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+""" Manifest Load Test Command
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from manifest.loadtest import DEFAULT_MIX, LoadTest, parse_mix
+
+
+class Command(BaseCommand):
+    """
+    Soak test a running server with concurrent workers, replaying a
+    weighted mix of login, register, activate, profile update and user list
+    requests of the REST API.
+
+    Requests use the active users whose usernames start with
+    ``--users-prefix`` and the activation keys of the pending ones, as
+    created by ``manifest_seed``, so the command must use the database of
+    the server. The mix is given as ``--mix login=20,user_list=80``.
+
+    """
+
+    help = "Runs a load test against a running server."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="Base URL of the server.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of concurrent workers.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=60,
+            help="Duration of the test in seconds.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=None,
+            help="Stop after sending this many requests.",
+        )
+        parser.add_argument(
+            "--mix",
+            default=",".join("%s=%d" % item for item in DEFAULT_MIX.items()),
+            help="Weights of the scenarios as name=weight pairs.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the random generators of the workers.",
+        )
+        parser.add_argument(
+            "--users-prefix",
+            default="user",
+            help="Prefix of the usernames of the seeded users.",
+        )
+        parser.add_argument(
+            "--users-limit",
+            type=int,
+            default=1000,
+            help="Number of seeded users to use.",
+        )
+        parser.add_argument(
+            "--password",
+            default="password",
+            help="Password of the seeded users.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=30,
+            help="Timeout of a request in seconds.",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Write the results as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as exc:
+            raise CommandError(exc)
+        if options["workers"] < 1:
+            raise CommandError("Workers must be positive.")
+        manager = get_user_model().objects
+        prefix, limit = options["users_prefix"], options["users_limit"]
+        users = list(
+            manager.filter(is_active=True, username__startswith=prefix)
+            .order_by("pk")
+            .values_list("username", flat=True)[:limit]
+        )
+        if not users:
+            raise CommandError(
+                "No active users starting with %r, run manifest_seed first."
+                % prefix
+            )
+        # Keys are only stored in the user table by default.
+        activations = (
+            manager.pending_activation()
+            .filter(username__startswith=prefix)
+            .exclude(activation_key="")
+            .order_by("pk")
+            .values_list("username", "activation_key")[:limit]
+        )
+        results = LoadTest(
+            options["url"],
+            users,
+            options["password"],
+            workers=options["workers"],
+            duration=options["duration"],
+            requests=options["requests"],
+            mix=mix,
+            activations=activations,
+            seed=options["seed"],
+            timeout=options["timeout"],
+        ).run()
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.write_report(results)
+
+    def write_report(self, results):
+        self.stdout.write(
+            "%-16s %9s %9s %8s %9s %9s %9s"
+            % (
+                "Scenario",
+                "Requests",
+                "Req/s",
+                "Errors",
+                "p50 ms",
+                "p90 ms",
+                "p99 ms",
+            )
+        )
+        for scenario, result in results.items():
+            self.stdout.write(
+                "%-16s %9d %9.1f %7.1f%% %9.1f %9.1f %9.1f"
+                % (
+                    scenario,
+                    result["requests"],
+                    result["requests_per_second"],
+                    result["error_rate"] * 100,
+                    result["p50_ms"],
+                    result["p90_ms"],
+                    result["p99_ms"],
+                )
+            )
+        for scenario, result in results.items():
+            for error, count in sorted(result["errors"].items()):
+                self.stdout.write(
+                    "%s: %d responses with %s" % (scenario, count, error)
+                )
+        total = results.get("total")
+        if not total:
+            return
+        self.stdout.write("Latency histogram:")
+        largest = max(total["histogram"].values())
+        for bucket, count in total["histogram"].items():
+            self.stdout.write(
+                "%10s %9d %s" % (bucket, count, "#" * (40 * count // largest))
+            )
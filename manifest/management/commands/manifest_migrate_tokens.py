@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+""" Manifest Migrate Tokens Command
+"""
+
+from django.core.management.base import BaseCommand
+
+from manifest.models import Token
+
+
+class Command(BaseCommand):
+    """
+    Move the pending activation and email confirmation keys from the user
+    columns to the token table, before setting ``MANIFEST_USE_TOKEN_TABLE``
+    to ``True``.
+
+    Users are migrated in batches, each in its own transaction, so the
+    command can be interrupted and run again.
+
+    """
+
+    help = "Moves pending keys from user columns to the token table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of users migrated in one transaction.",
+        )
+
+    def handle(self, *args, **options):
+        count = Token.objects.migrate_from_columns(options["batch_size"])
+        self.stdout.write("Migrated keys of %d users." % count)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+""" Manifest Profiles Command
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from manifest import defaults
+from manifest.profiling import list_dumps, remove_dump, summarize_dump
+
+
+class Command(BaseCommand):
+    """
+    List the request profiles written by :class:`ProfilerMiddleware
+    <manifest.middlewares.ProfilerMiddleware>`, or summarize the profiles
+    given by name, with the slowest functions of a CPU profile or the lines
+    which allocated the most memory.
+
+    Profiles are read from ``--directory`` or ``MANIFEST_PROFILE_DIR``
+    setting and removed with ``--clear``.
+
+    """
+
+    help = "Lists and summarizes request profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names", nargs="*", help="Names of the profiles to summarize."
+        )
+        parser.add_argument(
+            "--directory", default=None, help="Directory of the profiles.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Number of functions or lines of a summary.",
+        )
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            choices=("cumulative", "tottime", "calls"),
+            help="Sort order of the functions of a CPU profile.",
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Remove the profiles.",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["directory"] or defaults.MANIFEST_PROFILE_DIR
+        if not directory:
+            raise CommandError(
+                "No directory, set MANIFEST_PROFILE_DIR or --directory."
+            )
+        dumps = {info["name"]: info for info in list_dumps(directory)}
+        if options["clear"]:
+            for name in dumps:
+                remove_dump(directory, name)
+            self.stdout.write("Removed %d profiles." % len(dumps))
+            return
+        if not options["names"]:
+            self.write_list(dumps.values())
+            return
+        for name in options["names"]:
+            if name not in dumps:
+                raise CommandError("No profile named %s." % name)
+            info = dumps[name]
+            self.stdout.write(
+                "%(name)s %(method)s %(path)s %(view)s "
+                "%(status)s in %(ms).2f ms" % info
+            )
+            self.stdout.write(
+                summarize_dump(
+                    directory, info, options["limit"], options["sort"]
+                )
+            )
+
+    def write_list(self, dumps):
+        self.stdout.write(
+            "%-35s %-19s %-6s %10s %6s  %s"
+            % ("Name", "Time", "Mode", "ms", "Status", "Request")
+        )
+        for info in dumps:
+            self.stdout.write(
+                "%-35s %-19s %-6s %10.2f %6s  %s %s (%s)"
+                % (
+                    info["name"],
+                    info["time"],
+                    info["mode"],
+                    info["ms"],
+                    info["status"],
+                    info["method"],
+                    info["path"],
+                    info["view"],
+                )
+            )
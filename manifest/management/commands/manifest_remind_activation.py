@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+""" Manifest Remind Activation Command
+"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from manifest import defaults
+from manifest.mail import get_connection
+from manifest.mixins import SendActivationMailMixin
+
+USER_MODEL = get_user_model()
+
+
+class Command(SendActivationMailMixin, BaseCommand):
+    """
+    Send an activation reminder to the users who still haven't activated
+    their account and whose activation key is not expired yet.
+
+    Users are read in batches ordered by primary key and each batch is sent
+    over a single connection. Reminded users are recorded, so running the
+    command again only reminds the users who are not reminded before.
+
+    New activation keys are always generated if ``MANIFEST_SIGNED_TOKENS``
+    or ``MANIFEST_USE_TOKEN_TABLE`` setting is ``True``, since the keys are
+    not stored as is.
+
+    """
+
+    help = "Reminds pending users to activate their accounts."
+
+    email_subject_template_name = (
+        "manifest/emails/activation_email_subject.txt"
+    )
+    email_message_template_name = (
+        "manifest/emails/activation_email_message.txt"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Number of emails sent over a single connection.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=None,
+            help="Maximum number of emails sent per second.",
+        )
+        parser.add_argument(
+            "--regenerate-keys",
+            action="store_true",
+            help="Generate new activation keys before sending.",
+        )
+
+    def get_batches(self, batch_size):
+        """
+        Yields the pending users in batches, seeking by primary key, so the
+        rows updated while sending never shift the following batches.
+
+        """
+        queryset = (
+            USER_MODEL.objects.pending_activation()
+            .filter(activation_reminded__isnull=True)
+            .only("pk", "username", "email", "activation_key", "date_joined")
+            .order_by("pk")
+        )
+        last_pk = None
+        while True:
+            batch = queryset
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            batch = list(batch[:batch_size])
+            if not batch:
+                return
+            last_pk = batch[-1].pk
+            yield batch
+
+    def handle(self, *args, **options):
+        batch_size = (
+            options["batch_size"] or defaults.MANIFEST_OUTBOX_BATCH_SIZE
+        )
+        rate = options["rate"]
+        sent = 0
+        started = time.monotonic()
+        # Keys in the token table are only stored hashed and signed tokens
+        # are not stored at all, so new keys must be issued to send them.
+        regenerate_keys = (
+            options["regenerate_keys"]
+            or defaults.MANIFEST_SIGNED_TOKENS
+            or defaults.MANIFEST_USE_TOKEN_TABLE
+        )
+        for users in self.get_batches(batch_size):
+            if regenerate_keys:
+                with transaction.atomic():
+                    USER_MODEL.objects.regenerate_activation_keys(users)
+            with get_connection() as connection:
+                for user in users:
+                    if rate:
+                        # Wait until sending one more stays within the rate.
+                        delay = started + sent / rate - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                    sent += self.send_mail(
+                        user.email,
+                        self.get_activation_context(user),
+                        connection=connection,
+                    )
+            USER_MODEL.objects.filter(
+                pk__in=[user.pk for user in users]
+            ).update(activation_reminded=timezone.now())
+        self.stdout.write(
+            "Sent %(sent)d activation reminders in %(time).1fs."
+            % {"sent": sent, "time": time.monotonic() - started}
+        )
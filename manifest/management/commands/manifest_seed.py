@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+""" Manifest Seed Command
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from manifest.seeders import UserSeeder
+
+
+class Command(BaseCommand):
+    """
+    Create synthetic users for load testing and benchmarks.
+
+    Users are spread across the active, pending, expired and email change
+    pending states, and are generated from ``--seed`` so the same options
+    create the same users. Every user has the same password, which is
+    hashed only once, so millions of users can be created in minutes.
+
+    """
+
+    help = "Creates synthetic users for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int, help="Number of users.")
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the random generator.",
+        )
+        parser.add_argument(
+            "--prefix", default="user", help="Prefix of the usernames.",
+        )
+        parser.add_argument(
+            "--start",
+            type=int,
+            default=0,
+            help="Number of the first username.",
+        )
+        parser.add_argument(
+            "--password", default="password", help="Password of the users.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of users inserted at once.",
+        )
+
+    def handle(self, *args, **options):
+        if options["count"] < 1 or options["batch_size"] < 1:
+            raise CommandError("Count and batch size must be positive.")
+        started = time.monotonic()
+        seeder = UserSeeder(
+            options["count"],
+            seed=options["seed"],
+            prefix=options["prefix"],
+            start=options["start"],
+            password=options["password"],
+            batch_size=options["batch_size"],
+        )
+        counts = seeder.seed_users()
+        self.stdout.write(
+            "Created %(count)d users (%(states)s) in %(time).1fs."
+            % {
+                "count": sum(counts.values()),
+                "states": ", ".join(
+                    "%s: %d" % item for item in counts.items()
+                ),
+                "time": time.monotonic() - started,
+            }
+        )
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+""" Manifest Send Outbox Command
+"""
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from manifest.models import OutboxMessage
+
+
+class Command(BaseCommand):
+    """
+    Deliver the emails written to the outbox when ``MANIFEST_EMAIL_OUTBOX``
+    setting is ``True``.
+
+    Messages are claimed in batches and sent over one connection per batch.
+    Failed messages are retried with an exponential backoff. Any number of
+    workers can run concurrently, claimed messages are leased to a single
+    worker at a time.
+
+    """
+
+    help = "Delivers emails queued in the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Number of messages sent over a single connection.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of concurrent worker threads.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when there are no more messages due.",
+        )
+
+    def work(self, batch_size, interval, once, stop, totals):
+        try:
+            while not stop.is_set():
+                sent, failed = OutboxMessage.objects.deliver(batch_size)
+                totals.append((sent, failed))
+                if not sent + failed:
+                    if once:
+                        break
+                    stop.wait(interval)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        totals = []
+        work_args = (
+            options["batch_size"],
+            options["interval"],
+            options["once"],
+            stop,
+            totals,
+        )
+        started = time.monotonic()
+        try:
+            if options["workers"] > 1:
+                workers = [
+                    threading.Thread(target=self.work, args=work_args)
+                    for _ in range(options["workers"])
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            else:
+                self.work(*work_args)
+        except KeyboardInterrupt:
+            stop.set()
+        self.stdout.write(
+            "Sent %(sent)d, failed %(failed)d messages in %(time).1fs."
+            % {
+                "sent": sum(sent for sent, _ in totals),
+                "failed": sum(failed for _, failed in totals),
+                "time": time.monotonic() - started,
+            }
+        )
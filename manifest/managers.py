@@ -2,17 +2,41 @@
 """ Manifest Model Managers
 """
 
+import datetime
+import json
 import re
 
+from django.apps import apps
 from django.contrib.auth.models import (
     AnonymousUser,
     UserManager as BaseManager,
 )
-
-from manifest import defaults, signals
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.translation import ugettext as _
+
+from manifest import defaults, metrics, signals
+from manifest.hashers import import_password_hash
+from manifest.importers import PasswordHasherPool, iter_batches
+from manifest.messages import EMAIL_IN_USE_MESSAGE, USERNAME_IN_USE_MESSAGE
+from manifest.queries import operation
+from manifest.tokens import (
+    activation_token_generator,
+    email_confirmation_token_generator,
+)
 from manifest.utils import generate_sha1
 
 SHA1_RE = re.compile("^[a-f0-9]{40}$")
+USERNAME_RE = re.compile(r"^\w{1,30}$")
+
+
+def get_token_model():
+    return apps.get_model("manifest", "Token")
 
 
 class AccountActivationManager(BaseManager):
@@ -22,6 +46,7 @@ class AccountActivationManager(BaseManager):
     """
 
     # pylint: disable=arguments-differ,bad-continuation
+    @operation("create_user")
     def create_user(self, username, email, password, active=False):
         """
         A simple wrapper that creates a new :class:`User`.
@@ -43,17 +68,275 @@ class AccountActivationManager(BaseManager):
 
         """
 
-        user = super().create_user(username, email, password)
-
-        if isinstance(user.username, str):
-            username = user.username.encode("utf-8")
-        activation_key = generate_sha1(username)
-        user.is_active = active
-        user.activation_key = activation_key[1]
-        user.save(using=self._db)
+        username = self.model.normalize_username(username)
+        activation_key = ""
+        # pylint: disable=bad-continuation
+        if not (
+            defaults.MANIFEST_SIGNED_TOKENS
+            or defaults.MANIFEST_USE_TOKEN_TABLE
+        ):
+            activation_key = generate_sha1(username.encode("utf-8"))[1]
+
+        # Create the user with a single insert.
+        user = self._create_user(
+            username,
+            email,
+            password,
+            is_active=active,
+            activation_key=activation_key,
+        )
+        if (
+            defaults.MANIFEST_SIGNED_TOKENS
+            or defaults.MANIFEST_USE_TOKEN_TABLE
+        ):
+            self.regenerate_activation_keys([user])
 
         return user
 
+    def regenerate_activation_keys(self, users):
+        """
+        Generates new activation keys for ``users``.
+
+        Keys are written with a single bulk update, or issued as
+        :class:`Token` rows if ``MANIFEST_USE_TOKEN_TABLE`` setting is
+        ``True``. Signed tokens are not stored at all if
+        ``MANIFEST_SIGNED_TOKENS`` setting is ``True``. The new keys are set
+        to ``activation_key`` of the given user instances in every case.
+
+        """
+        if defaults.MANIFEST_SIGNED_TOKENS:
+            for user in users:
+                user.activation_key = activation_token_generator.make_token(
+                    user
+                )
+            return
+        if defaults.MANIFEST_USE_TOKEN_TABLE:
+            token_model = get_token_model()
+            keys = token_model.objects.issue_many(
+                users, token_model.KIND_ACTIVATION
+            )
+            for user, key in zip(users, keys):
+                user.activation_key = key
+            return
+        for user in users:
+            user.activation_key = generate_sha1(user.username)[1]
+        self.bulk_update(users, ["activation_key"])
+
+    @operation("bulk_create_users")
+    def bulk_create_users(
+        self, rows, active=False, batch_size=1000, workers=None
+    ):
+        """
+        Creates users from an iterable of rows, without loading them all
+        into memory.
+
+        Rows are validated in batches, with a query for the usernames and
+        a query for the emails of a batch which are already in use.
+        Passwords of a batch are hashed in a :class:`PasswordHasherPool
+        <manifest.importers.PasswordHasherPool>` and the users are inserted
+        with ``bulk_create``. Activation keys are generated in bulk, the same
+        as :meth:`create_user`, but no emails are sent.
+
+        Rows may have a ``password_hash`` of another system instead of a
+        ``password``, which is stored as is and upgraded to the preferred
+        hasher on the first login. See :func:`import_password_hash
+        <manifest.hashers.import_password_hash>` for the supported formats.
+
+        :param rows:
+            Iterable of dicts with ``username``, ``email`` and optionally
+            ``password`` or ``password_hash``, ``first_name`` and
+            ``last_name`` keys. Users without a password get an unusable
+            password.
+
+        :param active:
+            Boolean that defines if the users are created active.
+
+        :param batch_size:
+            Number of rows validated and inserted at once.
+
+        :param workers:
+            Number of processes hashing passwords. Defaults to the number of
+            CPUs.
+
+        :return:
+            Tuple containing the number of created users and a list of
+            ``(row number, error message)`` tuples of the rejected rows.
+
+        """
+        created, errors = 0, []
+        seen_usernames, seen_emails = set(), set()
+        with PasswordHasherPool(workers) as hasher:
+            for batch in iter_batches(rows, batch_size):
+                valid = self.validate_import_rows(
+                    batch, seen_usernames, seen_emails, errors
+                )
+                if not valid:
+                    continue
+                # Imported hashes don't need to be hashed again.
+                passwords = iter(
+                    hasher.hash(
+                        [
+                            row.get("password")
+                            for _number, row in valid
+                            if not row.get("password_hash")
+                        ]
+                    )
+                )
+                users = []
+                for _number, row in valid:
+                    users.append(
+                        self.model(
+                            username=row["username"],
+                            email=row["email"],
+                            password=row.get("password_hash")
+                            or next(passwords),
+                            first_name=row.get("first_name") or "",
+                            last_name=row.get("last_name") or "",
+                            is_active=active,
+                        )
+                    )
+                inserted = {
+                    id(user) for user in self.insert_import_batch(users)
+                }
+                for (number, _row), user in zip(valid, users):
+                    if id(user) not in inserted:
+                        errors.append((number, USERNAME_IN_USE_MESSAGE))
+                created += len(inserted)
+        errors.sort()
+        return created, errors
+
+    def validate_import_rows(self, batch, seen_usernames, seen_emails, errors):
+        """
+        Returns the valid rows of a batch of ``(row number, row)`` tuples
+        and appends the errors of the others to ``errors``.
+
+        Usernames and emails are normalized in place and added to
+        ``seen_usernames`` and ``seen_emails``, so they are unique across the
+        batches. Password hashes are converted to the format of the Django
+        hashers in place.
+
+        """
+        for _number, row in batch:
+            if isinstance(row, dict):
+                row["username"] = self.model.normalize_username(
+                    (row.get("username") or "").strip()
+                )
+                row["email"] = self.normalize_email(
+                    (row.get("email") or "").strip()
+                )
+        usernames = [
+            row["username"] for _number, row in batch if isinstance(row, dict)
+        ]
+        emails = [
+            row["email"].lower()
+            for _number, row in batch
+            if isinstance(row, dict)
+        ]
+        used_usernames = set(
+            self.filter(username__in=usernames).values_list(
+                "username", flat=True
+            )
+        )
+        used_emails = set(
+            self.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=emails)
+            .values_list("email_lower", flat=True)
+        ) | set(
+            self.annotate(email_lower=Lower("email_unconfirmed"))
+            .filter(
+                email_lower__in=emails,
+                email_confirmation_key_created__gt=(
+                    self.get_confirmation_cutoff()
+                ),
+            )
+            .values_list("email_lower", flat=True)
+        )
+        valid = []
+        for number, row in batch:
+            error = None
+            if not isinstance(row, dict):
+                error = _("Invalid row.")
+            elif not USERNAME_RE.search(row["username"]):
+                error = _(
+                    "Username must contain only letters, numbers and "
+                    "underscores."
+                )
+            elif (
+                row["username"].lower()
+                in defaults.MANIFEST_FORBIDDEN_USERNAMES
+            ):
+                error = _("This username is not allowed.")
+            elif (
+                row["username"] in used_usernames
+                or row["username"] in seen_usernames
+            ):
+                error = USERNAME_IN_USE_MESSAGE
+            else:
+                try:
+                    validate_email(row["email"])
+                except ValidationError:
+                    error = _("Enter a valid email address.")
+                else:
+                    email = row["email"].lower()
+                    if email in used_emails or email in seen_emails:
+                        error = EMAIL_IN_USE_MESSAGE
+            if error is None and row.get("password_hash"):
+                try:
+                    row["password_hash"] = import_password_hash(
+                        str(row["password_hash"]).strip()
+                    )
+                except ValueError:
+                    error = _("Unsupported password hash.")
+            if error is not None:
+                errors.append((number, error))
+                continue
+            seen_usernames.add(row["username"])
+            seen_emails.add(row["email"].lower())
+            valid.append((number, row))
+        return valid
+
+    def insert_import_batch(self, users):
+        """
+        Inserts ``users`` with ``bulk_create`` and returns the inserted
+        users. If a username is taken meanwhile, users are inserted one by
+        one and the rejected ones are left out.
+
+        """
+        use_keys = not (
+            defaults.MANIFEST_SIGNED_TOKENS
+            or defaults.MANIFEST_USE_TOKEN_TABLE
+        )
+        for user in users:
+            user.activation_key = (
+                generate_sha1(user.username)[1] if use_keys else ""
+            )
+        try:
+            with transaction.atomic(using=self.db):
+                self.bulk_create(users)
+            inserted = users
+        except IntegrityError:
+            inserted = []
+            for user in users:
+                try:
+                    with transaction.atomic(using=self.db):
+                        self.bulk_create([user])
+                except IntegrityError:
+                    continue
+                inserted.append(user)
+        if defaults.MANIFEST_USE_TOKEN_TABLE and inserted:
+            # Primary keys are not set by ``bulk_create`` on every database.
+            token_model = get_token_model()
+            token_model.objects.issue_many(
+                list(
+                    self.filter(
+                        username__in=[user.username for user in inserted]
+                    )
+                ),
+                token_model.KIND_ACTIVATION,
+            )
+        return inserted
+
+    @operation("activate_user")
     def activate_user(self, username, activation_key):
         """
         Activate a :class:`User` by supplying a valid ``activation_key``.
@@ -71,22 +354,78 @@ class AccountActivationManager(BaseManager):
             The newly activated :class:`User` or ``False`` if not successful.
 
         """
-        if SHA1_RE.search(activation_key):
-            try:
-                user = self.get(
-                    username=username, activation_key=activation_key
-                )
-            except self.model.DoesNotExist:
-                return False
-            if not user.activation_key_expired():
-                user.activation_key = defaults.MANIFEST_ACTIVATED_LABEL
-                user.is_active = True
-                user.save(using=self._db)
-                # Send the ACTIVATION_COMPLETE signal
-                signals.ACTIVATION_COMPLETE.send(sender=None, user=user)
-                return user
-        return False
+        user = self.get_activation_user(username, activation_key)
+        if user is None:
+            metrics.ACTIVATIONS.inc(outcome="invalid")
+            return False
+        if user.activation_key_expired():
+            metrics.ACTIVATIONS.inc(outcome="expired")
+            return False
+        user.activation_key = defaults.MANIFEST_ACTIVATED_LABEL
+        user.is_active = True
+        user.save(using=self._db)
+        metrics.ACTIVATIONS.inc(outcome="success")
+        # Send the ACTIVATION_COMPLETE signal
+        signals.ACTIVATION_COMPLETE.send(sender=None, user=user)
+        return user
 
+    def get_activation_user(self, username, activation_key):
+        """
+        Returns the :class:`User` with ``username`` if ``activation_key``
+        is valid, else ``None``.
+
+        Signed tokens are checked before any database access if
+        ``MANIFEST_SIGNED_TOKENS`` setting is ``True``. Otherwise the key is
+        looked up in the token table if ``MANIFEST_USE_TOKEN_TABLE`` setting
+        is ``True``, or in the ``activation_key`` column of the users.
+
+        """
+        if defaults.MANIFEST_SIGNED_TOKENS:
+            # pylint: disable=bad-continuation
+            if not activation_token_generator.check_signature(
+                username, activation_key
+            ):
+                return None
+            user = self.filter(username=username, is_active=False).first()
+            if user is None or not activation_token_generator.check_token(
+                user, activation_key
+            ):
+                return None
+            return user
+        if not SHA1_RE.search(activation_key):
+            return None
+        if defaults.MANIFEST_USE_TOKEN_TABLE:
+            token_model = get_token_model()
+            return token_model.objects.consume(
+                token_model.KIND_ACTIVATION, username, activation_key
+            )
+        return self.filter(
+            username=username, activation_key=activation_key
+        ).first()
+
+    def pending_activation(self):
+        """
+        Returns the users who are not activated yet and whose activation key
+        is not expired.
+
+        """
+        expiration_date = timezone.now() - datetime.timedelta(
+            days=defaults.MANIFEST_ACTIVATION_DAYS
+        )
+        pending = self.filter(
+            is_active=False, date_joined__gt=expiration_date,
+        )
+        if defaults.MANIFEST_SIGNED_TOKENS:
+            return pending.filter(activation_key="")
+        if defaults.MANIFEST_USE_TOKEN_TABLE:
+            return pending.filter(
+                tokens__kind=get_token_model().KIND_ACTIVATION
+            )
+        return pending.exclude(
+            activation_key__in=["", defaults.MANIFEST_ACTIVATED_LABEL]
+        )
+
+    @operation("delete_expired_users")
     def delete_expired_users(self):
         """
         Checks for expired users and delete's the ``User`` associated with
@@ -108,6 +447,34 @@ class EmailConfirmationManager(BaseManager):
     E-mail address confirmation functionalities for User model.
     """
 
+    @staticmethod
+    def get_confirmation_cutoff():
+        """
+        Returns the creation date before which email confirmation keys are
+        expired, defined by ``MANIFEST_EMAIL_CONFIRMATION_DAYS`` setting.
+
+        """
+        return timezone.now() - datetime.timedelta(
+            days=defaults.MANIFEST_EMAIL_CONFIRMATION_DAYS
+        )
+
+    def email_in_use(self, email):
+        """
+        Checks if ``email`` is the email address of a user or the pending
+        unconfirmed email address of a user whose key is not expired.
+
+        """
+        return self.filter(
+            Q(email__iexact=email)
+            | Q(
+                email_unconfirmed__iexact=email,
+                email_confirmation_key_created__gt=(
+                    self.get_confirmation_cutoff()
+                ),
+            )
+        ).exists()
+
+    @operation("confirm_email")
     def confirm_email(self, username, confirmation_key):
         """
         Confirm an email address by checking a ``confirmation_key``.
@@ -126,24 +493,80 @@ class EmailConfirmationManager(BaseManager):
             The verified :class:`User` or ``False`` if not successful.
 
         """
-        if SHA1_RE.search(confirmation_key):
-            try:
-                user = self.select_related().get(
-                    username=username,
-                    email_confirmation_key=confirmation_key,
-                    email_unconfirmed__isnull=False,
-                )
-            except self.model.DoesNotExist:
-                return False
-            else:
-                user.email = user.email_unconfirmed
-                user.email_unconfirmed, user.email_confirmation_key = "", ""
-                user.save(using=self._db)
-                # Send the CINFIRMATION_COMPLETE signal
-                signals.CINFIRMATION_COMPLETE.send(sender=None, user=user)
-                return user
+        user = self.get_confirmation_user(username, confirmation_key)
+        if user is not None and user.email_unconfirmed:
+            user.email = user.email_unconfirmed
+            user.email_unconfirmed, user.email_confirmation_key = "", ""
+            user.save(using=self._db)
+            metrics.EMAIL_CONFIRMATIONS.inc(outcome="success")
+            # Send the CINFIRMATION_COMPLETE signal
+            signals.CINFIRMATION_COMPLETE.send(sender=None, user=user)
+            return user
+        metrics.EMAIL_CONFIRMATIONS.inc(outcome="invalid")
         return False
 
+    def get_confirmation_user(self, username, confirmation_key):
+        """
+        Returns the :class:`User` with ``username`` if ``confirmation_key``
+        is valid and not expired, else ``None``.
+
+        Checks signed tokens, the token table or the
+        ``email_confirmation_key`` column, like :func:`get_activation_user
+        <manifest.managers.AccountActivationManager.get_activation_user>`.
+
+        """
+        if defaults.MANIFEST_SIGNED_TOKENS:
+            generator = email_confirmation_token_generator
+            if not generator.check_signature(username, confirmation_key):
+                return None
+            user = self.filter(username=username).first()
+            if user is None or not generator.check_token(
+                user, confirmation_key
+            ):
+                return None
+            return user
+        if not SHA1_RE.search(confirmation_key):
+            return None
+        if defaults.MANIFEST_USE_TOKEN_TABLE:
+            token_model = get_token_model()
+            return token_model.objects.consume(
+                token_model.KIND_EMAIL_CONFIRMATION, username, confirmation_key
+            )
+        return (
+            self.select_related()
+            .filter(
+                username=username,
+                email_confirmation_key=confirmation_key,
+                email_confirmation_key_created__gt=(
+                    self.get_confirmation_cutoff()
+                ),
+            )
+            .first()
+        )
+
+    @operation("delete_expired_confirmations")
+    def delete_expired_confirmations(self, batch_size=1000):
+        """
+        Clears the unconfirmed email addresses and confirmation keys which
+        are expired, with an ``UPDATE`` for each ``batch_size`` users.
+
+        :return: Number of the users whose confirmation is cleared.
+
+        """
+        expired = self.filter(
+            email_confirmation_key_created__lte=self.get_confirmation_cutoff()
+        )
+        count = 0
+        while True:
+            pks = list(expired.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return count
+            count += self.filter(pk__in=pks).update(
+                email_unconfirmed="",
+                email_confirmation_key="",
+                email_confirmation_key_created=None,
+            )
+
 
 class UserProfileManager(BaseManager):
     """
@@ -184,3 +607,302 @@ class BaseUserManager(
 
 class UserManager(BaseUserManager):
     """ Extra functionality for the User model. """
+
+
+class OutboxManager(models.Manager):
+    """
+    Queueing and delivery functionalities for outbox messages.
+    """
+
+    def enqueue(self, email):
+        """
+        Stores an email message in the outbox to be sent later.
+
+        :param email:
+            A Django ``EmailMessage`` or ``EmailMultiAlternatives`` instance.
+
+        :return: The queued :class:`OutboxMessage`.
+
+        """
+        if email.attachments:
+            raise ValueError("Outbox messages can not have attachments.")
+        return self.create(
+            from_email=email.from_email or "",
+            recipients=json.dumps(
+                {
+                    "to": email.to,
+                    "cc": email.cc,
+                    "bcc": email.bcc,
+                    "reply_to": email.reply_to,
+                }
+            ),
+            subject=email.subject,
+            body=email.body,
+            alternatives=json.dumps(getattr(email, "alternatives", [])),
+            headers=json.dumps(email.extra_headers),
+        )
+
+    def claim(self, batch_size=None):
+        """
+        Claims a batch of messages that are due for delivery.
+
+        Claimed messages are leased for ``MANIFEST_OUTBOX_LEASE_TIME``
+        seconds, so concurrent workers skip them. Messages of a crashed
+        worker are claimed again after the lease is expired.
+
+        :param batch_size:
+            Maximum number of messages to claim. Defaults to
+            ``MANIFEST_OUTBOX_BATCH_SIZE``.
+
+        :return: A list of claimed :class:`OutboxMessage` objects.
+
+        """
+        batch_size = batch_size or defaults.MANIFEST_OUTBOX_BATCH_SIZE
+        now = timezone.now()
+        due = {
+            "status__in": (
+                self.model.STATUS_PENDING,
+                self.model.STATUS_SENDING,
+            ),
+            "next_attempt__lte": now,
+        }
+        lease = now + datetime.timedelta(
+            seconds=defaults.MANIFEST_OUTBOX_LEASE_TIME
+        )
+        with transaction.atomic(using=self.db):
+            pks = self.get_due_pks(due, batch_size)
+            # Filtering by ``due`` again prevents double claims on
+            # databases without row locks, where concurrent workers may
+            # select the same messages.
+            self.filter(pk__in=pks, **due).update(
+                status=self.model.STATUS_SENDING, next_attempt=lease
+            )
+        # Only the messages leased by this call are returned.
+        return list(
+            self.filter(
+                pk__in=pks,
+                status=self.model.STATUS_SENDING,
+                next_attempt=lease,
+            ).order_by("pk")
+        )
+
+    def get_due_pks(self, due, batch_size):
+        """
+        Returns the primary keys of a batch of ``due`` messages, skipping
+        the rows locked by the other workers.
+
+        """
+        return list(
+            self.select_for_update(skip_locked=True)
+            .filter(**due)
+            .order_by("next_attempt")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+
+    @operation("deliver")
+    def deliver(self, batch_size=None, connection=None):
+        """
+        Claims a batch of messages and sends them over a single connection.
+
+        :param batch_size:
+            Maximum number of messages to send.
+
+        :param connection:
+            Optional email backend instance. Defaults to the backend defined
+            in ``MANIFEST_OUTBOX_EMAIL_BACKEND`` setting.
+
+        :return: Tuple containing the number of sent and failed messages.
+
+        """
+        # pylint: disable=import-outside-toplevel
+        from manifest.mail import OutboxEmailBackend
+
+        messages = self.claim(batch_size)
+        if not messages:
+            return 0, 0
+        if connection is None:
+            connection = mail.get_connection(
+                defaults.MANIFEST_OUTBOX_EMAIL_BACKEND
+            )
+        if isinstance(connection, OutboxEmailBackend):
+            raise ImproperlyConfigured(
+                "Outbox can not be delivered to itself. "
+                "Provide a MANIFEST_OUTBOX_EMAIL_BACKEND."
+            )
+        sent, failed = [], 0
+        try:
+            connection.open()
+        except Exception as error:  # pylint: disable=broad-except
+            for message in messages:
+                message.mark_failed(error)
+            return 0, len(messages)
+        try:
+            for message in messages:
+                try:
+                    connection.send_messages([message.as_email(connection)])
+                except Exception as error:  # pylint: disable=broad-except
+                    message.mark_failed(error)
+                    failed += 1
+                else:
+                    sent.append(message.pk)
+        finally:
+            connection.close()
+        self.filter(pk__in=sent).update(
+            status=self.model.STATUS_SENT, sent=timezone.now(), last_error=""
+        )
+        metrics.EMAILS_SENT.inc(len(sent))
+        return len(sent), failed
+
+
+class TokenManager(models.Manager):
+    """
+    Issue, validation and cleanup functionalities for hashed tokens.
+    """
+
+    def get_expiry(self, user, kind):
+        """
+        Returns the expiration date of a new ``kind`` token of ``user``.
+
+        Activation tokens expire ``MANIFEST_ACTIVATION_DAYS`` after the user
+        joined, email confirmation tokens expire
+        ``MANIFEST_EMAIL_CONFIRMATION_DAYS`` after the email change.
+
+        """
+        if kind == self.model.KIND_ACTIVATION:
+            return user.date_joined + datetime.timedelta(
+                days=defaults.MANIFEST_ACTIVATION_DAYS
+            )
+        created = user.email_confirmation_key_created or timezone.now()
+        return created + datetime.timedelta(
+            days=defaults.MANIFEST_EMAIL_CONFIRMATION_DAYS
+        )
+
+    def issue(self, user, kind):
+        """
+        Issues a new ``kind`` token for ``user``, replacing the previous one.
+
+        :return: String containing the key which is only stored hashed.
+
+        """
+        return self.issue_many([user], kind)[0]
+
+    def issue_many(self, users, kind):
+        """
+        Issues new ``kind`` tokens for ``users`` with a single delete and a
+        single insert.
+
+        :return: A list containing the keys in the order of ``users``.
+
+        """
+        keys = [generate_sha1(user.username)[1] for user in users]
+        tokens = [
+            self.model(
+                user=user,
+                kind=kind,
+                key=self.model.hash_key(key),
+                expires_at=self.get_expiry(user, kind),
+            )
+            for user, key in zip(users, keys)
+        ]
+        with transaction.atomic(using=self.db):
+            self.filter(user__in=users, kind=kind).delete()
+            self.bulk_create(tokens)
+        return keys
+
+    @operation("consume")
+    def consume(self, kind, username, key):
+        """
+        Deletes a valid ``kind`` token with ``key`` of the user with
+        ``username``.
+
+        The token is looked up by the unique index of the hashed key.
+
+        :return: The :class:`User` of the token or ``None``.
+
+        """
+        token = (
+            self.select_related("user")
+            .filter(
+                key=self.model.hash_key(key),
+                kind=kind,
+                user__username=username,
+                expires_at__gt=timezone.now(),
+            )
+            .first()
+        )
+        if token is None:
+            return None
+        # Only the request which deletes the token gets the user, so a
+        # token can't be used twice by concurrent requests.
+        if not self.filter(pk=token.pk).delete()[0]:
+            return None
+        return token.user
+
+    def delete_expired(self):
+        """
+        Deletes the expired tokens with a range delete on ``expires_at``.
+
+        :return: Number of the deleted tokens.
+
+        """
+        return self.filter(expires_at__lte=timezone.now()).delete()[0]
+
+    def migrate_from_columns(self, batch_size=1000):
+        """
+        Moves the pending keys of the user columns to the token table and
+        clears the columns, in a transaction for each ``batch_size`` users.
+
+        :return: Number of the migrated users.
+
+        """
+        user_model = self.model._meta.get_field("user").related_model
+        pending = (
+            user_model.objects.filter(
+                ~Q(activation_key__in=["", defaults.MANIFEST_ACTIVATED_LABEL])
+                | ~Q(email_confirmation_key="")
+            )
+            .only(
+                "pk",
+                "date_joined",
+                "activation_key",
+                "email_confirmation_key",
+                "email_confirmation_key_created",
+            )
+            .order_by("pk")
+        )
+        count = 0
+        last_pk = None
+        while True:
+            batch = pending
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            users = list(batch[:batch_size])
+            if not users:
+                return count
+            last_pk = users[-1].pk
+            tokens = []
+            for user in users:
+                for kind, field in (
+                    (self.model.KIND_ACTIVATION, "activation_key"),
+                    (
+                        self.model.KIND_EMAIL_CONFIRMATION,
+                        "email_confirmation_key",
+                    ),
+                ):
+                    key = getattr(user, field)
+                    if SHA1_RE.search(key):
+                        tokens.append(
+                            self.model(
+                                user=user,
+                                kind=kind,
+                                key=self.model.hash_key(key),
+                                expires_at=self.get_expiry(user, kind),
+                            )
+                        )
+                        setattr(user, field, "")
+            with transaction.atomic(using=self.db):
+                self.bulk_create(tokens)
+                user_model.objects.bulk_update(
+                    users, ["activation_key", "email_confirmation_key"]
+                )
+            count += len(users)
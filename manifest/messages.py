@@ -11,6 +11,7 @@ AUTH_REGISTER_ERROR = _("Registration failed.")
 AUTH_REGISTER_FORBIDDEN = _("Registration forbidden.")
 AUTH_ACTIVATE_SUCCESS = _("Account activated.")
 AUTH_ACTIVATE_ERROR = _("Activation failed!")
+AUTH_ACTIVATE_RESEND_SUCCESS = _("Activation email sent.")
 PASSWORD_RESET_SUCCESS = _("Password reset sent.")
 PASSWORD_RESET_VERIFY_SUCCESS = _("Token verified.")
 PASSWORD_RESET_VERIFY_ERROR = _("Verification failed.")
@@ -27,3 +28,5 @@ PICTURE_UPLOAD_SUCCESS = _("Picture uploaded.")
 EMAIL_IN_USE_MESSAGE = _(
     "This email address is already in use. Please supply a different email."
 )
+
+USERNAME_IN_USE_MESSAGE = _("A user with that username already exists.")
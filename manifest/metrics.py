@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+""" Manifest Metrics
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from manifest import defaults
+
+# Upper bounds of the default histogram buckets in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Registry:
+    """
+    Registry of the metrics of the process.
+
+    Every thread updates its own shard of the values, so updates don't
+    take a lock. Shards are summed when the values are collected, and the
+    shards of finished threads are merged to keep their values.
+
+    If ``MANIFEST_METRICS_DIR`` setting is set, the values are written to a
+    file of the process in that directory at most every
+    ``MANIFEST_METRICS_FLUSH_INTERVAL`` seconds and on exit, so the values
+    of the workers of a pre-fork server can be aggregated. Files of every
+    process are summed, so the directory must be cleared with
+    :meth:`clear` when the server starts. Forked processes start with
+    empty values.
+
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the values of the process.
+
+        """
+        # A forked process may inherit the lock held by another thread.
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.shards = []
+        self.retired = {}
+        self.name = "%d-%s.json" % (os.getpid(), uuid.uuid4().hex[:8])
+        self.flushed = time.monotonic()
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError("Duplicate metric: %s" % metric.name)
+        self.metrics[metric.name] = metric
+        return metric
+
+    def get_shard(self):
+        try:
+            shard = self.local.shard
+        except AttributeError:
+            shard = self.local.shard = {}
+            with self.lock:
+                self.shards.append((threading.current_thread(), shard))
+        if (
+            defaults.MANIFEST_METRICS_DIR
+            and time.monotonic() - self.flushed
+            > defaults.MANIFEST_METRICS_FLUSH_INTERVAL
+        ):
+            self.flushed = time.monotonic()
+            self.flush()
+        return shard
+
+    def collect(self):
+        """
+        Returns the values of the process by ``(name, labels)`` keys.
+
+        """
+        with self.lock:
+            alive = []
+            for thread, shard in self.shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    merge(self.retired, shard)
+            self.shards = alive
+            values = merge({}, self.retired)
+            for _thread, shard in alive:
+                # Copying a dict is atomic, unlike iterating over it.
+                merge(values, shard.copy())
+        return values
+
+    def flush(self, directory=None):
+        """
+        Writes the values of the process to its file in ``directory`` or
+        ``MANIFEST_METRICS_DIR``.
+
+        """
+        directory = directory or defaults.MANIFEST_METRICS_DIR
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        descriptor, path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(
+                [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.collect().items()
+                ],
+                file,
+            )
+        os.replace(path, os.path.join(directory, self.name))
+
+    def clear(self, directory=None):
+        """
+        Removes the files of every process in ``directory`` or
+        ``MANIFEST_METRICS_DIR``.
+
+        Call it before the workers are started, e.g. in ``on_starting``
+        hook of Gunicorn, or the values of the previous runs are summed.
+
+        """
+        directory = directory or defaults.MANIFEST_METRICS_DIR
+        if not directory or not os.path.isdir(directory):
+            return
+        for filename in os.listdir(directory):
+            if filename.endswith((".json", ".tmp")):
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except FileNotFoundError:
+                    pass
+
+    def collect_all(self, directory=None):
+        """
+        Returns the values of every process which wrote to ``directory`` or
+        ``MANIFEST_METRICS_DIR``, with the current values of this process.
+
+        """
+        directory = directory or defaults.MANIFEST_METRICS_DIR
+        values = self.collect()
+        if not directory or not os.path.isdir(directory):
+            return values
+        for filename in os.listdir(directory):
+            if not filename.endswith(".json") or filename == self.name:
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as file:
+                    rows = json.load(file)
+            except (OSError, ValueError):
+                continue
+            merge(
+                values,
+                {
+                    (name, tuple(labels)): value
+                    for name, labels, value in rows
+                    if name in self.metrics
+                },
+            )
+        return values
+
+    def to_text(self, values=None):
+        """
+        Returns ``values`` or the values of every process in Prometheus
+        text format.
+
+        """
+        if values is None:
+            values = self.collect_all()
+        lines = []
+        for name in sorted(self.metrics):
+            metric = self.metrics[name]
+            lines.append("# HELP %s %s" % (name, metric.documentation))
+            lines.append("# TYPE %s %s" % (name, metric.type))
+            for (key, labels), value in sorted(values.items()):
+                if key == name:
+                    lines.extend(metric.to_text(labels, value))
+        return "\n".join(lines) + "\n"
+
+
+def merge(values, other):
+    """
+    Adds the values of ``other`` to ``values`` and returns it. Histogram
+    values are summed per bucket.
+
+    """
+    for key, value in other.items():
+        current = values.get(key)
+        if current is None:
+            values[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            values[key] = [a + b for a, b in zip(current, value)]
+        else:
+            values[key] = current + value
+    return values
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{%s}" % ",".join(
+        '%s="%s"'
+        % (
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\n", "\\n")
+            .replace('"', '\\"'),
+        )
+        for name, value in pairs
+    )
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Base class of the metrics, which are registered in ``registry``.
+
+    Labels are given as keyword arguments when the metric is updated.
+
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def get_key(self, labels):
+        return (
+            self.name,
+            tuple(str(labels[name]) for name in self.labelnames),
+        )
+
+    def get_value(self, **labels):
+        """
+        Returns the value of the process with ``labels``.
+
+        """
+        return self.registry.collect().get(self.get_key(labels))
+
+
+class Counter(Metric):
+    """
+    A value which only increases.
+
+    """
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        shard = self.registry.get_shard()
+        key = self.get_key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def to_text(self, labels, value):
+        return [
+            "%s%s %s"
+            % (
+                self.name,
+                format_labels(self.labelnames, labels),
+                format_value(value),
+            )
+        ]
+
+
+class Histogram(Metric):
+    """
+    Counts of observations in ``buckets``, with their sum.
+
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        buckets=DEFAULT_BUCKETS,
+        registry=None,
+    ):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        shard = self.registry.get_shard()
+        key = self.get_key(labels)
+        counts = shard.get(key)
+        if counts is None:
+            # Counts of the buckets and +Inf, and the sum.
+            counts = shard[key] = [0] * (len(self.buckets) + 2)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        counts[index] += 1
+        counts[-1] += value
+
+    def time(self, **labels):
+        """
+        Returns a context manager which observes the seconds it takes.
+
+        """
+        return Timer(self, labels)
+
+    def to_text(self, labels, value):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), value):
+            cumulative += count
+            lines.append(
+                "%s_bucket%s %s"
+                % (
+                    self.name,
+                    format_labels(
+                        self.labelnames, labels, [("le", format_value(bound))]
+                    ),
+                    format_value(cumulative),
+                )
+            )
+        labels = format_labels(self.labelnames, labels)
+        lines.append(
+            "%s_sum%s %s" % (self.name, labels, format_value(value[-1]))
+        )
+        lines.append(
+            "%s_count%s %s" % (self.name, labels, format_value(cumulative))
+        )
+        return lines
+
+
+class Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(
+            time.perf_counter() - self.started, **self.labels
+        )
+
+
+REGISTRY = Registry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=REGISTRY.reset)
+atexit.register(REGISTRY.flush)
+
+LOGINS = Counter(
+    "manifest_logins_total", "Authentications by outcome.", ["outcome"],
+)
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "manifest_password_hash_seconds",
+    "Seconds taken to hash or check a password.",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+REGISTRATIONS = Counter(
+    "manifest_registrations_total", "Completed registrations."
+)
+
+ACTIVATIONS = Counter(
+    "manifest_activations_total",
+    "Account activation attempts by outcome.",
+    ["outcome"],
+)
+
+EMAIL_CONFIRMATIONS = Counter(
+    "manifest_email_confirmations_total",
+    "Email confirmation attempts by outcome.",
+    ["outcome"],
+)
+
+EMAILS_RENDERED = Counter(
+    "manifest_emails_rendered_total",
+    "Rendered emails by template.",
+    ["template"],
+)
+
+EMAILS_QUEUED = Counter(
+    "manifest_emails_queued_total", "Emails written to the outbox."
+)
+
+EMAILS_SENT = Counter("manifest_emails_sent_total", "Delivered emails.")
+
+MUGSHOTS_GENERATED = Counter(
+    "manifest_mugshots_generated_total", "Generated mugshots."
+)
+
+THROTTLED = Counter(
+    "manifest_throttled_total",
+    "Requests rejected by a cooldown, by action.",
+    ["action"],
+)
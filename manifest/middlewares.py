@@ -2,11 +2,21 @@
 """ Manifest Middlewares
 """
 
+import contextlib
+import datetime
+import itertools
+import logging
+import time
+
 from django.conf import settings
+from django.db import connections
 from django.middleware.locale import LocaleMiddleware as DjangoLocaleMiddleware
+from django.urls import Resolver404, resolve
 from django.utils import translation
 
-from manifest import defaults
+from manifest import defaults, profiling, queries, timing
+
+logger = logging.getLogger("manifest.timing")
 
 
 class LocaleMiddleware(DjangoLocaleMiddleware):
@@ -28,3 +38,215 @@ class LocaleMiddleware(DjangoLocaleMiddleware):
                     request.LANGUAGE_CODE = translation.get_language()
                 except AttributeError:
                     pass
+
+
+class ServerTimingMiddleware:
+    """
+    Times the database queries, password hashing, rendering, email and
+    storage phases of the request, adds them as a ``Server-Timing`` header
+    and logs them to the ``manifest.timing`` logger.
+
+    The header is only added if ``MANIFEST_SERVER_TIMING_HEADER`` setting is
+    ``True``. As the duration of password hashing tells if an account
+    exists, it should be disabled on public sites, keeping the log.
+
+    It should be the first middleware, so the timings cover the others.
+
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        token = timing.start()
+        try:
+            with contextlib.ExitStack() as stack:
+                timings = timing.get_timings()
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.execute_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            timings = timing.stop(token)
+        total = time.perf_counter() - started
+        if defaults.MANIFEST_SERVER_TIMING_HEADER:
+            response["Server-Timing"] = timings.as_header(total)
+        phases = timings.as_dict()
+        logger.info(
+            "%s %s %s total=%.2fms %s",
+            request.method,
+            request.path,
+            response.status_code,
+            total * 1000,
+            " ".join(
+                "%s=%.2fms/%d" % (name, phase["ms"], phase["count"])
+                for name, phase in phases.items()
+            ),
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status_code": response.status_code,
+                "total_ms": round(total * 1000, 2),
+                "timings": phases,
+            },
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        timings = timing.get_timings()
+        if timings is None:
+            return response
+        started = time.perf_counter()
+
+        # Template responses are rendered after the last middleware.
+        def rendered(_response):
+            timings.add("render", time.perf_counter() - started)
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class ProfilerMiddleware:
+    """
+    Profiles manifest views with ``cProfile``, or ``tracemalloc`` for
+    memory, and writes the dumps to ``MANIFEST_PROFILE_DIR`` setting,
+    keeping the last ``MANIFEST_PROFILE_MAX_FILES`` of them. Profiling is
+    disabled if the setting is not set.
+
+    Staff users profile a request with ``X-Manifest-Profile`` header or
+    ``_profile`` query parameter set to ``cpu`` or ``memory``. One in
+    ``MANIFEST_PROFILE_SAMPLE_RATE`` requests of any user is profiled in
+    ``MANIFEST_PROFILE_MODE`` if the setting is not ``0``. The name of the
+    dump is returned to staff users in ``X-Manifest-Profile`` header, see
+    ``manifest_profiles`` command to summarize it.
+
+    The rest of the middleware chain is profiled with the view, so the
+    view middlewares like CSRF protection run as usual. The middleware
+    should be placed after ``AuthenticationMiddleware``.
+
+    """
+
+    header = "HTTP_X_MANIFEST_PROFILE"
+    query_parameter = "_profile"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.counter = itertools.count(1)
+
+    def __call__(self, request):
+        if not defaults.MANIFEST_PROFILE_DIR:
+            return self.get_response(request)
+        view = self.get_view(request)
+        if view is None:
+            return self.get_response(request)
+        requested = self.get_requested_mode(request)
+        mode = requested or self.get_sampled_mode()
+        if mode is None:
+            return self.get_response(request)
+        started = time.perf_counter()
+        response, profile, info = profiling.PROFILERS[mode](
+            lambda: self.get_response(request)
+        )
+        if profile is None:
+            return response
+        info.update(
+            {
+                "time": datetime.datetime.now().isoformat(timespec="seconds"),
+                "method": request.method,
+                "path": request.path,
+                "view": "%s.%s" % (view.__module__, view.__qualname__),
+                "status": response.status_code,
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+        )
+        name = profiling.write_dump(
+            defaults.MANIFEST_PROFILE_DIR,
+            mode,
+            profile,
+            info,
+            defaults.MANIFEST_PROFILE_MAX_FILES,
+        )
+        if requested is not None:
+            response["X-Manifest-Profile"] = name
+        return response
+
+    def get_view(self, request):
+        """
+        Returns the view of ``request`` if it is a view of manifest, or
+        ``None``.
+
+        """
+        try:
+            match = resolve(
+                request.path_info, getattr(request, "urlconf", None)
+            )
+        except Resolver404:
+            return None
+        view = getattr(match.func, "view_class", match.func)
+        # Class based views have the module of their class.
+        if not view.__module__.startswith("manifest."):
+            return None
+        return view
+
+    def get_requested_mode(self, request):
+        """
+        Returns the profiling mode requested by a staff user, or ``None``.
+
+        """
+        mode = request.META.get(self.header) or request.GET.get(
+            self.query_parameter
+        )
+        if mode is None:
+            return None
+        user = getattr(request, "user", None)
+        if user is None or not user.is_staff:
+            return None
+        mode = mode or "cpu"
+        return mode if mode in profiling.PROFILERS else None
+
+    def get_sampled_mode(self):
+        """
+        Returns ``MANIFEST_PROFILE_MODE`` for one in
+        ``MANIFEST_PROFILE_SAMPLE_RATE`` requests, or ``None``.
+
+        """
+        rate = defaults.MANIFEST_PROFILE_SAMPLE_RATE
+        if rate and next(self.counter) % rate == 0:
+            return defaults.MANIFEST_PROFILE_MODE
+        return None
+
+
+class QueryInspectorMiddleware:
+    """
+    Logs the slow queries of the request and the query which crosses the
+    query count limit with :class:`QueryInspector
+    <manifest.queries.QueryInspector>`.
+
+    Queries are tagged with the view of the request and the operations of
+    manifest running them, e.g. ``AuthLoginView/authenticate``. Querysets
+    are tagged with the operation which evaluates them, not the one which
+    builds them.
+
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                queries.inspect_queries(
+                    "%s %s" % (request.method, request.path)
+                )
+            )
+            # The operation of the view is exited with the stack.
+            request._manifest_queries = stack
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stack = getattr(request, "_manifest_queries", None)
+        if stack is not None:
+            view = getattr(view_func, "view_class", view_func)
+            stack.enter_context(queries.operation(view.__name__))
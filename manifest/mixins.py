@@ -2,17 +2,21 @@
 """ Manifest View Mixins
 """
 
+import hashlib
+
 from django.contrib import messages
+from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 from django.utils.decorators import method_decorator
 from django.views.generic import FormView, View
 
-from manifest import decorators, defaults
-from manifest.utils import get_protocol
+from manifest import decorators, defaults, metrics
+from manifest.mail import OutboxEmailBackend, email_renderer, get_connection
+from manifest.queries import operation
+from manifest.timing import timed
 
 
 class MessageMixin:
@@ -55,46 +59,100 @@ class SendMailMixin:
                 "Provide a email_message_template_name."
             )
 
-        subject = "".join(
-            render_to_string(
-                self.email_subject_template_name, context
-            ).splitlines()
+        subject = email_renderer.render_subject(
+            self.email_subject_template_name, context
+        )
+        message = email_renderer.render(
+            self.email_message_template_name, context
         )
-        message = render_to_string(self.email_message_template_name, context)
 
         return EmailMultiAlternatives(
             subject, message, self.from_email, [recipient]
         )
 
-    def send_mail(self, recipient, opts):
+    def get_email(self, recipient, opts):
         """
-        Send a django.core.mail.EmailMultiAlternatives to `to_email`.
+        Returns a django.core.mail.EmailMultiAlternatives to `recipient`
+        rendered with `opts` without sending it.
         """
-        context = {
-            "protocol": get_protocol(),
-            "site": Site.objects.get_current(),
-        }
+        context = email_renderer.get_context()
         context.update(opts)
 
         email = self.create_email(context, recipient)
 
         if self.email_html_template_name is not None:
-            html_email = render_to_string(
+            html_email = email_renderer.render(
                 self.email_html_template_name, context
             )
             email.attach_alternative(html_email, "text/html")
 
-        return email.send()
+        metrics.EMAILS_RENDERED.inc(template=self.email_message_template_name)
+        return email
+
+    @timed("email")
+    def send_mail(self, recipient, opts, connection=None):
+        """
+        Send a django.core.mail.EmailMultiAlternatives to `to_email`.
+
+        The email is written to the outbox instead of sending
+        if ``MANIFEST_EMAIL_OUTBOX`` setting is ``True``.
+        """
+        email = self.get_email(recipient, opts)
+        email.connection = connection or get_connection()
+        sent = email.send()
+        if isinstance(email.connection, OutboxEmailBackend):
+            metrics.EMAILS_QUEUED.inc(sent)
+        else:
+            metrics.EMAILS_SENT.inc(sent)
+        return sent
 
 
 class SendActivationMailMixin(SendMailMixin):
-    def send_activation_mail(self, user):
-        context = {
+    def get_activation_context(self, user):
+        return {
             "user": user,
             "activation_days": defaults.MANIFEST_ACTIVATION_DAYS,
             "activation_key": user.activation_key,
         }
-        self.send_mail(user.email, context)
+
+    def send_activation_mail(self, user):
+        self.send_mail(user.email, self.get_activation_context(user))
+
+    @operation("resend_activation_mail")
+    def resend_activation_mail(self, email):
+        """
+        Resends the activation email to the pending user with ``email``.
+
+        Requests for the same address are coalesced with a cache key, only
+        the first one in ``MANIFEST_ACTIVATION_RESEND_COOLDOWN`` seconds
+        sends an email, the others return without a database query.
+
+        Returns ``True`` if an email is sent.
+        """
+        key = "manifest:activation_resend:%s" % (
+            hashlib.sha1(email.lower().encode("utf-8")).hexdigest()
+        )
+        if not cache.add(
+            key, True, defaults.MANIFEST_ACTIVATION_RESEND_COOLDOWN
+        ):
+            metrics.THROTTLED.inc(action="activation_resend")
+            return False
+        user = (
+            get_user_model()
+            .objects.pending_activation()
+            .filter(email__iexact=email)
+            .first()
+        )
+        if user is None:
+            return False
+        if (
+            defaults.MANIFEST_SIGNED_TOKENS
+            or defaults.MANIFEST_USE_TOKEN_TABLE
+        ):
+            # Keys are not stored as is, issue a new one to send.
+            get_user_model().objects.regenerate_activation_keys([user])
+        self.send_activation_mail(user)
+        return True
 
 
 class EmailChangeMixin(SendMailMixin):
@@ -122,15 +180,25 @@ class EmailChangeMixin(SendMailMixin):
             "confirmation_key": user.email_confirmation_key,
         }
 
-        self.email_subject_template_name = self.email_subject_template_name_old
-        self.email_message_template_name = self.email_message_template_name_old
-        self.email_html_template_name = self.email_html_template_name_old
-        self.send_mail(user.email, context)
+        # Send both emails over the same connection.
+        with get_connection() as connection:
+            self.email_subject_template_name = (
+                self.email_subject_template_name_old
+            )
+            self.email_message_template_name = (
+                self.email_message_template_name_old
+            )
+            self.email_html_template_name = self.email_html_template_name_old
+            self.send_mail(user.email, context, connection)
 
-        self.email_subject_template_name = self.email_subject_template_name_new
-        self.email_message_template_name = self.email_message_template_name_new
-        self.email_html_template_name = self.email_html_template_name_new
-        self.send_mail(user.email_unconfirmed, context)
+            self.email_subject_template_name = (
+                self.email_subject_template_name_new
+            )
+            self.email_message_template_name = (
+                self.email_message_template_name_new
+            )
+            self.email_html_template_name = self.email_html_template_name_new
+            self.send_mail(user.email_unconfirmed, context, connection)
 
 
 class SecureRequiredMixin(View):
@@ -168,3 +236,40 @@ class UserFormMixin(
         kwargs = super().get_form_kwargs()
         kwargs["user"] = self.request.user
         return kwargs
+
+
+class SparseFieldsetViewMixin:
+    """
+    API view mixin which defers the model fields not needed by the
+    requested fields of a :class:`SparseFieldsetMixin
+    <manifest.serializers.SparseFieldsetMixin>` serializer.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_serializer_class().get_model_fields(self.request)
+        if fields:
+            queryset = queryset.only(*fields)
+        return queryset
+
+
+class ValuesQuerysetMixin:
+    """
+    List API view mixin which reads the rows with ``QuerySet.values()``
+    instead of model instances if the serializer is a
+    :class:`ValuesListSerializer <manifest.serializers.ValuesListSerializer>`
+    which can serialize them.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer = self.get_serializer(many=True)
+        columns = getattr(serializer, "get_columns", lambda: None)()
+        if not columns:
+            return queryset
+        # Keyset pagination reads the ordering fields of the rows.
+        ordering = getattr(self.paginator, "ordering", None) or ()
+        for field in ordering:
+            if field.lstrip("-") not in columns:
+                columns.append(field.lstrip("-"))
+        return queryset.values(*columns)
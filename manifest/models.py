@@ -3,10 +3,12 @@
 """
 
 import datetime
+import hashlib
+import json
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.core.files.storage import default_storage
+from django.core.mail import EmailMultiAlternatives
 from django.db import models
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
@@ -16,8 +18,11 @@ from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill
 from pytz import common_timezones
 
-from manifest import defaults
-from manifest.managers import UserManager
+from manifest import defaults, metrics
+from manifest.managers import OutboxManager, TokenManager, UserManager
+from manifest.storage import picture_storage
+from manifest.timing import timed
+from manifest.tokens import email_confirmation_token_generator
 from manifest.utils import generate_sha1, get_gravatar, get_image_path
 
 
@@ -31,6 +36,10 @@ class AccountActivationMixin(models.Model):
         _("Activation key"), max_length=40, blank=True
     )
 
+    activation_reminded = models.DateTimeField(
+        _("Activation reminder date"), blank=True, null=True
+    )
+
     class Meta:
         abstract = True
 
@@ -83,6 +92,22 @@ class EmailConfirmationMixin(models.Model):
     class Meta:
         abstract = True
 
+    def email_confirmation_key_expired(self):
+        """
+        Checks if email confirmation key is expired.
+
+        Returns ``True`` when there is no ``email_confirmation_key_created``
+        or it is beyond the amount of days defined in
+        ``MANIFEST_EMAIL_CONFIRMATION_DAYS``.
+
+        """
+        if self.email_confirmation_key_created is None:
+            return True
+        expiration_date = self.email_confirmation_key_created + (
+            datetime.timedelta(days=defaults.MANIFEST_EMAIL_CONFIRMATION_DAYS)
+        )
+        return timezone.now() >= expiration_date
+
     def change_email(self, email):
         """
         Changes the email address for a user.
@@ -98,10 +123,25 @@ class EmailConfirmationMixin(models.Model):
 
         """
         self.email_unconfirmed = email
+        self.email_confirmation_key_created = timezone.now()
+
+        if defaults.MANIFEST_SIGNED_TOKENS:
+            self.email_confirmation_key = ""
+            self.save()
+            generator = email_confirmation_token_generator
+            self.email_confirmation_key = generator.make_token(self)
+            return self
+
+        if defaults.MANIFEST_USE_TOKEN_TABLE:
+            self.email_confirmation_key = ""
+            self.save()
+            self.email_confirmation_key = Token.objects.issue(
+                self, Token.KIND_EMAIL_CONFIRMATION
+            )
+            return self
 
         key = generate_sha1(self.username)
         self.email_confirmation_key = key[1]
-        self.email_confirmation_key_created = timezone.now()
         self.save()
 
         return self
@@ -124,7 +164,11 @@ class UserProfileMixin(models.Model):
     )
     birth_date = models.DateField(_("Birth date"), blank=True, null=True)
     picture = models.ImageField(
-        _("Picture"), blank=True, null=True, upload_to=get_image_path
+        _("Picture"),
+        blank=True,
+        null=True,
+        upload_to=get_image_path,
+        storage=picture_storage,
     )
     mugshot = ImageSpecField(
         source="picture",
@@ -135,6 +179,7 @@ class UserProfileMixin(models.Model):
         ],
         format="JPEG",
         options={"quality": 80},
+        cachefile_storage=picture_storage,
     )
 
     class Meta:
@@ -145,19 +190,21 @@ class UserProfileMixin(models.Model):
 
     # pylint: disable=arguments-differ
     def save(self, *args, force_insert=False, force_update=False, **kwargs):
-        try:
-            old_obj = self.__class__.objects.get(pk=self.pk)
-            # pylint: disable=bad-continuation
-            if (
-                old_obj.picture
-                and self.picture
-                # pylint: disable=no-member
-                and old_obj.picture.path != self.picture.path
-            ):
-                path = old_obj.picture.path
-                default_storage.delete(path)
-        except self.__class__.DoesNotExist:
-            pass
+        # New users have no old picture to delete.
+        if self.pk is not None:
+            try:
+                old_obj = self.__class__.objects.get(pk=self.pk)
+                # pylint: disable=bad-continuation
+                if (
+                    old_obj.picture
+                    and self.picture
+                    and old_obj.picture.name != self.picture.name
+                ):
+                    # Compare names instead of paths, remote storages
+                    # have no local path.
+                    old_obj.picture.storage.delete(old_obj.picture.name)
+            except self.__class__.DoesNotExist:
+                pass
         super().save(force_insert, force_update, *args, **kwargs)
 
     @property
@@ -284,6 +331,157 @@ class User(AbstractUser, BaseUser):
 
     objects = UserManager()
 
+    @timed("hash")
+    def set_password(self, raw_password):
+        with metrics.PASSWORD_HASH_SECONDS.time(operation="set"):
+            super().set_password(raw_password)
+
+    @timed("hash")
+    def check_password(self, raw_password):
+        with metrics.PASSWORD_HASH_SECONDS.time(operation="check"):
+            return super().check_password(raw_password)
+
     class Meta:
         swappable = "AUTH_USER_MODEL"
         ordering = ["-date_joined"]
+        indexes = [
+            # Supports keyset pagination of the user lists.
+            models.Index(
+                fields=["date_joined", "id"], name="manifest_user_joined_idx"
+            )
+        ]
+
+
+class OutboxMessage(models.Model):
+    """
+    An email message waiting in the outbox to be delivered by
+    ``manifest_send_outbox`` management command.
+
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (STATUS_PENDING, _("Pending")),
+        (STATUS_SENDING, _("Sending")),
+        (STATUS_SENT, _("Sent")),
+        (STATUS_FAILED, _("Failed")),
+    )
+
+    from_email = models.CharField(_("From"), max_length=254, blank=True)
+    recipients = models.TextField(_("Recipients"))
+    subject = models.TextField(_("Subject"), blank=True)
+    body = models.TextField(_("Body"), blank=True)
+    alternatives = models.TextField(_("Alternatives"), blank=True)
+    headers = models.TextField(_("Headers"), blank=True)
+    status = models.CharField(
+        _("Status"),
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(_("Attempts"), default=0)
+    last_error = models.TextField(_("Last error"), blank=True)
+    created = models.DateTimeField(_("Created"), auto_now_add=True)
+    next_attempt = models.DateTimeField(
+        _("Next attempt"), default=timezone.now
+    )
+    sent = models.DateTimeField(_("Sent"), blank=True, null=True)
+
+    objects = OutboxManager()
+
+    class Meta:
+        verbose_name = _("outbox message")
+        verbose_name_plural = _("outbox messages")
+        indexes = [models.Index(fields=["status", "next_attempt"])]
+
+    def as_email(self, connection=None):
+        """
+        Rebuilds the queued message as an ``EmailMultiAlternatives``.
+
+        """
+        recipients = json.loads(self.recipients)
+        return EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email or None,
+            to=recipients.get("to"),
+            cc=recipients.get("cc"),
+            bcc=recipients.get("bcc"),
+            reply_to=recipients.get("reply_to"),
+            headers=json.loads(self.headers or "{}"),
+            alternatives=[
+                tuple(alternative)
+                for alternative in json.loads(self.alternatives or "[]")
+            ],
+            connection=connection,
+        )
+
+    def mark_failed(self, error):
+        """
+        Records a failed delivery attempt. The message will be retried with
+        an exponential backoff until ``MANIFEST_OUTBOX_MAX_ATTEMPTS``.
+
+        """
+        self.attempts += 1
+        self.last_error = str(error)
+        if self.attempts >= defaults.MANIFEST_OUTBOX_MAX_ATTEMPTS:
+            self.status = self.STATUS_FAILED
+        else:
+            self.status = self.STATUS_PENDING
+            self.next_attempt = timezone.now() + datetime.timedelta(
+                seconds=defaults.MANIFEST_OUTBOX_RETRY_DELAY
+                * 2 ** (self.attempts - 1)
+            )
+        self.save(
+            update_fields=["attempts", "last_error", "status", "next_attempt"]
+        )
+
+
+class Token(models.Model):
+    """
+    A hashed activation or email confirmation key of a user, used instead
+    of the key columns of the user if ``MANIFEST_USE_TOKEN_TABLE`` setting
+    is ``True``.
+
+    Only the SHA256 of a key is stored. Keys are validated with a single
+    probe of the unique key index and expired tokens are deleted with a
+    range delete on the ``expires_at`` index.
+
+    """
+
+    KIND_ACTIVATION = "activation"
+    KIND_EMAIL_CONFIRMATION = "email"
+
+    KIND_CHOICES = (
+        (KIND_ACTIVATION, _("Activation")),
+        (KIND_EMAIL_CONFIRMATION, _("Email confirmation")),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tokens",
+        verbose_name=_("User"),
+    )
+    kind = models.CharField(_("Kind"), max_length=10, choices=KIND_CHOICES)
+    key = models.CharField(_("Key"), max_length=64, unique=True)
+    expires_at = models.DateTimeField(_("Expires at"), db_index=True)
+
+    objects = TokenManager()
+
+    class Meta:
+        verbose_name = _("token")
+        verbose_name_plural = _("tokens")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "kind"], name="manifest_token_user_kind"
+            )
+        ]
+
+    @staticmethod
+    def hash_key(key):
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
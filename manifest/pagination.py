@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+""" Manifest Paginators
+"""
+
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from manifest import defaults
+
+
+def estimate_count(queryset):
+    """
+    Returns an estimated number of the rows of ``queryset``.
+
+    Uses the planner estimate of ``EXPLAIN`` on PostgreSQL, which doesn't
+    scan the table. On other databases, an exact count is cached for
+    ``MANIFEST_COUNT_CACHE_TIMEOUT`` seconds.
+
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) %s" % sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    sql, params = queryset.query.sql_with_params()
+    key = "manifest:count:%s" % (
+        hashlib.sha1(("%s%r" % (sql, params)).encode("utf-8")).hexdigest()
+    )
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, defaults.MANIFEST_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def encode_value(value):
+    """
+    Encodes the cursor values which are not JSON serializable. Unlike
+    ``DjangoJSONEncoder``, datetimes keep their microseconds.
+
+    """
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class EstimatedCountPage(Page):
+    """
+    Page of an :class:`EstimatedCountPaginator`, which knows if there is a
+    next page from the rows it fetched rather than the count.
+
+    """
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator which uses :func:`estimate_count` instead of an exact
+    ``COUNT(*)`` if ``MANIFEST_ESTIMATED_COUNT`` setting is ``True``.
+
+    Pages are sliced from the queryset regardless of the estimate, so pages
+    beyond an underestimated count are still served.
+
+    """
+
+    @cached_property
+    def estimated(self):
+        return defaults.MANIFEST_ESTIMATED_COUNT and isinstance(
+            self.object_list, QuerySet
+        )
+
+    @cached_property
+    def count(self):
+        if self.estimated:
+            return estimate_count(self.object_list)
+        return super().count
+
+    def page(self, number):
+        if not self.estimated:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        # One more row tells if there is a next page.
+        top = bottom + self.per_page + 1
+        object_list = list(self.object_list[bottom:top])
+        if not object_list and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        has_next = len(object_list) > self.per_page
+        return EstimatedCountPage(
+            object_list[: self.per_page], number, self, has_next
+        )
+
+    def validate_number(self, number):
+        if not self.estimated:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            # pylint: disable=raise-missing-from
+            raise EmptyPage(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+    """
+    A page of a :class:`KeysetPaginator`.
+
+    """
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by seeking to the last row of the previous page,
+    instead of skipping rows with an ``OFFSET``.
+
+    Rows are ordered by the ``ordering`` fields, all ascending or all
+    descending, which must be unique together. The default
+    ``("-date_joined", "-pk")`` is supported by the index of the user model.
+    Pages are addressed by opaque cursors, so every page costs a single
+    index range scan and no ``COUNT(*)``.
+
+    """
+
+    def __init__(
+        self, object_list, per_page, ordering=("-date_joined", "-pk")
+    ):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.descending = ordering[0].startswith("-")
+        self.fields = [field.lstrip("-") for field in ordering]
+        if any(field.startswith("-") != self.descending for field in ordering):
+            raise ValueError("All ordering fields must have same direction.")
+
+    def get_model_field(self, name):
+        opts = self.object_list.model._meta
+        return opts.get_field(opts.pk.name if name == "pk" else name)
+
+    def encode_cursor(self, obj, reverse):
+        # Rows may also be dicts of ``QuerySet.values()``.
+        if isinstance(obj, dict):
+            values = [obj[field] for field in self.fields]
+        else:
+            values = [getattr(obj, field) for field in self.fields]
+        data = json.dumps([values, reverse], default=encode_value)
+        return (
+            base64.urlsafe_b64encode(data.encode("utf-8"))
+            .decode("ascii")
+            .rstrip("=")
+        )
+
+    def decode_cursor(self, cursor):
+        try:
+            data = base64.urlsafe_b64decode(
+                cursor.encode("ascii") + b"=" * (-len(cursor) % 4)
+            )
+            values, reverse = json.loads(data.decode("utf-8"))
+            if len(values) != len(self.fields):
+                raise ValueError(cursor)
+            values = [
+                self.get_model_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            # pylint: disable=raise-missing-from
+            raise InvalidCursor(cursor)
+        return values, bool(reverse)
+
+    def get_filter(self, values, reverse):
+        """
+        Returns a ``Q`` object which selects the rows after ``values``, or
+        before them if ``reverse`` is ``True``.
+
+        """
+        lookup = "lt" if self.descending != reverse else "gt"
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            equals = dict(zip(self.fields[:index], values[:index]))
+            equals["%s__%s" % (field, lookup)] = values[index]
+            condition |= Q(**equals)
+        return condition
+
+    def get_ordering(self, reverse):
+        prefix = "-" if self.descending != reverse else ""
+        return ["%s%s" % (prefix, field) for field in self.fields]
+
+    def page(self, cursor=None):
+        """
+        Returns the :class:`KeysetPage` addressed by ``cursor``, or the
+        first page if ``cursor`` is ``None``.
+
+        :raises InvalidCursor: If the cursor can not be decoded.
+
+        """
+        reverse = False
+        queryset = self.object_list
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+            queryset = queryset.filter(self.get_filter(values, reverse))
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        object_list = list(queryset[: self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[: self.per_page]
+        if reverse:
+            object_list.reverse()
+
+        next_cursor = previous_cursor = None
+        if object_list:
+            if has_more or reverse:
+                next_cursor = self.encode_cursor(object_list[-1], False)
+            if (has_more and reverse) or (cursor and not reverse):
+                previous_cursor = self.encode_cursor(object_list[0], True)
+        return KeysetPage(object_list, self, next_cursor, previous_cursor)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page number pagination which uses :class:`EstimatedCountPaginator`.
+
+    """
+
+    django_paginator_class = EstimatedCountPaginator
+
+
+class KeysetPagination(BasePagination):
+    """
+    REST framework pagination with :class:`KeysetPaginator` and opaque
+    cursors in the ``next`` and ``previous`` links.
+
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    ordering = ("-date_joined", "-pk")
+    invalid_cursor_message = _("Invalid cursor")
+
+    page = request = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.page_size, self.ordering)
+        try:
+            self.page = paginator.page(
+                request.query_params.get(self.cursor_query_param)
+            )
+        except InvalidCursor:
+            # pylint: disable=raise-missing-from
+            raise NotFound(self.invalid_cursor_message)
+        return list(self.page)
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self.get_link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self.get_link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
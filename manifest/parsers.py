@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+""" Manifest REST API Parsers
+"""
+
+import functools
+import json
+
+from django.conf import settings
+
+from djangorestframework_camel_case.settings import (
+    api_settings as camel_case_settings,
+)
+from djangorestframework_camel_case.util import get_underscoreize_re
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@functools.lru_cache(maxsize=2048)
+def underscoreize_key(key, no_underscore_before_number=False):
+    """
+    Returns the snake case of a camel case ``key``. Keys are converted once
+    and cached, since requests repeat the same field names.
+
+    """
+    underscoreize_re = get_underscoreize_re(
+        {"no_underscore_before_number": no_underscore_before_number}
+    )
+    return underscoreize_re.sub(r"\1_\2", key).lower()
+
+
+class CamelCaseJSONParser(JSONParser):
+    """
+    Parses the keys of JSON data from camel case to snake case, the same as
+    ``djangorestframework_camel_case.parser.CamelCaseJSONParser``.
+
+    The data is decoded with ``orjson`` if it is installed, and with
+    ``json`` if ``orjson`` rejects it, so the same documents are accepted
+    with the same error messages.
+
+    """
+
+    def underscoreize(self, data, options):
+        if isinstance(data, dict):
+            ignore_fields = options.get("ignore_fields") or ()
+            underscoreized = {}
+            for key, value in data.items():
+                new_key = underscoreize_key(
+                    key, bool(options.get("no_underscore_before_number"))
+                )
+                if key in ignore_fields or new_key in ignore_fields:
+                    underscoreized[new_key] = value
+                else:
+                    underscoreized[new_key] = self.underscoreize(
+                        value, options
+                    )
+            return underscoreized
+        if isinstance(data, list):
+            return [self.underscoreize(item, options) for item in data]
+        return data
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read().decode(encoding)
+            try:
+                if orjson is None:
+                    raise ValueError
+                data = orjson.loads(data)
+            except ValueError:
+                data = json.loads(data)
+        except ValueError as exc:
+            # pylint: disable=raise-missing-from
+            raise ParseError("JSON parse error - %s" % str(exc))
+        return self.underscoreize(data, camel_case_settings.JSON_UNDERSCOREIZE)
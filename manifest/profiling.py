@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+""" Manifest Request Profiling
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+
+EXTENSIONS = {"cpu": ".prof", "memory": ".snapshot"}
+
+# Tracing memory is global, so a single request is traced at a time.
+memory_lock = threading.Lock()
+
+
+def profile_cpu(func):
+    """
+    Calls ``func`` with :mod:`cProfile` and returns its result, the
+    profiler and an empty dict.
+
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func)
+    return result, profiler, {}
+
+
+def profile_memory(func, frames=10):
+    """
+    Calls ``func`` while tracing memory allocations with :mod:`tracemalloc`
+    and returns its result, a snapshot of the allocations which are kept
+    after the call and a dict with the peak of the traced memory.
+
+    Allocations of the other threads are traced as well. The snapshot is
+    ``None`` if the memory is already traced, by another request or else.
+
+    """
+    if not memory_lock.acquire(blocking=False):
+        return func(), None, {}
+    try:
+        if tracemalloc.is_tracing():
+            return func(), None, {}
+        tracemalloc.start(frames)
+        try:
+            result = func()
+            snapshot = tracemalloc.take_snapshot()
+            _size, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return result, snapshot, {"peak_kib": round(peak / 1024, 1)}
+    finally:
+        memory_lock.release()
+
+
+PROFILERS = {"cpu": profile_cpu, "memory": profile_memory}
+
+
+def write_dump(directory, mode, profile, info, max_files):
+    """
+    Writes the ``profile`` of ``mode`` with the ``info`` dict of the
+    request to ``directory``, and removes the oldest dumps over
+    ``max_files``. Returns the name of the dump.
+
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = "%s-%s-%s" % (
+        time.strftime("%Y%m%d%H%M%S"),
+        mode,
+        uuid.uuid4().hex[:8],
+    )
+    path = os.path.join(directory, name)
+    if mode == "cpu":
+        profile.dump_stats(path + EXTENSIONS[mode])
+    else:
+        profile.dump(path + EXTENSIONS[mode])
+    with open(path + ".json", "w") as file:
+        json.dump(dict(info, name=name, mode=mode), file)
+    prune_dumps(directory, max_files)
+    return name
+
+
+def list_dumps(directory):
+    """
+    Returns the info dicts of the dumps in ``directory``, oldest first.
+
+    """
+    if not directory or not os.path.isdir(directory):
+        return []
+    dumps = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as file:
+                dumps.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return dumps
+
+
+def remove_dump(directory, name):
+    for extension in (".json",) + tuple(EXTENSIONS.values()):
+        try:
+            os.remove(os.path.join(directory, name + extension))
+        except FileNotFoundError:
+            pass
+
+
+def prune_dumps(directory, max_files):
+    """
+    Removes the oldest dumps in ``directory`` over ``max_files``.
+
+    """
+    dumps = list_dumps(directory)
+    for info in dumps[: max(len(dumps) - max_files, 0)]:
+        remove_dump(directory, info["name"])
+
+
+def summarize_dump(directory, info, limit=20, sort="cumulative"):
+    """
+    Returns a text summary of the dump of ``info``, the functions with the
+    highest ``sort`` time of a CPU profile or the lines which allocated the
+    most memory.
+
+    """
+    path = os.path.join(directory, info["name"] + EXTENSIONS[info["mode"]])
+    if info["mode"] == "cpu":
+        stream = io.StringIO()
+        stats = pstats.Stats(path, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+    statistics = tracemalloc.Snapshot.load(path).statistics("lineno")
+    total = sum(statistic.size for statistic in statistics)
+    lines = [
+        "Kept %.1f KiB allocated by %d lines."
+        % (total / 1024, len(statistics))
+    ]
+    lines.extend(str(statistic) for statistic in statistics[:limit])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+""" Manifest Query Inspection
+"""
+
+import contextlib
+import contextvars
+import functools
+import logging
+import time
+
+from django.db import DatabaseError, connections, transaction
+
+from manifest import defaults
+
+logger = logging.getLogger("manifest.queries")
+
+# Maximum length of the SQL and the query plans in the log.
+MAX_LENGTH = 2000
+
+_operations = contextvars.ContextVar("manifest_operations", default=())
+_explaining = contextvars.ContextVar("manifest_explaining", default=False)
+
+
+class operation:  # pylint: disable=invalid-name
+    """
+    Tags the queries run in a context manager or a decorated function with
+    the operation ``name``.
+
+    Nested operations are joined with ``/`` from the outermost one, e.g.
+    ``AuthLoginView/authenticate``.
+
+    """
+
+    __slots__ = ("name", "token")
+
+    def __init__(self, name):
+        self.name = name
+        self.token = None
+
+    def __enter__(self):
+        self.token = _operations.set(_operations.get() + (self.name,))
+        return self
+
+    def __exit__(self, *exc_info):
+        _operations.reset(self.token)
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with operation(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def get_operation():
+    """
+    Returns the name of the current operation, or ``None``.
+
+    """
+    return "/".join(_operations.get()) or None
+
+
+def truncate(value):
+    if len(value) <= MAX_LENGTH:
+        return value
+    return value[:MAX_LENGTH] + "..."
+
+
+class QueryInspector:
+    """
+    Database execute wrapper which logs the queries slower than
+    ``MANIFEST_SLOW_QUERY_MS`` setting, and the query which crosses
+    ``MANIFEST_QUERY_COUNT_LIMIT``, to the ``manifest.queries`` logger
+    with the current operation.
+
+    Query plans of the slow ``SELECT`` queries are logged if
+    ``MANIFEST_SLOW_QUERY_EXPLAIN`` setting is ``True``.
+
+    """
+
+    def __init__(self, label=None):
+        self.label = label
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if _explaining.get():
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        milliseconds = (time.perf_counter() - started) * 1000
+        self.count += 1
+        if milliseconds >= defaults.MANIFEST_SLOW_QUERY_MS:
+            self.log_slow_query(
+                context["connection"], sql, params, many, milliseconds
+            )
+        if self.count == defaults.MANIFEST_QUERY_COUNT_LIMIT + 1:
+            self.log_count_limit(sql)
+        return result
+
+    def explain(self, connection, sql, params):
+        """
+        Returns the query plan of a ``SELECT`` query, or ``None``.
+
+        """
+        if not sql.lstrip().upper().startswith("SELECT"):
+            return None
+        token = _explaining.set(True)
+        try:
+            # A failed query must not break the transaction of the request.
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "%s %s" % (connection.ops.explain_query_prefix(), sql),
+                        params,
+                    )
+                    rows = cursor.fetchall()
+        except DatabaseError:
+            return None
+        finally:
+            _explaining.reset(token)
+        return truncate(
+            "\n".join(" ".join(str(column) for column in row) for row in rows)
+        )
+
+    def log_slow_query(self, connection, sql, params, many, milliseconds):
+        plan = None
+        if defaults.MANIFEST_SLOW_QUERY_EXPLAIN and not many:
+            plan = self.explain(connection, sql, params)
+        operation_name = get_operation()
+        logger.warning(
+            "Slow query in %s%s: %.2f ms %s%s",
+            operation_name or "unknown operation",
+            " of %s" % self.label if self.label else "",
+            milliseconds,
+            truncate(sql),
+            "\n%s" % plan if plan else "",
+            extra={
+                "operation": operation_name,
+                "label": self.label,
+                "duration_ms": round(milliseconds, 2),
+                "sql": truncate(sql),
+                "plan": plan,
+            },
+        )
+
+    def log_count_limit(self, sql):
+        operation_name = get_operation()
+        logger.warning(
+            "Query count exceeded %d in %s%s: %s",
+            defaults.MANIFEST_QUERY_COUNT_LIMIT,
+            operation_name or "unknown operation",
+            " of %s" % self.label if self.label else "",
+            truncate(sql),
+            extra={
+                "operation": operation_name,
+                "label": self.label,
+                "count": self.count,
+                "sql": truncate(sql),
+            },
+        )
+
+
+@contextlib.contextmanager
+def inspect_queries(label=None):
+    """
+    Inspects the queries of every database connection of the current
+    thread with a :class:`QueryInspector`, which is returned.
+
+    """
+    inspector = QueryInspector(label)
+    with contextlib.ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(inspector))
+        yield inspector
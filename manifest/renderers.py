@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+""" Manifest REST API Renderers
+"""
+
+import decimal
+import functools
+
+from django.utils.encoding import force_text
+from django.utils.functional import Promise
+
+from djangorestframework_camel_case.settings import (
+    api_settings as camel_case_settings,
+)
+from djangorestframework_camel_case.util import (
+    camelize_re,
+    underscore_to_camel,
+)
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@functools.lru_cache(maxsize=2048)
+def camelize_key(key):
+    """
+    Returns the camel case of a snake case ``key``. Keys are converted once
+    and cached, since responses repeat the same serializer field names.
+
+    """
+    return camelize_re.sub(underscore_to_camel, key)
+
+
+class CamelCaseJSONRenderer(JSONRenderer):
+    """
+    Renders the keys of the data in camel case, byte for byte the same as
+    ``djangorestframework_camel_case.render.CamelCaseJSONRenderer``.
+
+    Keys are renamed with :func:`camelize_key` while the data is prepared
+    for the encoder in a single walk. The data is encoded with ``orjson``
+    if it is installed, unless it contains floats or needs an indent, which
+    ``orjson`` formats differently. Otherwise, or if ``orjson`` can't encode
+    the data, it is encoded with ``json`` by ``JSONRenderer``.
+
+    """
+
+    def camelize(self, data, state):
+        """
+        Returns ``data`` with camel case keys and sets ``state["floats"]``
+        if it contains floats or decimals.
+
+        """
+        if isinstance(data, Promise):
+            data = force_text(data)
+        if isinstance(data, dict):
+            ignore_fields = state["ignore_fields"]
+            camelized = {}
+            for key, value in data.items():
+                if isinstance(key, Promise):
+                    key = force_text(key)
+                if isinstance(key, str) and "_" in key:
+                    new_key = camelize_key(key)
+                else:
+                    new_key = key
+                if key in ignore_fields or new_key in ignore_fields:
+                    camelized[new_key] = value
+                else:
+                    camelized[new_key] = self.camelize(value, state)
+            return camelized
+        if isinstance(data, (str, int, bool)) or data is None:
+            return data
+        if isinstance(data, (float, decimal.Decimal)):
+            # Decimals are encoded as floats too.
+            state["floats"] = True
+            return data
+        try:
+            iterator = iter(data)
+        except TypeError:
+            return data
+        return [self.camelize(item, state) for item in iterator]
+
+    def encode(self, data):
+        """
+        Encodes ``data`` with ``orjson``, or returns ``None`` if it can't be
+        encoded the same as ``json``.
+
+        """
+        try:
+            return orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                # Leave the types orjson would encode differently to the
+                # encoder of the renderer.
+                option=(
+                    orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_PASSTHROUGH_DATACLASS
+                ),
+            )
+        except orjson.JSONEncodeError:
+            return None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        state = {
+            "floats": False,
+            "ignore_fields": (
+                camel_case_settings.JSON_UNDERSCOREIZE.get("ignore_fields")
+                or ()
+            ),
+        }
+        data = self.camelize(data, state)
+        # pylint: disable=bad-continuation
+        if (
+            orjson is None
+            or state["floats"]
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = self.encode(data)
+        if ret is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same as ``JSONRenderer``, escape the line separators which are not
+        # valid in javascript strings.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
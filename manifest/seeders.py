@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+""" Manifest User Seeders
+"""
+
+import datetime
+import hashlib
+import io
+import posixpath
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from PIL import Image
+from pytz import common_timezones
+
+from manifest import defaults
+from manifest.managers import get_token_model
+from manifest.utils import get_image_path
+
+FIRST_NAMES = (
+    "Ada",
+    "Alan",
+    "Ayşe",
+    "Carlos",
+    "Elif",
+    "Grace",
+    "Hana",
+    "Ivan",
+    "Jane",
+    "John",
+    "Linus",
+    "Mehmet",
+    "Mei",
+    "Olga",
+    "Priya",
+    "Zeynep",
+)
+
+LAST_NAMES = (
+    "Demir",
+    "García",
+    "Hopper",
+    "Ivanova",
+    "Kaya",
+    "Lovelace",
+    "Müller",
+    "Nakamura",
+    "Patel",
+    "Smith",
+    "Torvalds",
+    "Turing",
+    "Wang",
+    "Yılmaz",
+)
+
+EMAIL_DOMAINS = ("example.com", "example.net", "example.org")
+
+
+class UserSeeder:
+    """
+    Creates ``count`` synthetic users for load testing and benchmarks.
+
+    Users are spread across the account states of ``states`` by their
+    weights, and some of them have a picture, a birth date or a locale
+    and a timezone other than the defaults. Every user has the same
+    password, which is hashed only once, and users are inserted with
+    ``bulk_create`` in batches of ``batch_size``.
+
+    Users are generated from a random generator with ``seed``, so the
+    same arguments create the same users, apart from the dates which are
+    relative to the current time.
+
+    :param count:
+        Number of users to create.
+
+    :param seed:
+        Seed of the random generator.
+
+    :param prefix:
+        Prefix of the usernames which are numbered from ``start``.
+
+    :param password:
+        Password of the users.
+
+    :param batch_size:
+        Number of users inserted at once.
+
+    """
+
+    # Account states and their weights.
+    states = (
+        ("active", 70),
+        ("pending", 10),
+        ("expired", 10),
+        ("email_change", 10),
+    )
+    picture_ratio = 0.3
+    locale_ratio = 0.3
+
+    def __init__(
+        self,
+        count,
+        seed=0,
+        prefix="user",
+        start=0,
+        password="password",
+        batch_size=5000,
+    ):
+        self.count = count
+        self.seed = seed
+        self.prefix = prefix
+        self.start = start
+        self.password = password
+        self.batch_size = batch_size
+        self.model = get_user_model()
+        self.now = timezone.now()
+
+    def get_picture(self):
+        """
+        Returns the name of a picture in the picture storage which is shared
+        by the users with a picture, saving it on the first call.
+
+        """
+        name = posixpath.join(
+            posixpath.dirname(get_image_path(self.model(), "seed.jpg")),
+            "seed.jpg",
+        )
+        storage = self.model._meta.get_field("picture").storage
+        if not storage.exists(name):
+            buffer = io.BytesIO()
+            Image.new("RGB", (256, 256), (128, 128, 128)).save(buffer, "JPEG")
+            name = storage.save(name, ContentFile(buffer.getvalue()))
+        return name
+
+    @staticmethod
+    def make_key(rng):
+        return hashlib.sha1(
+            rng.getrandbits(160).to_bytes(20, "big")
+        ).hexdigest()
+
+    def iter_users(self):
+        """
+        Yields unsaved users with their account state.
+
+        """
+        rng = random.Random(self.seed)
+        password = make_password(self.password)
+        picture = self.get_picture() if self.picture_ratio else None
+        names, weights = zip(*self.states)
+        languages = [code for code, _name in settings.LANGUAGES]
+        activation_days = defaults.MANIFEST_ACTIVATION_DAYS
+        # Keys are not stored with signed tokens.
+        use_keys = not defaults.MANIFEST_SIGNED_TOKENS
+        for index in range(self.start, self.start + self.count):
+            state = rng.choices(names, weights)[0]
+            username = "%s%d" % (self.prefix, index)
+            first_name = rng.choice(FIRST_NAMES)
+            last_name = rng.choice(LAST_NAMES)
+            user = self.model(
+                username=username,
+                email="%s@%s" % (username, rng.choice(EMAIL_DOMAINS)),
+                password=password,
+                first_name=first_name,
+                last_name=last_name,
+                is_active=state in ("active", "email_change"),
+            )
+            if state == "expired":
+                days = rng.randint(activation_days + 1, activation_days + 365)
+            elif state == "pending":
+                days = rng.randint(0, max(0, activation_days - 1))
+            else:
+                days = rng.randint(0, 3650)
+            user.date_joined = self.now - datetime.timedelta(
+                days=days, seconds=rng.randint(0, 86399)
+            )
+            if user.is_active:
+                user.activation_key = defaults.MANIFEST_ACTIVATED_LABEL
+                user.last_login = user.date_joined + datetime.timedelta(
+                    days=rng.randint(0, days)
+                )
+            elif use_keys:
+                user.activation_key = self.make_key(rng)
+            if state == "email_change":
+                user.email_unconfirmed = "%s.new@%s" % (
+                    username,
+                    rng.choice(EMAIL_DOMAINS),
+                )
+                user.email_confirmation_key_created = self.now - (
+                    datetime.timedelta(hours=rng.randint(0, 72))
+                )
+                if use_keys:
+                    user.email_confirmation_key = self.make_key(rng)
+            if picture and rng.random() < self.picture_ratio:
+                user.picture = picture
+            if rng.random() < 0.5:
+                user.gender = rng.choice("FM")
+                user.birth_date = datetime.date(
+                    rng.randint(1950, 2005), rng.randint(1, 12), 1
+                )
+            if rng.random() < self.locale_ratio:
+                user.locale = rng.choice(languages)
+                user.timezone = rng.choice(common_timezones)
+            yield user, state
+
+    def create_tokens(self, users):
+        """
+        Moves the keys of ``users`` to the :class:`Token
+        <manifest.models.Token>` table with a single insert.
+
+        """
+        token_model = get_token_model()
+        if users[0].pk is None:
+            # Primary keys are not set by ``bulk_create`` on every database.
+            pks = dict(
+                self.model.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list("username", "pk")
+            )
+            for user in users:
+                user.pk = pks[user.username]
+        tokens = []
+        for user in users:
+            for kind, field in (
+                (token_model.KIND_ACTIVATION, "activation_key"),
+                (
+                    token_model.KIND_EMAIL_CONFIRMATION,
+                    "email_confirmation_key",
+                ),
+            ):
+                key = getattr(user, field)
+                if not key or key == defaults.MANIFEST_ACTIVATED_LABEL:
+                    continue
+                tokens.append(
+                    token_model(
+                        user=user,
+                        kind=kind,
+                        key=token_model.hash_key(key),
+                        expires_at=token_model.objects.get_expiry(user, kind),
+                    )
+                )
+        token_model.objects.bulk_create(tokens)
+
+    def create_batch(self, users):
+        use_tokens = defaults.MANIFEST_USE_TOKEN_TABLE
+        keys = []
+        if use_tokens:
+            # Token keys are not stored in the user table.
+            for user in users:
+                keys.append((user.activation_key, user.email_confirmation_key))
+                if user.activation_key != defaults.MANIFEST_ACTIVATED_LABEL:
+                    user.activation_key = ""
+                user.email_confirmation_key = ""
+        with transaction.atomic(using=self.model.objects.db):
+            self.model.objects.bulk_create(users)
+            if use_tokens:
+                for user, (activation_key, confirmation_key) in zip(
+                    users, keys
+                ):
+                    user.activation_key = activation_key
+                    user.email_confirmation_key = confirmation_key
+                self.create_tokens(users)
+
+    def seed_users(self):
+        """
+        Creates the users and returns the number of users created in each
+        state.
+
+        """
+        counts = {name: 0 for name, _weight in self.states}
+        batch = []
+        for user, state in self.iter_users():
+            batch.append(user)
+            counts[state] += 1
+            if len(batch) >= self.batch_size:
+                self.create_batch(batch)
+                batch = []
+        if batch:
+            self.create_batch(batch)
+        return counts
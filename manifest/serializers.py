@@ -3,12 +3,15 @@
 """
 
 import datetime
+import re
+from collections import OrderedDict
 
 from django.contrib.auth import authenticate, get_user_model
-from django.contrib.auth.forms import PasswordResetForm, SetPasswordForm
+from django.contrib.auth.forms import SetPasswordForm
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Q
+from django.db import models
 from django.utils.encoding import force_text
+from django.utils.functional import cached_property
 from django.utils.http import urlsafe_base64_decode as uid_decoder
 from django.utils.translation import ugettext_lazy as _
 
@@ -16,12 +19,155 @@ from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from manifest import defaults
+from manifest.forms import PasswordResetForm
 from manifest.messages import EMAIL_IN_USE_MESSAGE
 from manifest.utils import validate_picture
 
 # Get the User model
 USER_MODEL = get_user_model()
 
+CAMEL_CASE_RE = re.compile(r"_([a-z0-9])")
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin which only serializes the fields listed in the comma
+    separated ``fields`` query parameter of ``GET`` requests, either in
+    snake or camel case.
+
+    ``Meta.model_fields`` maps the serializer fields which are not backed
+    by a model field, like method fields, to the model fields they read,
+    so the view can defer the rest with :meth:`get_model_fields`.
+
+    """
+
+    fields_query_param = "fields"
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """
+        Returns the set of requested field names, or ``None`` if all the
+        fields are requested.
+
+        """
+        if request is None or request.method != "GET":
+            return None
+        value = request.query_params.get(cls.fields_query_param)
+        if not value:
+            return None
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    @classmethod
+    def get_model_fields(cls, request):
+        """
+        Returns the names of the model fields needed to serialize the
+        requested fields, to be passed to ``QuerySet.only()``, or ``None``
+        if the queryset should not be limited.
+
+        """
+        if not cls.get_requested_fields(request):
+            return None
+        opts = cls.Meta.model._meta
+        concrete_fields = {field.name for field in opts.concrete_fields}
+        model_fields = getattr(cls.Meta, "model_fields", {})
+        names = {opts.pk.name}
+        for name, field in cls(context={"request": request}).fields.items():
+            for source in model_fields.get(name, [field.source]):
+                source = source.split(".")[0]
+                if source == "pk":
+                    continue
+                if source not in concrete_fields:
+                    # Can't tell which fields are read, so load all.
+                    return None
+                names.add(source)
+        return sorted(names)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.get_requested_fields(self.context.get("request"))
+        if not requested:
+            return fields
+        names = {}
+        for name in fields:
+            names[name] = name
+            names[CAMEL_CASE_RE.sub(lambda m: m.group(1).upper(), name)] = name
+        unknown = requested - set(names)
+        if unknown:
+            raise ValidationError(
+                {
+                    self.fields_query_param: _("Unknown fields: %s")
+                    % ", ".join(sorted(unknown))
+                }
+            )
+        requested = {names[name] for name in requested}
+        return OrderedDict(
+            (name, field)
+            for name, field in fields.items()
+            if name in requested
+        )
+
+
+class ValuesListSerializer(serializers.ListSerializer):
+    """
+    Read only list serializer which also serializes the rows of
+    ``QuerySet.values()``. Field accessors are prepared once per list,
+    so no model instances are created and string fields skip the field
+    machinery.
+
+    Rows which are model instances are serialized as usual.
+
+    """
+
+    @cached_property
+    def accessors(self):
+        accessors = []
+        # pylint: disable=protected-access
+        for field in self.child._readable_fields:
+            # pylint: disable=unidiomatic-typecheck
+            if isinstance(field, serializers.CharField) or type(field) in (
+                serializers.ReadOnlyField,
+                serializers.IntegerField,
+            ):
+                # The database already returns these as their representation.
+                convert = None
+            else:
+                convert = field.to_representation
+            accessors.append((field.field_name, field.source, convert))
+        return accessors
+
+    def get_columns(self):
+        """
+        Returns the names to be passed to ``QuerySet.values()``, or ``None``
+        if a field is not backed by a concrete model field.
+
+        """
+        opts = self.child.Meta.model._meta
+        concrete_fields = {field.name for field in opts.concrete_fields}
+        columns = []
+        for _name, source, _convert in self.accessors:
+            if source != "pk" and source not in concrete_fields:
+                return None
+            columns.append(source)
+        return columns
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+        rows = list(data)
+        if not rows or not isinstance(rows[0], dict):
+            return super().to_representation(rows)
+        accessors = self.accessors
+        representation = []
+        for row in rows:
+            item = OrderedDict()
+            for name, source, convert in accessors:
+                value = row[source]
+                if convert is not None and value is not None:
+                    value = convert(value)
+                item[name] = value
+            representation.append(item)
+        return representation
+
 
 class JWTSerializer(serializers.Serializer):
     """
@@ -122,10 +268,7 @@ class RegisterSerializer(serializers.Serializer):
         Validate that the email address is unique.
 
         """
-        # pylint: disable=bad-continuation
-        if get_user_model().objects.filter(
-            Q(email__iexact=value) | Q(email_unconfirmed__iexact=value)
-        ):
+        if get_user_model().objects.email_in_use(value):
             raise serializers.ValidationError(EMAIL_IN_USE_MESSAGE)
 
         return value
@@ -169,6 +312,14 @@ class ActivateSerializer(serializers.Serializer):
         return attrs
 
 
+class ActivateResendSerializer(serializers.Serializer):
+    """
+    Serializer for requesting the activation email again.
+    """
+
+    email = serializers.EmailField()
+
+
 class PasswordResetSerializer(serializers.Serializer):
     """
     Serializer for requesting a password reset e-mail.
@@ -357,7 +508,7 @@ class DateField(serializers.DateField):
         return datetime.datetime.strptime(value, "%d/%m/%Y")
 
 
-class AuthProfileSerializer(serializers.ModelSerializer):
+class AuthProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     first_name = serializers.CharField()
     last_name = serializers.CharField()
     gender = serializers.ChoiceField(
@@ -386,6 +537,7 @@ class AuthProfileSerializer(serializers.ModelSerializer):
             "locale",
             "avatar",
         )
+        model_fields = {"avatar": ["picture", "email"]}
 
     def get_avatar(self, obj):
         return self.context.get("request").build_absolute_uri(obj.avatar)
@@ -434,7 +586,7 @@ class PictureUploadSerializer(serializers.ModelSerializer):
         return validate_picture(value, serializers)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     User model w/o password
     """
@@ -443,3 +595,4 @@ class UserSerializer(serializers.ModelSerializer):
         model = USER_MODEL
         fields = ("pk", "username", "email", "first_name", "last_name")
         read_only_fields = ("email",)
+        list_serializer_class = ValuesListSerializer
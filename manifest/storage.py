@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+""" Manifest Storages
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import (
+    Storage,
+    default_storage,
+    get_storage_class,
+)
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+
+from manifest import defaults, metrics
+from manifest.timing import timed
+
+
+class LocalCache:
+    """
+    Size bounded, least recently used cache of files on local disk.
+
+    Files are written to a temporary file in the cache directory first and
+    moved into place with an atomic rename, so readers never see a partially
+    written file. The least recently used files are evicted when the total
+    size of the cache exceeds ``max_size`` bytes.
+
+    """
+
+    temp_prefix = ".tmp-"
+
+    def __init__(self, location, max_size):
+        self.location = os.path.abspath(location)
+        self.max_size = int(max_size)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        os.makedirs(self.location, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """
+        Rebuilds the index from the files already in the cache directory,
+        so a restarted process keeps its warm cache.
+
+        """
+        entries = []
+        for entry in os.scandir(self.location):
+            if not entry.is_file():
+                continue
+            if entry.name.startswith(self.temp_prefix):
+                # Leftover of an interrupted write.
+                self._remove(entry.path)
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, entry.name, stat.st_size))
+        with self._lock:
+            for _mtime, key, size in sorted(entries):
+                self._entries[key] = size
+                self._size += size
+            self._evict()
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def get_key(name):
+        return hashlib.sha1(name.encode("utf-8")).hexdigest()
+
+    @property
+    def size(self):
+        return self._size
+
+    def __contains__(self, name):
+        return self.get_key(name) in self._entries
+
+    def _evict(self):
+        while self._size > self.max_size and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self._remove(os.path.join(self.location, key))
+
+    def get(self, name):
+        """
+        Returns the local path of the cached copy of ``name`` and marks it
+        as recently used, or ``None`` if it is not cached.
+
+        """
+        key = self.get_key(name)
+        path = os.path.join(self.location, key)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            # Keep the recency on disk too, it is used to rebuild the index.
+            os.utime(path)
+        except FileNotFoundError:
+            self.discard(name)
+            return None
+        return path
+
+    def get_size(self, name):
+        return self._entries.get(self.get_key(name))
+
+    def put(self, name, content):
+        """
+        Stores ``content`` as the cached copy of ``name`` and returns its
+        local path, or ``None`` if the content is larger than the cache.
+
+        """
+        key = self.get_key(name)
+        path = os.path.join(self.location, key)
+        descriptor, temp_path = tempfile.mkstemp(
+            prefix=self.temp_prefix, dir=self.location
+        )
+        size = 0
+        try:
+            with os.fdopen(descriptor, "wb") as temp_file:
+                for chunk in content.chunks():
+                    temp_file.write(chunk)
+                    size += len(chunk)
+            if size > self.max_size:
+                self._remove(temp_path)
+                return None
+            os.replace(temp_path, path)
+        except BaseException:
+            self._remove(temp_path)
+            raise
+        with self._lock:
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._evict()
+            if key not in self._entries:
+                return None
+        return path
+
+    def discard(self, name):
+        key = self.get_key(name)
+        with self._lock:
+            self._size -= self._entries.pop(key, 0)
+        self._remove(os.path.join(self.location, key))
+
+    def clear(self):
+        with self._lock:
+            for key in self._entries:
+                self._remove(os.path.join(self.location, key))
+            self._entries.clear()
+            self._size = 0
+
+
+@deconstructible
+class CachedStorage(Storage):
+    """
+    Storage wrapper that keeps a local disk cache of recently read files.
+
+    All writes go to the wrapped storage, defined by ``storage`` or
+    ``MANIFEST_PICTURE_STORAGE`` setting and defaults to ``default_storage``.
+    Reads are served from a :class:`LocalCache` in ``location`` or
+    ``MANIFEST_STORAGE_CACHE_DIR`` setting, limited to ``max_size`` or
+    ``MANIFEST_STORAGE_CACHE_SIZE`` bytes.
+
+    If no cache location is configured, the storage is a plain proxy of the
+    wrapped storage.
+
+    """
+
+    def __init__(self, storage=None, location=None, max_size=None):
+        self._storage = storage
+        self._location = location
+        self._max_size = max_size
+
+    @cached_property
+    def storage(self):
+        storage = self._storage or defaults.MANIFEST_PICTURE_STORAGE
+        if storage is None:
+            return default_storage
+        if isinstance(storage, str):
+            return get_storage_class(storage)()
+        return storage
+
+    @cached_property
+    def cache(self):
+        location = self._location or defaults.MANIFEST_STORAGE_CACHE_DIR
+        if not location:
+            return None
+        return LocalCache(
+            location, self._max_size or defaults.MANIFEST_STORAGE_CACHE_SIZE
+        )
+
+    @timed("storage")
+    def _open(self, name, mode="rb"):
+        cache = self.cache
+        if cache is None or any(flag in mode for flag in "wa+"):
+            return self.storage.open(name, mode)
+        path = cache.get(name)
+        if path is None:
+            with self.storage.open(name, "rb") as source:
+                path = cache.put(name, source)
+            if path is None:
+                return self.storage.open(name, mode)
+        try:
+            return File(open(path, mode), name=name)
+        except FileNotFoundError:
+            # Evicted by another thread right after it was cached.
+            return self.storage.open(name, mode)
+
+    @timed("storage")
+    def save(self, name, content, max_length=None):
+        name = self.storage.save(name, content, max_length=max_length)
+        if self.cache is not None:
+            self.cache.discard(name)
+        # Mugshots are generated by imagekit into its cache directory.
+        if name.startswith(
+            getattr(settings, "IMAGEKIT_CACHEFILE_DIR", "CACHE/images")
+        ):
+            metrics.MUGSHOTS_GENERATED.inc()
+        return name
+
+    @timed("storage")
+    def delete(self, name):
+        self.storage.delete(name)
+        if self.cache is not None:
+            self.cache.discard(name)
+
+    @timed("storage")
+    def exists(self, name):
+        if self.cache is not None and name in self.cache:
+            return True
+        return self.storage.exists(name)
+
+    @timed("storage")
+    def size(self, name):
+        if self.cache is not None:
+            size = self.cache.get_size(name)
+            if size is not None:
+                return size
+        return self.storage.size(name)
+
+    def get_valid_name(self, name):
+        return self.storage.get_valid_name(name)
+
+    def get_alternative_name(self, file_root, file_ext):
+        return self.storage.get_alternative_name(file_root, file_ext)
+
+    def get_available_name(self, name, max_length=None):
+        return self.storage.get_available_name(name, max_length=max_length)
+
+    def generate_filename(self, filename):
+        return self.storage.generate_filename(filename)
+
+    def path(self, name):
+        return self.storage.path(name)
+
+    def listdir(self, path):
+        return self.storage.listdir(path)
+
+    def url(self, name):
+        return self.storage.url(name)
+
+    def get_accessed_time(self, name):
+        return self.storage.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.storage.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.storage.get_modified_time(name)
+
+
+picture_storage = CachedStorage()
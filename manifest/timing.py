@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+""" Manifest Request Timing
+"""
+
+import contextvars
+import functools
+import time
+
+# Descriptions of the phases of a request, in the order of the header.
+PHASES = {
+    "db": "Database",
+    "hash": "Password hashing",
+    "render": "Rendering",
+    "email": "Email",
+    "storage": "Storage",
+}
+
+_timings = contextvars.ContextVar("manifest_timings", default=None)
+
+
+class Timings:
+    """
+    Durations and counts of the phases of a request.
+
+    Phases may overlap, e.g. saving an upgraded password hash runs a query
+    while hashing, so their sum may exceed the total.
+
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+        self.active = set()
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """
+        Database execute wrapper timing the queries as ``db``.
+
+        """
+        with timed("db"):
+            return execute(sql, params, many, context)
+
+    def as_dict(self):
+        """
+        Returns the milliseconds and counts of the phases by name.
+
+        """
+        return {
+            name: {
+                "ms": round(self.durations[name] * 1000, 2),
+                "count": self.counts[name],
+            }
+            for name in sorted(self.durations, key=get_order)
+        }
+
+    def as_header(self, total=None):
+        """
+        Returns the value of a ``Server-Timing`` header with the phases and
+        ``total`` seconds.
+
+        """
+        metrics = [
+            '%s;dur=%.2f;desc="%s"'
+            % (name, self.durations[name] * 1000, PHASES.get(name, name))
+            for name in sorted(self.durations, key=get_order)
+        ]
+        if total is not None:
+            metrics.append('total;dur=%.2f;desc="Total"' % (total * 1000))
+        return ", ".join(metrics)
+
+
+def get_order(name):
+    try:
+        return list(PHASES).index(name)
+    except ValueError:
+        return len(PHASES)
+
+
+def get_timings():
+    """
+    Returns the :class:`Timings` of the current request, or ``None`` if
+    timing is not started.
+
+    """
+    return _timings.get()
+
+
+def start():
+    """
+    Starts timing the phases of the current context and returns the token
+    to :func:`stop` it.
+
+    """
+    return _timings.set(Timings())
+
+
+def stop(token):
+    """
+    Stops timing the phases and returns the collected :class:`Timings`.
+
+    """
+    timings = _timings.get()
+    _timings.reset(token)
+    return timings
+
+
+class timed:  # pylint: disable=invalid-name
+    """
+    Times a phase of the current request as a context manager or as a
+    decorator. It costs a context variable lookup if timing is not started.
+
+    Nested phases with the same name are timed once by the outermost one.
+
+    """
+
+    __slots__ = ("name", "timings", "started")
+
+    def __init__(self, name):
+        self.name = name
+        self.timings = None
+        self.started = None
+
+    def __enter__(self):
+        timings = _timings.get()
+        if timings is not None and self.name not in timings.active:
+            timings.active.add(self.name)
+            self.timings = timings
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.add(self.name, time.perf_counter() - self.started)
+            self.timings.active.discard(self.name)
+            self.timings = None
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _timings.get() is None:
+                return func(*args, **kwargs)
+            with timed(name):
+                return func(*args, **kwargs)
+
+        return wrapper
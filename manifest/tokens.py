@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+""" Manifest Signed Tokens
+"""
+
+import time
+
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+
+from manifest import defaults
+
+# Timestamps are counted from 2001-01-01, like Django's password reset
+# tokens, to keep them short.
+EPOCH = 978307200
+
+
+class SignedTokenGenerator:
+    """
+    Generates and checks stateless, signed and timestamped tokens which
+    are used in links instead of keys stored in the database if
+    ``MANIFEST_SIGNED_TOKENS`` setting is ``True``.
+
+    A token is ``<timestamp>_<state>_<signature>``. The signature covers
+    the username, the timestamp and the state, so a forged or expired token
+    is rejected by :meth:`check_signature` without a database query. The
+    state is a digest of the user fields which change when the token is
+    used, so :meth:`check_token` rejects a replayed token.
+
+    """
+
+    key_salt = "manifest.tokens.SignedTokenGenerator"
+    state_fields = ()
+
+    def get_timeout_days(self):
+        raise NotImplementedError
+
+    def get_timeout(self):
+        return self.get_timeout_days() * 86400
+
+    @staticmethod
+    def get_timestamp():
+        return int(time.time()) - EPOCH
+
+    def get_state(self, user):
+        value = "|".join(
+            str(getattr(user, field)) for field in self.state_fields
+        )
+        return salted_hmac(self.key_salt + ".state", value).hexdigest()[::2]
+
+    def get_signature(self, username, timestamp, state):
+        return salted_hmac(
+            self.key_salt + ".signature",
+            "%s|%s|%s" % (username, timestamp, state),
+        ).hexdigest()
+
+    def make_token(self, user):
+        """
+        Returns a token for the current state of ``user``.
+
+        """
+        timestamp = int_to_base36(self.get_timestamp())
+        state = self.get_state(user)
+        signature = self.get_signature(user.username, timestamp, state)
+        return "%s_%s_%s" % (timestamp, state, signature)
+
+    def check_signature(self, username, token):
+        """
+        Checks the signature and the age of ``token`` for ``username``
+        without accessing the database.
+
+        """
+        try:
+            timestamp, state, signature = token.split("_")
+            issued = base36_to_int(timestamp)
+        except ValueError:
+            return False
+        # pylint: disable=bad-continuation
+        if not constant_time_compare(
+            self.get_signature(username, timestamp, state), signature
+        ):
+            return False
+        return 0 <= self.get_timestamp() - issued < self.get_timeout()
+
+    def check_token(self, user, token):
+        """
+        Checks that ``token`` is valid and issued for the current state of
+        ``user``.
+
+        """
+        if not self.check_signature(user.username, token):
+            return False
+        return constant_time_compare(token.split("_")[1], self.get_state(user))
+
+
+class ActivationTokenGenerator(SignedTokenGenerator):
+    """
+    Signed tokens for account activation links, valid for
+    ``MANIFEST_ACTIVATION_DAYS``. Activating the account changes the state,
+    so a token can only be used once.
+
+    """
+
+    key_salt = "manifest.tokens.ActivationTokenGenerator"
+    state_fields = ("pk", "is_active", "activation_key")
+
+    def get_timeout_days(self):
+        return defaults.MANIFEST_ACTIVATION_DAYS
+
+
+class EmailConfirmationTokenGenerator(SignedTokenGenerator):
+    """
+    Signed tokens for email change confirmation links, valid for
+    ``MANIFEST_EMAIL_CONFIRMATION_DAYS``. A token is invalidated when the
+    email or the unconfirmed email of the user changes.
+
+    """
+
+    key_salt = "manifest.tokens.EmailConfirmationTokenGenerator"
+    state_fields = (
+        "pk",
+        "email",
+        "email_unconfirmed",
+        "email_confirmation_key_created",
+    )
+
+    def get_timeout_days(self):
+        return defaults.MANIFEST_EMAIL_CONFIRMATION_DAYS
+
+
+activation_token_generator = ActivationTokenGenerator()
+email_confirmation_token_generator = EmailConfirmationTokenGenerator()
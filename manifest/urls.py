@@ -7,7 +7,11 @@ from django.urls import re_path
 from django.views.generic import TemplateView
 
 from manifest import defaults, views
-from manifest.forms import PictureUploadForm, RegionUpdateForm
+from manifest.forms import (
+    PasswordResetForm,
+    PictureUploadForm,
+    RegionUpdateForm,
+)
 
 urlpatterns = [
     # fmt: off
@@ -38,6 +42,17 @@ urlpatterns = [
                 defaults.MANIFEST_ACTIVATION_DAYS}),
         name="auth_register_complete"),
 
+    re_path(
+        r"^activate/resend/$",
+        views.AuthActivateResendView.as_view(),
+        name="auth_activate_resend"),
+
+    re_path(
+        r"^activate/resend/done/$",
+        TemplateView.as_view(
+            template_name="manifest/auth_activate_resend_done.html"),
+        name="auth_activate_resend_done"),
+
     re_path(
         r"^activate/(?P<username>\w+)/(?P<token>\w+)/$",
         views.AuthActivateView.as_view(),
@@ -54,6 +69,7 @@ urlpatterns = [
     re_path(
         r"^password/reset/$",
         auth_views.PasswordResetView.as_view(
+            form_class=PasswordResetForm,
             template_name="manifest/password_reset_form.html",
             email_template_name="manifest/emails/password_reset_message.txt"),
         name="password_reset"),
@@ -151,5 +167,11 @@ urlpatterns = [
         r"^users/(?P<username>\w+)/$",
         views.UserDetailView.as_view(),
         name="user_detail"),
+
+    # Metrics
+    re_path(
+        r"^metrics/$",
+        views.MetricsView.as_view(),
+        name="metrics"),
     # fmt: on
 ]
@@ -10,7 +10,8 @@ from django.contrib.auth import (
 )
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth.views import LoginView, LogoutView
-from django.http import Http404
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.utils.decorators import method_decorator
@@ -18,13 +19,16 @@ from django.views.decorators.debug import sensitive_post_parameters
 from django.views.generic import (
     CreateView,
     DetailView,
+    FormView,
     ListView,
     TemplateView,
     UpdateView,
+    View,
 )
 
-from manifest import defaults, messages, signals
+from manifest import defaults, messages, metrics, signals
 from manifest.forms import (
+    ActivateResendForm,
     EmailChangeForm,
     LoginForm,
     ProfileUpdateForm,
@@ -38,6 +42,11 @@ from manifest.mixins import (
     SendActivationMailMixin,
     UserFormMixin,
 )
+from manifest.pagination import (
+    EstimatedCountPaginator,
+    InvalidCursor,
+    KeysetPaginator,
+)
 from manifest.utils import get_login_redirect
 
 
@@ -134,6 +143,7 @@ class AuthRegisterView(
 
     def form_valid(self, form):
         user = form.save()
+        metrics.REGISTRATIONS.inc()
         signals.REGISTRATION_COMPLETE.send(
             sender=None, user=user, request=self.request
         )
@@ -184,6 +194,41 @@ class AuthActivateView(TemplateView, MessageMixin):
         return super().get(request, *args, **kwargs)
 
 
+# pylint: disable=bad-continuation,too-many-ancestors
+class AuthActivateResendView(
+    FormView, SecureRequiredMixin, MessageMixin, SendActivationMailMixin
+):
+    """Resend the activation email of a pending account.
+
+    Repeated requests for the same email address in
+    ``MANIFEST_ACTIVATION_RESEND_COOLDOWN`` seconds send a single email.
+    The response is the same whether an account is found or not, so the
+    view doesn't reveal registered email addresses.
+
+    Redirects to ``success_url`` if it is defined, else redirects to
+    ``auth_activate_resend_done`` view.
+    """
+
+    form_class = ActivateResendForm
+    template_name = "manifest/auth_activate_resend.html"
+    success_message = messages.AUTH_ACTIVATE_RESEND_SUCCESS
+    success_url = None
+
+    email_subject_template_name = (
+        "manifest/emails/activation_email_subject.txt"
+    )
+    email_message_template_name = (
+        "manifest/emails/activation_email_message.txt"
+    )
+
+    def form_valid(self, form):
+        self.resend_activation_mail(form.cleaned_data["email"])
+        self.set_success_message(self.success_message)
+        if self.success_url:
+            return redirect(self.success_url)
+        return redirect(reverse("auth_activate_resend_done"))
+
+
 class AuthProfileView(DetailView, LoginRequiredMixin):
     """Detail view for current user account
 
@@ -313,6 +358,8 @@ class UserListView(ListView):
     queryset = get_user_model().objects.get_visible_profiles()
     template_name = "manifest/user_list.html"
     paginate_by = 10
+    paginator_class = EstimatedCountPaginator
+    cursor_kwarg = "cursor"
 
     def dispatch(self, request, *args, **kwargs):
         if (
@@ -322,6 +369,28 @@ class UserListView(ListView):
             raise Http404
         return super().dispatch(request, *args, **kwargs)
 
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginates with :class:`KeysetPaginator
+        <manifest.pagination.KeysetPaginator>` if
+        ``MANIFEST_CURSOR_PAGINATION`` setting is ``True``.
+        """
+        if not defaults.MANIFEST_CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["is_keyset"] = isinstance(
+            context["paginator"], KeysetPaginator
+        )
+        return context
+
 
 class UserDetailView(DetailView):
     """Displays an active user profile by username.
@@ -343,3 +412,21 @@ class UserDetailView(DetailView):
         ):
             raise Http404
         return super().dispatch(request, *args, **kwargs)
+
+
+class MetricsView(View):
+    """Exposes the metrics in Prometheus text format to staff users.
+
+    View that returns the metrics of every process of the server
+    if ``MANIFEST_METRICS_VIEW`` setting is ``True``,
+    else raises Http404.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if not defaults.MANIFEST_METRICS_VIEW:
+            raise Http404
+        if not request.user.is_staff:
+            raise PermissionDenied
+        return HttpResponse(
+            metrics.REGISTRY.to_text(), content_type=metrics.CONTENT_TYPE
+        )
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+""" Manifest Benchmarks
+
+Benchmarks are not collected by the test runner. Run them as modules, eg.::
+
+    DJANGO_SETTINGS_MODULE=tests.settings python -m tests.benchmarks.bench_mail
+"""
+
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Benchmark modules import models, so apps must be ready before them.
+django.setup()
+
+
+def setup():
+    """Creates the test database and loads the ``test`` fixture.
+    """
+    # pylint: disable=import-outside-toplevel,unused-import
+    import tests.base  # noqa: F401
+
+    call_command("loaddata", "test", verbosity=0)
+
+
+def timeit(func, number):
+    """Calls ``func`` ``number`` times and returns the elapsed seconds.
+    """
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - started
+
+
+def report(name, number, seconds):
+    print(
+        "%(name)-24s %(number)8d in %(seconds)7.3fs %(rate)10.1f/s"
+        % {
+            "name": name,
+            "number": number,
+            "seconds": seconds,
+            "rate": number / seconds if seconds else 0,
+        }
+    )
+
+
+def measure(func, number, warmup=3):
+    """Calls ``func`` ``warmup`` times and then ``number`` times, and
+    returns the rate, latency percentiles and queries of the measured calls.
+    """
+    for _ in range(warmup):
+        func()
+    timings, queries = [], []
+    for _ in range(number):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        queries.append(len(context))
+    percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "number": number,
+        "ops_per_second": round(number / sum(timings), 1),
+        "p50_ms": round(percentiles[49] * 1000, 3),
+        "p90_ms": round(percentiles[89] * 1000, 3),
+        "p99_ms": round(percentiles[98] * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+        "queries": max(queries),
+    }
+
+
+def get_environment():
+    """Returns the versions and the database the results depend on.
+    """
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "host": platform.node(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Returns the regressions of ``results`` against ``baseline`` results,
+    which are rates lower by more than ``tolerance`` and more queries.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result["ops_per_second"] < previous["ops_per_second"] * (
+            1 - tolerance
+        ):
+            regressions.append(
+                "%s: %.1f/s, baseline %.1f/s"
+                % (name, result["ops_per_second"], previous["ops_per_second"])
+            )
+        if result["queries"] > previous["queries"]:
+            regressions.append(
+                "%s: %d queries, baseline %d"
+                % (name, result["queries"], previous["queries"])
+            )
+    return regressions
+
+
+def load_results(path):
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def dump_results(results, file):
+    json.dump(
+        {"environment": get_environment(), "results": results},
+        file,
+        indent=2,
+        sort_keys=True,
+    )
+    file.write("\n")
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+""" Manifest Auth Flow Benchmark
+
+Drives the login, registration, activation, email confirmation and user
+list flows, and the template tags, with warmed up in-process clients and
+users created by :class:`UserSeeder <manifest.seeders.UserSeeder>`.
+
+Results are written as JSON with the rate, latency percentiles and the
+queries of each flow. Given a ``--baseline`` of previous results, flows
+which got slower by more than ``--tolerance`` or run more queries are
+reported and the benchmark exits with status 1::
+
+    python -m tests.benchmarks.bench_auth -o baseline.json
+    python -m tests.benchmarks.bench_auth -b baseline.json
+"""
+
+import argparse
+import itertools
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.template import Context, Template
+from django.test import Client, RequestFactory
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from manifest.forms import RegisterFormToS
+from manifest.seeders import UserSeeder
+from tests.benchmarks import (
+    compare,
+    dump_results,
+    load_results,
+    measure,
+    setup,
+)
+
+LOGIN = {"identification": "john", "password": "pass"}
+
+TEMPLATE = Template(
+    "{% load manifest %}"
+    '<a class="{% active_nav "user_list" %}">Users</a>'
+    '<a class="{% active_nav "profile_settings" %}">Settings</a>'
+    "{{ form|bootstrap_form }}"
+)
+
+
+def create_pending_users(prefix, count):
+    manager = get_user_model().objects
+    return iter(
+        [
+            manager.create_user(
+                "%s%d" % (prefix, index),
+                "%s%d@example.com" % (prefix, index),
+                "pass",
+            )
+            for index in range(count)
+        ]
+    )
+
+
+def create_email_changes(prefix, count):
+    users = []
+    for user in create_pending_users(prefix, count):
+        user.is_active = True
+        users.append(user.change_email("%s.new@example.com" % user.username))
+    return iter(users)
+
+
+def get_flows(number, warmup):
+    """Returns the flows by their name, as functions which run a single
+    operation.
+    """
+    count = number + warmup
+    counter = itertools.count()
+    client, api_client = Client(), APIClient()
+    activations = create_pending_users("activate", count)
+    confirmations = create_email_changes("confirm", count)
+    request = RequestFactory().get(reverse("user_list"))
+
+    def login():
+        client.post(reverse("auth_login"), LOGIN)
+        client.cookies.clear()
+
+    def login_api():
+        api_client.post(reverse("auth_login_api"), LOGIN)
+        api_client.cookies.clear()
+
+    def register_api():
+        index = next(counter)
+        api_client.post(
+            reverse("auth_register_api"),
+            {
+                "username": "register%d" % index,
+                "email": "register%d@example.com" % index,
+                "password1": "wonderland",
+                "password2": "wonderland",
+                "tos": True,
+            },
+        )
+        api_client.cookies.clear()
+
+    def activate_user():
+        user = next(activations)
+        get_user_model().objects.activate_user(
+            user.username, user.activation_key
+        )
+
+    def confirm_email():
+        user = next(confirmations)
+        get_user_model().objects.confirm_email(
+            user.username, user.email_confirmation_key
+        )
+
+    def user_list_api():
+        api_client.get(reverse("user_list_api"))
+
+    def template_tags():
+        TEMPLATE.render(
+            Context({"request": request, "form": RegisterFormToS()})
+        )
+
+    return {
+        "AuthLoginView": login,
+        "AuthLoginAPIView": login_api,
+        "AuthRegisterAPIView": register_api,
+        "activate_user": activate_user,
+        "confirm_email": confirm_email,
+        "UserListAPIView": user_list_api,
+        "template_tags": template_tags,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-n", "--number", type=int, default=50)
+    parser.add_argument("-w", "--warmup", type=int, default=3)
+    parser.add_argument("-u", "--users", type=int, default=10000)
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument("-b", "--baseline", default=None)
+    parser.add_argument("-t", "--tolerance", type=float, default=0.2)
+    parser.add_argument("flows", nargs="*")
+    args = parser.parse_args()
+
+    setup()
+    UserSeeder(args.users, prefix="bench").seed_users()
+    flows = get_flows(args.number, args.warmup)
+    results = {}
+    for name in args.flows or flows:
+        results[name] = measure(flows[name], args.number, args.warmup)
+        mail.outbox = []
+        print(
+            "%(name)-24s %(ops)10.1f/s p50 %(p50)8.2fms p99 %(p99)8.2fms "
+            "%(queries)3d queries"
+            % {
+                "name": name,
+                "ops": results[name]["ops_per_second"],
+                "p50": results[name]["p50_ms"],
+                "p99": results[name]["p99_ms"],
+                "queries": results[name]["queries"],
+            },
+            file=sys.stderr,
+        )
+    if args.output:
+        with open(args.output, "w") as file:
+            dump_results(results, file)
+    else:
+        dump_results(results, sys.stdout)
+    if args.baseline:
+        regressions = compare(
+            results, load_results(args.baseline), args.tolerance
+        )
+        for regression in regressions:
+            print("Regression %s" % regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
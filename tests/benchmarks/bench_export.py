@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+""" Manifest User Export Benchmark
+
+Exports increasing numbers of users with :class:`UserExporter
+<manifest.exporters.UserExporter>` and reports the rate and the peak of
+the memory allocated while streaming, which should stay flat.
+"""
+
+import argparse
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+
+from manifest.exporters import UserExporter
+from tests.benchmarks import report, setup, timeit
+
+
+def create_users(start, count):
+    get_user_model().objects.bulk_create(
+        [
+            get_user_model()(
+                username="export%d" % index,
+                email="export%d@example.com" % index,
+                is_active=True,
+            )
+            for index in range(start, start + count)
+        ]
+    )
+
+
+def export(export_format, compress):
+    exporter = UserExporter(
+        get_user_model().objects.order_by("pk"), export_format=export_format
+    )
+    for _data in exporter.iter_bytes(compress):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-s", "--steps", type=int, nargs="+")
+    args = parser.parse_args()
+
+    setup()
+    total = 0
+    for step in args.steps or (10000, 50000, 100000):
+        create_users(total, step - total)
+        total = step
+        for export_format in ("csv", "ndjson"):
+            for compress in (False, True):
+                tracemalloc.start()
+                seconds = timeit(lambda: export(export_format, compress), 1)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                name = "%s%s" % (export_format, ".gz" if compress else "")
+                report(name, total, seconds)
+                print("%24s peak memory %8.1f KiB" % ("", peak / 1024))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+""" Manifest User Import Benchmark
+
+Compares creating users one by one with ``create_user``, against
+:meth:`bulk_create_users
+<manifest.managers.AccountActivationManager.bulk_create_users>` with
+passwords hashed in the current process and in a process pool.
+"""
+
+import argparse
+
+from django.contrib.auth import get_user_model
+
+from tests.benchmarks import report, setup, timeit
+
+
+def get_rows(prefix, count):
+    return [
+        {
+            "username": "%s%d" % (prefix, index),
+            "email": "%s%d@example.com" % (prefix, index),
+            "password": "password%d" % index,
+        }
+        for index in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=200)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    setup()
+    manager = get_user_model().objects
+
+    def create_users():
+        for row in get_rows("single", args.number):
+            manager.create_user(row["username"], row["email"], row["password"])
+
+    def bulk_create_users(prefix, workers):
+        created, errors = manager.bulk_create_users(
+            get_rows(prefix, args.number), workers=workers
+        )
+        assert created == args.number and not errors
+
+    report("create_user", args.number, timeit(create_users, 1))
+    for name, prefix, workers in (
+        ("bulk_create_users", "bulk", 0),
+        ("bulk_create_users pool", "pool", args.workers),
+    ):
+        seconds = timeit(lambda: bulk_create_users(prefix, workers), 1)
+        report(name, args.number, seconds)
+
+
+if __name__ == "__main__":
+    main()
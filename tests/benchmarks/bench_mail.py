@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+""" Manifest Email Rendering Benchmark
+
+Compares rendering activation emails with ``render_to_string`` and a fresh
+site lookup for each email, against the cached :class:`EmailRenderer
+<manifest.mail.EmailRenderer>`.
+"""
+
+import argparse
+
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from django.template.loader import render_to_string
+from django.utils.translation import override
+
+from manifest.mail import email_renderer
+from manifest.utils import get_protocol
+from tests.benchmarks import report, setup, timeit
+
+SUBJECT = "manifest/emails/activation_email_subject.txt"
+MESSAGE = "manifest/emails/activation_email_message.txt"
+
+
+def render_uncached(user):
+    context = {"protocol": get_protocol(), "site": Site.objects.get_current()}
+    context.update({"user": user, "activation_key": user.activation_key})
+    subject = "".join(render_to_string(SUBJECT, context).splitlines())
+    return subject, render_to_string(MESSAGE, context)
+
+
+def render_cached(user):
+    context = email_renderer.get_context()
+    context.update({"user": user, "activation_key": user.activation_key})
+    subject = email_renderer.render_subject(SUBJECT, context)
+    return subject, email_renderer.render(MESSAGE, context)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+    user = get_user_model().objects.get(username="john")
+    # Only compare the rendering, not the database round trips.
+    Site.objects.clear_cache()
+    Site.objects.get_current()
+    assert render_uncached(user) == render_cached(user)
+
+    for locale in ("en", "tr"):
+        with override(locale):
+            for name, func in (
+                ("render_to_string", render_uncached),
+                ("email_renderer", render_cached),
+            ):
+                seconds = timeit(lambda: func(user), args.number)
+                report("%s [%s]" % (name, locale), args.number, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+""" Manifest JSON Renderer Benchmark
+
+Compares rendering a page of users with the renderer of
+``djangorestframework_camel_case``, against :class:`CamelCaseJSONRenderer
+<manifest.renderers.CamelCaseJSONRenderer>`.
+"""
+
+import argparse
+
+from djangorestframework_camel_case.render import (
+    CamelCaseJSONRenderer as LibraryRenderer,
+)
+
+from manifest.renderers import CamelCaseJSONRenderer
+from tests.benchmarks import report, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    parser.add_argument("-s", "--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    data = {
+        "count": args.page_size,
+        "next": "http://testserver/api/users/?page=2",
+        "previous": None,
+        "results": [
+            {
+                "pk": index,
+                "username": "user%d" % index,
+                "email": "user%d@example.com" % index,
+                "first_name": "First",
+                "last_name": "Last",
+            }
+            for index in range(args.page_size)
+        ],
+    }
+    assert LibraryRenderer().render(data) == CamelCaseJSONRenderer().render(
+        data
+    )
+
+    for name, renderer in (
+        ("camel case library", LibraryRenderer()),
+        ("manifest renderer", CamelCaseJSONRenderer()),
+    ):
+        report(
+            name,
+            args.number,
+            timeit(lambda: renderer.render(data), args.number),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+""" Manifest User List Serialization Benchmark
+
+Compares serializing a page of users from model instances with
+``UserSerializer``, against the rows of ``QuerySet.values()`` with
+:class:`ValuesListSerializer <manifest.serializers.ValuesListSerializer>`.
+Rates are reported in rows per second, including the query.
+"""
+
+import argparse
+
+from django.contrib.auth import get_user_model
+
+from manifest.serializers import UserSerializer
+from tests.benchmarks import report, setup, timeit
+
+
+def create_users(count):
+    get_user_model().objects.bulk_create(
+        [
+            get_user_model()(
+                username="bench%d" % index,
+                email="bench%d@example.com" % index,
+                first_name="First",
+                last_name="Last",
+                is_active=True,
+            )
+            for index in range(count)
+        ]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=200)
+    parser.add_argument("-s", "--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    setup()
+    create_users(args.page_size)
+    queryset = get_user_model().objects.order_by("pk")[: args.page_size]
+    columns = UserSerializer(many=True).get_columns()
+
+    def serialize_instances():
+        return UserSerializer(queryset.all(), many=True).data
+
+    def serialize_values():
+        return UserSerializer(queryset.values(*columns), many=True).data
+
+    assert serialize_instances() == serialize_values()
+
+    rows = args.number * args.page_size
+    for name, func in (
+        ("model instances", serialize_instances),
+        ("values", serialize_values),
+    ):
+        report(name, rows, timeit(func, args.number))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,10 @@
 
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.core.cache import cache
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
 
@@ -159,6 +162,43 @@ class AuthActivateAPIViewTests(ManifestAPITestCase):
         )
 
 
+class AuthActivateResendAPIViewTests(ManifestAPITestCase):
+    """Tests for :class:`AuthActivateResendAPIView
+    <manifest.api_views.AuthActivateResendAPIView>`.
+    """
+
+    serializer_data = data_dicts.REGISTER_FORM["valid"][0]
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_activate_resend_coalesced(self):
+        """Repeated ``POST`` requests in the cooldown should send one email.
+        """
+        self.client.post(
+            reverse("auth_register_api"), data=self.serializer_data
+        )
+        mail.outbox = []
+        for _i in range(3):
+            response = self.client.post(
+                reverse("auth_activate_resend_api"),
+                data={"email": self.serializer_data["email"]},
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_activate_resend_unknown(self):
+        """A ``POST`` with an unknown email should not reveal it.
+        """
+        response = self.client.post(
+            reverse("auth_activate_resend_api"),
+            data={"email": "nobody@example.com"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+
+
 class PasswordResetAPIViewTests(ManifestAPITestCase):
     """Tests for :class:`PasswordResetAPIView
     <manifest.api_views.PasswordResetAPIView>`.
@@ -338,6 +378,18 @@ class AuthProfileAPIViewTests(ManifestAPITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTrue("avatar" in response.json.keys())
 
+    def test_auth_profile_fields(self):
+        """A ``GET`` with ``fields`` should only return those fields.
+        """
+        self.client.login(
+            username=self.user_data[0], password=self.user_data[1]
+        )
+        response = self.client.get(
+            reverse("auth_profile_api"), {"fields": "firstName,avatar"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json), {"firstName", "avatar"})
+
     def test_profile_update_invalid(self):
         """A ``POST`` with an ivalid form should raise ``ValidationError``.
         """
@@ -594,6 +646,22 @@ class UserListAPIViewTests(ManifestAPITestCase):
             response = self.client.get(reverse("user_list_api"))
             self.assertEqual(response.status_code, 200)
 
+    def test_user_list_fields(self):
+        """A ``GET`` with ``fields`` should only select those fields.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("user_list_api"), {"fields": "username"}
+            )
+        self.assertEqual(response.status_code, 200)
+        for user in response.json["results"]:
+            self.assertEqual(set(user), {"username"})
+        self.assertNotIn('"email"', queries[-1]["sql"])
+        response = self.client.get(
+            reverse("user_list_api"), {"fields": "username,password"}
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_user_list_disabled(self):
         """A ``GET`` to the view should return ``404`` if
         ``MANIFEST_DISABLE_PROFILE_LIST`` setting is ``True``.
@@ -623,6 +691,16 @@ class UserDetailAPIViewTests(ManifestAPITestCase):
             )
             self.assertEqual(response.status_code, 200)
 
+    def test_user_detail_fields(self):
+        """A ``GET`` with ``fields`` should only return those fields.
+        """
+        response = self.client.get(
+            reverse("user_detail_api", kwargs={"username": "john"}),
+            {"fields": "pk,firstName"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json), {"pk", "firstName"})
+
     def test_user_detail_disabled(self):
         """A ``GET`` to the view should return ``404`` if
         ``MANIFEST_DISABLE_PROFILE_LIST`` setting is ``True``.
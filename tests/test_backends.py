@@ -73,6 +73,27 @@ class AuthenticationBackendTests(ManifestTestCase):
         )
         self.assertTrue(isinstance(result, get_user_model()))
 
+    def test_legacy_password(self):
+        """Should authenticate with a password of a legacy hasher and
+        upgrade it to the preferred hasher.
+        """
+        user = get_user_model().objects.get(username="john")
+        user.password = "md5_crypt$$1$saltsalt$qjXMvbEw8oaL.CzflDtaK/"
+        user.save()
+
+        result = self.backend.authenticate(
+            request=None, identification="john", password="invalid"
+        )
+        self.assertIsNone(result)
+
+        result = self.backend.authenticate(
+            request=None, identification="john", password="password"
+        )
+        self.assertEqual(result, user)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+        self.assertTrue(user.check_password("password"))
+
     def test_get_user(self):
         """Should return ``User`` object if user exists.
         """
@@ -3,11 +3,26 @@
 """
 
 import datetime
+import gzip
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.core.management import call_command
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.test import LiveServerTestCase
+from django.urls import reverse
 
-from manifest import defaults
+from manifest import defaults, profiling
+from manifest.loadtest import LoadTest, Stats, Worker
+from manifest.models import OutboxMessage, Token
+from manifest.seeders import UserSeeder
+from tests import data_dicts
 from tests.base import ManifestTestCase
 
 USER_MODEL = get_user_model()
@@ -43,3 +58,416 @@ class CleanExpiredTests(ManifestTestCase):
             ).count(),
             0,
         )
+
+    def test_clean_expired_confirmations(self):
+        """Should clear unconfirmed emails whose key is expired.
+        """
+        user = USER_MODEL.objects.get(pk=1)
+        user.change_email("john@newexample.com")
+        user.email_confirmation_key_created -= datetime.timedelta(
+            days=defaults.MANIFEST_EMAIL_CONFIRMATION_DAYS + 1
+        )
+        user.save()
+        call_command("clean_expired")
+        user = USER_MODEL.objects.get(pk=1)
+        self.assertFalse(user.email_unconfirmed)
+        self.assertFalse(user.email_confirmation_key)
+        self.assertIsNone(user.email_confirmation_key_created)
+
+
+class SendOutboxTests(ManifestTestCase):
+    """Tests for :mod:`manifest_send_outbox
+    <manifest.management.commands.manifest_send_outbox>`.
+    """
+
+    def test_send_outbox(self):
+        """Should send all the queued emails.
+        """
+        with self.defaults(MANIFEST_EMAIL_OUTBOX=True):
+            response = self.client.post(
+                reverse("auth_register"),
+                data=data_dicts.REGISTER_FORM["valid"][0],
+            )
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        call_command("manifest_send_outbox", once=True, batch_size=10)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            OutboxMessage.objects.get().status, OutboxMessage.STATUS_SENT
+        )
+
+
+class RemindActivationTests(ManifestTestCase):
+    """Tests for :mod:`manifest_remind_activation
+    <manifest.management.commands.manifest_remind_activation>`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.users = [
+            USER_MODEL.objects.create_user(
+                "user%d" % i, "user%d@example.com" % i, "pass"
+            )
+            for i in range(3)
+        ]
+        # Expired users should not be reminded.
+        expired = USER_MODEL.objects.create_user(
+            "expired", "expired@example.com", "pass"
+        )
+        expired.date_joined -= datetime.timedelta(
+            days=defaults.MANIFEST_ACTIVATION_DAYS + 1
+        )
+        expired.save()
+
+    def test_remind_activation(self):
+        """Should remind each pending user only once.
+        """
+        call_command(
+            "manifest_remind_activation", batch_size=2, stdout=io.StringIO()
+        )
+        self.assertEqual(
+            sorted(email.to[0] for email in mail.outbox),
+            sorted(user.email for user in self.users),
+        )
+        self.assertFalse(
+            USER_MODEL.objects.pending_activation()
+            .filter(activation_reminded__isnull=True)
+            .exists()
+        )
+        call_command("manifest_remind_activation", stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_regenerate_keys(self):
+        """Should send the newly generated activation keys.
+        """
+        call_command(
+            "manifest_remind_activation",
+            regenerate_keys=True,
+            stdout=io.StringIO(),
+        )
+        for user in self.users:
+            key = USER_MODEL.objects.get(pk=user.pk).activation_key
+            self.assertNotEqual(key, user.activation_key)
+            self.assertTrue(any(key in email.body for email in mail.outbox))
+
+
+class MigrateTokensTests(ManifestTestCase):
+    """Tests for :mod:`manifest_migrate_tokens
+    <manifest.management.commands.manifest_migrate_tokens>`.
+    """
+
+    def test_migrate_tokens(self):
+        """Should move the pending activation keys to the token table.
+        """
+        user = USER_MODEL.objects.create_user(
+            "alice", "alice@example.com", "swordfish"
+        )
+        call_command("manifest_migrate_tokens", batch_size=10)
+        self.assertEqual(
+            Token.objects.get().key, Token.hash_key(user.activation_key)
+        )
+        self.assertEqual(USER_MODEL.objects.get(pk=user.pk).activation_key, "")
+
+
+class ExportUsersTests(ManifestTestCase):
+    """Tests for :mod:`manifest_export_users
+    <manifest.management.commands.manifest_export_users>`.
+    """
+
+    def test_export_users(self):
+        """Should write the filtered users with the selected fields.
+        """
+        out = io.StringIO()
+        call_command(
+            "manifest_export_users",
+            fields="username,email",
+            filters=["username=john"],
+            stdout=out,
+        )
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            ["username,email", "john,john@example.com"],
+        )
+
+    def test_export_users_gzip(self):
+        """Should compress output files ending with ``.gz``.
+        """
+        output = os.path.join(tempfile.mkdtemp(), "users.ndjson.gz")
+        call_command("manifest_export_users", format="ndjson", output=output)
+        with gzip.open(output, "rt") as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual(len(lines), USER_MODEL.objects.count())
+        self.assertEqual(lines[0]["username"], "john")
+
+    def test_export_users_invalid(self):
+        """Should raise ``CommandError`` for private fields and bad filters.
+        """
+        for options in (
+            {"fields": "username,password"},
+            {"filters": ["unknown=1"]},
+            {"filters": ["password__startswith=pbkdf2"]},
+        ):
+            with self.assertRaises(CommandError):
+                call_command("manifest_export_users", **options)
+
+
+class ImportUsersTests(ManifestTestCase):
+    """Tests for :mod:`manifest_import_users
+    <manifest.management.commands.manifest_import_users>`.
+    """
+
+    def write(self, name, content):
+        path = os.path.join(tempfile.mkdtemp(), name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "wt") as file:
+            file.write(content)
+        return path
+
+    def test_import_users(self):
+        """Should create the users of a CSV file and report the errors.
+        """
+        path = self.write(
+            "users.csv",
+            "username,email,password\n"
+            "alice,alice@example.com,swordfish\n"
+            "john,john2@example.com,swordfish\n",
+        )
+        out, err = io.StringIO(), io.StringIO()
+        call_command(
+            "manifest_import_users", path, workers=0, stdout=out, stderr=err
+        )
+        self.assertIn("Created 1 users, rejected 1 rows", out.getvalue())
+        self.assertIn("Row 2:", err.getvalue())
+        user = USER_MODEL.objects.get(username="alice")
+        self.assertTrue(user.check_password("swordfish"))
+
+    def test_import_exported_users(self):
+        """Should import compressed NDJSON and report the invalid lines.
+        """
+        path = self.write(
+            "users.ndjson.gz",
+            '{"username": "alice", "email": "alice@example.com"}\n'
+            "\n"
+            "not json\n",
+        )
+        err = io.StringIO()
+        call_command(
+            "manifest_import_users",
+            path,
+            active=True,
+            workers=0,
+            stdout=io.StringIO(),
+            stderr=err,
+        )
+        self.assertTrue(USER_MODEL.objects.get(username="alice").is_active)
+        self.assertIn("Row 2: Invalid row.", err.getvalue())
+
+
+class SeedTests(ManifestTestCase):
+    """Tests for :mod:`manifest_seed
+    <manifest.management.commands.manifest_seed>`.
+    """
+
+    def test_seed(self):
+        """Should create the users and report them by their state.
+        """
+        out = io.StringIO()
+        call_command("manifest_seed", 20, batch_size=8, stdout=out)
+        self.assertIn("Created 20 users (active:", out.getvalue())
+        self.assertEqual(
+            USER_MODEL.objects.filter(username__startswith="user").count(), 20,
+        )
+
+    def test_seed_invalid(self):
+        """Should raise ``CommandError`` if the count is not positive.
+        """
+        with self.assertRaises(CommandError):
+            call_command("manifest_seed", 0, stdout=io.StringIO())
+
+
+class CalibrateHashersTests(ManifestTestCase):
+    """Tests for :mod:`manifest_calibrate_hashers
+    <manifest.management.commands.manifest_calibrate_hashers>`.
+    """
+
+    def test_calibrate_hashers(self):
+        """Should report the hashers and write the recommended settings.
+        """
+        path = os.path.join(tempfile.mkdtemp(), "hashers.py")
+        out = io.StringIO()
+        call_command(
+            "manifest_calibrate_hashers",
+            target_ms=1,
+            number=1,
+            write=path,
+            stdout=out,
+        )
+        self.assertIn("MANIFEST_PBKDF2_ITERATIONS=100000", out.getvalue())
+        self.assertIn("AuthenticationBackend", out.getvalue())
+        self.assertFalse(
+            USER_MODEL.objects.filter(username="calibration0").exists()
+        )
+        with open(path) as file:
+            content = file.read()
+        self.assertIn("MANIFEST_PBKDF2_ITERATIONS = 100000", content)
+        self.assertIn("manifest.hashers.PBKDF2PasswordHasher", content)
+
+
+class ProfilesTests(ManifestTestCase):
+    """Tests for :mod:`manifest_profiles
+    <manifest.management.commands.manifest_profiles>`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        info = {
+            "time": "2020-01-01T00:00:00",
+            "method": "GET",
+            "path": "/users/",
+            "view": "manifest.views.UserListView",
+            "status": 200,
+            "ms": 1.5,
+        }
+        self.cpu = profiling.write_dump(
+            self.directory,
+            "cpu",
+            profiling.profile_cpu(lambda: sorted(range(100)))[1],
+            info,
+            10,
+        )
+        self.memory = profiling.write_dump(
+            self.directory,
+            "memory",
+            profiling.profile_memory(lambda: list(range(100)))[1],
+            info,
+            10,
+        )
+
+    def test_profiles(self):
+        """Should list and summarize the profiles.
+        """
+        out = io.StringIO()
+        call_command("manifest_profiles", directory=self.directory, stdout=out)
+        self.assertIn(self.cpu, out.getvalue())
+        self.assertIn(self.memory, out.getvalue())
+        out = io.StringIO()
+        call_command(
+            "manifest_profiles",
+            self.cpu,
+            self.memory,
+            directory=self.directory,
+            stdout=out,
+        )
+        self.assertIn("sorted", out.getvalue())
+        self.assertIn("Kept", out.getvalue())
+
+    def test_profiles_clear(self):
+        """Should remove the profiles.
+        """
+        out = io.StringIO()
+        with self.defaults(MANIFEST_PROFILE_DIR=self.directory):
+            call_command("manifest_profiles", clear=True, stdout=out)
+        self.assertIn("Removed 2 profiles.", out.getvalue())
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_profiles_invalid(self):
+        """Should raise an error without a directory or profile.
+        """
+        with self.defaults(MANIFEST_PROFILE_DIR=None):
+            with self.assertRaises(CommandError):
+                call_command("manifest_profiles")
+        with self.assertRaises(CommandError):
+            call_command(
+                "manifest_profiles", "missing", directory=self.directory
+            )
+
+
+class LoadTestTests(LiveServerTestCase):
+    """Tests for :mod:`manifest_loadtest
+    <manifest.management.commands.manifest_loadtest>`.
+    """
+
+    fixtures = ["test"]
+
+    def test_loadtest(self):
+        """Should replay the mix against the server without errors.
+        """
+        UserSeeder(20).seed_users()
+        out = io.StringIO()
+        # The live server shares a single connection to the in-memory
+        # database between its threads, so requests are not concurrent.
+        call_command(
+            "manifest_loadtest",
+            url=self.live_server_url,
+            workers=1,
+            requests=30,
+            json=True,
+            stdout=out,
+        )
+        results = json.loads(out.getvalue())
+        self.assertEqual(results["total"]["requests"], 30)
+        self.assertEqual(results["total"]["errors"], {})
+        self.assertEqual(sum(results["total"]["histogram"].values()), 30)
+
+    def test_stats(self):
+        """Should keep a bounded sample of the latencies.
+        """
+        stats = Stats(sample_size=10)
+        for index in range(1000):
+            stats.record("login", index / 1000, "503" if index < 10 else None)
+        self.assertEqual(len(stats.latencies["login"].sample), 10)
+        results = stats.summarize(elapsed=10)
+        self.assertEqual(list(results), ["login", "total"])
+        self.assertEqual(results["total"]["requests"], 1000)
+        self.assertEqual(results["total"]["requests_per_second"], 100)
+        self.assertEqual(results["login"]["error_rate"], 0.01)
+        self.assertEqual(results["login"]["max_ms"], 999)
+        self.assertEqual(sum(results["login"]["histogram"].values()), 1000)
+
+    def test_expired_token(self):
+        """Workers should log in again when their token is expired.
+        """
+        loadtest = LoadTest("http://testserver", ["john"], "pass")
+        worker = Worker(0)
+        worker.token = "expired"
+        responses = [(401, None), (200, {"token": "new"}), (200, {})]
+        with mock.patch.object(
+            loadtest, "request", side_effect=responses
+        ) as request:
+            status = loadtest.scenario_profile_update(random.Random(), worker)
+        self.assertEqual(status, (200, 200))
+        self.assertEqual(worker.token, "new")
+        self.assertEqual(request.call_args[1]["token"], "new")
+
+    def test_failures(self):
+        """Invalid responses and exceptions should be counted as errors
+        without stopping the workers.
+        """
+        loadtest = LoadTest(
+            "http://testserver",
+            ["john"],
+            "pass",
+            workers=1,
+            requests=4,
+            mix={"profile_update": 1},
+        )
+        responses = [(200, None), KeyError("token"), (200, []), OSError()]
+        with mock.patch.object(loadtest, "request", side_effect=responses):
+            results = loadtest.run()
+        self.assertEqual(results["total"]["requests"], 4)
+        self.assertEqual(
+            results["total"]["errors"],
+            {"invalid login response": 2, "KeyError": 1, "OSError": 1},
+        )
+
+    def test_loadtest_invalid(self):
+        """Should raise ``CommandError`` without users or with an invalid
+        mix.
+        """
+        with self.assertRaises(CommandError):
+            call_command("manifest_loadtest", users_prefix="nobody")
+        with self.assertRaises(CommandError):
+            call_command("manifest_loadtest", mix="unknown=1")
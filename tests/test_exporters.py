@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+""" Manifest Exporter Tests
+"""
+
+import csv
+import gzip
+import io
+import json
+
+from django.contrib.admin import site
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+
+from manifest.admin import UserAdmin
+from manifest.exporters import UserExporter, parse_filters
+from tests.base import ManifestTestCase
+
+
+class UserExporterTests(ManifestTestCase):
+    """Tests for :class:`UserExporter <manifest.exporters.UserExporter>`.
+    """
+
+    def setUp(self):
+        self.queryset = get_user_model().objects.order_by("pk")
+        super().setUp()
+
+    def test_csv(self):
+        """Should write a header and a row for each user.
+        """
+        exporter = UserExporter(self.queryset, fields=["pk", "username"])
+        rows = list(csv.reader(io.StringIO("".join(exporter.iter_text()))))
+        self.assertEqual(rows[0], ["pk", "username"])
+        self.assertEqual(
+            rows[1:],
+            [[str(user.pk), user.username] for user in self.queryset],
+        )
+
+    def test_ndjson(self):
+        """Should write a JSON object for each user.
+        """
+        exporter = UserExporter(
+            self.queryset, fields=["username"], export_format="ndjson"
+        )
+        data = gzip.decompress(b"".join(exporter.iter_bytes(compress=True)))
+        self.assertEqual(
+            [json.loads(line) for line in data.decode().splitlines()],
+            [{"username": user.username} for user in self.queryset],
+        )
+
+    def test_chunks(self):
+        """Rows should be fetched in chunks and joined into buffers.
+        """
+        exporter = UserExporter(self.queryset, chunk_size=1)
+        exporter.buffer_size = 1
+        self.assertEqual(
+            len(list(exporter.iter_text())), self.queryset.count() + 1
+        )
+
+    def test_invalid(self):
+        """Unknown formats and fields should raise ``ValueError``.
+        """
+        for kwargs in (
+            {"export_format": "xml"},
+            {"fields": ["unknown"]},
+            {"fields": ["activation_key"]},
+        ):
+            with self.assertRaises(ValueError):
+                UserExporter(self.queryset, **kwargs)
+        for filters in (
+            ["is_active"],
+            ["password__startswith=pbkdf2"],
+            ["tokens__key__startswith=a"],
+            ["groups__name=staff"],
+        ):
+            with self.assertRaises(ValueError):
+                parse_filters(filters)
+
+    def test_parse_filters(self):
+        """Should convert lists and null checks.
+        """
+        self.assertEqual(
+            parse_filters(
+                ["username__in=john,jane", "last_login__isnull=true"]
+            ),
+            {"username__in": ["john", "jane"], "last_login__isnull": True},
+        )
+
+    def test_admin_action(self):
+        """Admin actions should stream the selected users.
+        """
+        admin = UserAdmin(get_user_model(), site)
+        request = RequestFactory().get("/")
+        response = admin.export_ndjson(
+            request, self.queryset.filter(username="jane")
+        )
+        self.assertTrue(response.streaming)
+        self.assertIn("users.ndjson", response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(json.loads(content)["username"], "jane")
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+""" Manifest Password Hasher Tests
+"""
+
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import BCryptPasswordHasher, make_password
+
+from manifest.backends import AuthenticationBackend
+from manifest.hashers import (
+    MD5CryptPasswordHasher,
+    PBKDF2PasswordHasher,
+    check_legacy_password,
+    import_password_hash,
+    md5_crypt,
+)
+from tests.base import ManifestTestCase
+
+try:
+    import bcrypt
+except ImportError:
+    bcrypt = None
+
+
+class MD5CryptTests(ManifestTestCase):
+    """Tests for :func:`md5_crypt <manifest.hashers.md5_crypt>`.
+    """
+
+    def test_md5_crypt(self):
+        """Should return the same hashes as ``openssl passwd -1``.
+        """
+        self.assertEqual(
+            md5_crypt("password", "saltsalt"),
+            "$1$saltsalt$qjXMvbEw8oaL.CzflDtaK/",
+        )
+        self.assertEqual(
+            md5_crypt("a much longer password than sixteen chars", "ab"),
+            "$1$ab$Ib0nlJB8DVO0s/I8nkZkW/",
+        )
+
+    def test_hasher(self):
+        """Should verify the encoded passwords.
+        """
+        hasher = MD5CryptPasswordHasher()
+        encoded = hasher.encode("secret", hasher.salt())
+        self.assertTrue(hasher.verify("secret", encoded))
+        self.assertFalse(hasher.verify("wrong", encoded))
+        self.assertEqual(
+            hasher.safe_summary(encoded)["algorithm"], "md5_crypt"
+        )
+
+
+class PBKDF2PasswordHasherTests(ManifestTestCase):
+    """Tests for :class:`PBKDF2PasswordHasher
+    <manifest.hashers.PBKDF2PasswordHasher>`.
+    """
+
+    def test_iterations(self):
+        """Should hash with ``MANIFEST_PBKDF2_ITERATIONS`` iterations and
+        update the hashes of other iterations.
+        """
+        hasher = PBKDF2PasswordHasher()
+        default = hasher.encode("secret", hasher.salt())
+        with self.defaults(MANIFEST_PBKDF2_ITERATIONS=1000):
+            encoded = hasher.encode("secret", hasher.salt())
+            self.assertEqual(encoded.split("$")[1], "1000")
+            self.assertTrue(hasher.verify("secret", encoded))
+            self.assertFalse(hasher.must_update(encoded))
+            self.assertTrue(hasher.must_update(default))
+
+
+class LegacyPasswordTests(ManifestTestCase):
+    """Tests for importing and checking legacy password hashes.
+    """
+
+    def test_import_password_hash(self):
+        """Should convert the raw hashes to the Django format.
+        """
+        self.assertEqual(
+            import_password_hash("$1$saltsalt$qjXMvbEw8oaL.CzflDtaK/"),
+            "md5_crypt$$1$saltsalt$qjXMvbEw8oaL.CzflDtaK/",
+        )
+        encoded = make_password("pass")
+        self.assertEqual(import_password_hash(encoded), encoded)
+        for value in ("", "plain", "unknown$hash"):
+            with self.assertRaises(ValueError):
+                import_password_hash(value)
+
+    def test_check_legacy_password(self):
+        """Should check the password only with the legacy hashers.
+        """
+        encoded = "md5_crypt$$1$saltsalt$qjXMvbEw8oaL.CzflDtaK/"
+        self.assertTrue(check_legacy_password("password", encoded))
+        self.assertFalse(check_legacy_password("invalid", encoded))
+        self.assertFalse(check_legacy_password("pass", make_password("pass")))
+        self.assertFalse(check_legacy_password("pass", ""))
+        with self.defaults(MANIFEST_LEGACY_HASHERS=()):
+            self.assertFalse(check_legacy_password("password", encoded))
+
+    @skipUnless(bcrypt, "bcrypt is not installed")
+    def test_bcrypt(self):
+        """Should check imported bcrypt hashes of PHP.
+        """
+        self.assertEqual(
+            import_password_hash("$2y$12$abcdefghijklmnopqrstuv"),
+            "bcrypt$$2b$12$abcdefghijklmnopqrstuv",
+        )
+        value = bcrypt.hashpw(b"secret", bcrypt.gensalt(4)).decode()
+        encoded = import_password_hash("$2y$" + value[4:])
+        self.assertTrue(check_legacy_password("secret", encoded))
+
+    def test_missing_library(self):
+        """Should reject importing and deny checking the hashes of a hasher
+        whose library is not installed.
+        """
+        encoded = "bcrypt$$2b$04$" + "a" * 53
+        user = get_user_model().objects.create_user(
+            "alice", "alice@example.com", "pass", active=True
+        )
+        user.password = encoded
+        user.save(update_fields=["password"])
+        with mock.patch.object(
+            BCryptPasswordHasher, "library", ("bcrypt", "manifest_missing")
+        ):
+            with self.assertRaises(ValueError):
+                import_password_hash("$2y$04$abcdefghijklmnopqrstuv")
+            self.assertFalse(check_legacy_password("secret", encoded))
+            self.assertIsNone(
+                AuthenticationBackend().authenticate(None, "alice", "secret")
+            )
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+""" Manifest Email Backend Tests
+"""
+
+import socketserver
+import threading
+
+from django.contrib.sites.models import Site
+from django.core.mail import EmailMessage
+from django.test import override_settings
+from django.urls import reverse
+
+from manifest.mail import EmailRenderer, PooledEmailBackend, email_renderer
+from tests import data_dicts
+from tests.base import ManifestTestCase
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP conversation, enough for ``smtplib``.
+    """
+
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost ESMTP")
+        while True:
+            line = self.rfile.readline().decode("ascii").strip()
+            command = line[:4].upper()
+            if not line or command == "QUIT":
+                self.reply("221 Bye")
+                break
+            if command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                for data in iter(self.rfile.readline, b".\r\n"):
+                    lines.append(data)
+                self.server.messages.append(b"".join(lines))
+            self.reply("250 OK")
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    """Local stand-in for an SMTP server which records the messages.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        self.connections = 0
+        self.messages = []
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class PooledEmailBackendTests(ManifestTestCase):
+    """Tests for :class:`PooledEmailBackend
+    <manifest.mail.PooledEmailBackend>`.
+    """
+
+    def setUp(self):
+        self.server = SMTPServer()
+        self.port = self.server.server_address[1]
+        super().setUp()
+
+    def tearDown(self):
+        PooledEmailBackend.pool.clear()
+        self.server.stop()
+
+    def get_backend(self):
+        return PooledEmailBackend(host="127.0.0.1", port=self.port)
+
+    def send(self, count=1):
+        messages = [
+            EmailMessage("Subject", "Message", "from@example.com", ["to@a.b"])
+            for _ in range(count)
+        ]
+        return self.get_backend().send_messages(messages)
+
+    def test_connection_reuse(self):
+        """Consecutive sends should reuse a single connection.
+        """
+        for _ in range(3):
+            self.assertEqual(self.send(), 1)
+        self.assertEqual(self.send(2), 2)
+        self.assertEqual(len(self.server.messages), 5)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_max_messages(self):
+        """Connections should be recycled after
+        ``MANIFEST_SMTP_MAX_MESSAGES``.
+        """
+        with self.defaults(MANIFEST_SMTP_MAX_MESSAGES=2):
+            for _ in range(4):
+                self.send()
+        self.assertEqual(self.server.connections, 2)
+
+    def test_idle_time(self):
+        """Idle connections should not be reused after
+        ``MANIFEST_SMTP_POOL_IDLE_TIME``.
+        """
+        self.send()
+        with self.defaults(MANIFEST_SMTP_POOL_IDLE_TIME=0):
+            self.send()
+        self.assertEqual(self.server.connections, 2)
+
+    def test_dead_connection(self):
+        """Closed connections should be dropped from the pool.
+        """
+        self.send()
+        for idle in PooledEmailBackend.pool._connections.values():
+            for connection, _sent, _released in idle:
+                connection.close()
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_email_change(self):
+        """Both confirmation emails should be sent over one connection.
+        """
+        form_data = data_dicts.LOGIN_FORM["valid"][0]
+        self.client.login(
+            username=form_data["identification"],
+            password=form_data["password"],
+        )
+        # pylint: disable=bad-continuation
+        with override_settings(
+            EMAIL_BACKEND="manifest.mail.PooledEmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=self.port,
+        ):
+            self.client.post(
+                reverse("email_change"), data={"email": "john@newexample.com"}
+            )
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(self.server.connections, 1)
+
+
+class EmailRendererTests(ManifestTestCase):
+    """Tests for :class:`EmailRenderer <manifest.mail.EmailRenderer>`.
+    """
+
+    subject_template_name = "manifest/emails/activation_email_subject.txt"
+
+    def test_template_cache(self):
+        """Compiled templates should be reused.
+        """
+        renderer = EmailRenderer()
+        template = renderer.get_template(self.subject_template_name)
+        self.assertIs(
+            renderer.get_template(self.subject_template_name), template
+        )
+        with self.settings(DEBUG=True):
+            self.assertIsNot(
+                renderer.get_template(self.subject_template_name), template
+            )
+
+    def test_context_cache(self):
+        """Static context should be cached until the site is changed.
+        """
+        renderer = EmailRenderer()
+        context = renderer.get_context()
+        self.assertEqual(context["protocol"], "http")
+        with self.assertNumQueries(0):
+            self.assertEqual(renderer.get_context(), context)
+        with self.defaults(MANIFEST_USE_HTTPS=True):
+            self.assertEqual(renderer.get_context()["protocol"], "https")
+        email_renderer.get_context()
+        site = Site.objects.get_current()
+        site.name = "Manifest"
+        site.save()
+        # Module level renderer is cleared by the signal.
+        self.assertEqual(email_renderer.get_context()["site"].name, "Manifest")
+
+    def test_render_subject(self):
+        """Rendered subject should not contain new lines.
+        """
+        subject = EmailRenderer().render_subject(
+            self.subject_template_name, {"site": Site.objects.get_current()}
+        )
+        self.assertTrue(subject)
+        self.assertNotIn("\n", subject)
@@ -4,14 +4,31 @@
 
 import datetime
 import re
+from smtplib import SMTPException
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.locmem import EmailBackend
+from django.db.models import QuerySet
+from django.utils import timezone
 
 from manifest import defaults
+from manifest.managers import SHA1_RE
+from manifest.models import OutboxMessage, Token
 from tests.base import ManifestTestCase
 
 
+class FailingEmailBackend(EmailBackend):
+    """Email backend that fails to send every message.
+    """
+
+    def send_messages(self, messages):
+        raise SMTPException("Connection refused.")
+
+
 class AccountActivationManagerTests(ManifestTestCase):
     """Tests for :class:`AccountActivationManager
     <manifest.managers.AccountActivationManager>`.
@@ -118,6 +135,109 @@ class AccountActivationManagerTests(ManifestTestCase):
         deleted_users = get_user_model().objects.delete_expired_users()
         self.assertEqual(deleted_users[0].username, "foo")
 
+    def test_bulk_create_users(self):
+        """The :func:`bulk_create_users
+        <manifest.managers.AccountActivationManager.bulk_create_users>`
+        method should create the valid rows and report the others.
+        """
+        rows = [
+            {
+                "username": "alice",
+                "email": "alice@example.com",
+                "password": "x",
+            },
+            {"username": "bob", "email": "Bob@Example.com"},
+            {"username": "john", "email": "new@example.com"},
+            {"username": "carol", "email": "JOHN@example.com"},
+            {"username": "alice", "email": "other@example.com"},
+            {"username": "dave", "email": "ALICE@example.com"},
+            {"username": "signup", "email": "signup@example.com"},
+            {"username": "e-ve", "email": "eve@example.com"},
+            {"username": "frank", "email": "invalid"},
+            None,
+        ]
+        created, errors = get_user_model().objects.bulk_create_users(
+            rows, batch_size=3, workers=0
+        )
+        self.assertEqual(created, 2)
+        self.assertEqual(
+            [number for number, _error in errors], list(range(3, 11))
+        )
+        alice = get_user_model().objects.get(username="alice")
+        self.assertTrue(alice.check_password("x"))
+        self.assertFalse(alice.is_active)
+        self.assertTrue(SHA1_RE.search(alice.activation_key))
+        bob = get_user_model().objects.get(username="bob")
+        self.assertEqual(bob.email, "Bob@example.com")
+        self.assertFalse(bob.has_usable_password())
+
+    def test_bulk_create_users_queries(self):
+        """Queries should not depend on the number of rows in a batch.
+        """
+        rows = [
+            {"username": "user%d" % index, "email": "user%d@a.com" % index}
+            for index in range(20)
+        ]
+        # Three queries to validate and an insert in a savepoint.
+        with self.assertNumQueries(6):
+            get_user_model().objects.bulk_create_users(rows, workers=0)
+
+    def test_bulk_create_users_pool(self):
+        """Passwords should be hashed by the worker processes.
+        """
+        rows = [
+            {
+                "username": "user%d" % index,
+                "email": "user%d@example.com" % index,
+                "password": "pass%d" % index,
+            }
+            for index in range(4)
+        ]
+        created, errors = get_user_model().objects.bulk_create_users(
+            rows, workers=2
+        )
+        self.assertEqual((created, errors), (4, []))
+        user = get_user_model().objects.get(username="user3")
+        self.assertTrue(user.check_password("pass3"))
+
+    def test_bulk_create_users_password_hash(self):
+        """Imported password hashes should be stored without hashing and
+        unsupported hashes should be reported.
+        """
+        rows = [
+            {
+                "username": "alice",
+                "email": "alice@example.com",
+                "password_hash": "$1$saltsalt$qjXMvbEw8oaL.CzflDtaK/",
+            },
+            {
+                "username": "bob",
+                "email": "bob@example.com",
+                "password_hash": "unknown$hash",
+            },
+        ]
+        created, errors = get_user_model().objects.bulk_create_users(
+            rows, workers=0
+        )
+        self.assertEqual(created, 1)
+        self.assertEqual(errors, [(2, "Unsupported password hash.")])
+        alice = get_user_model().objects.get(username="alice")
+        self.assertEqual(
+            alice.password, "md5_crypt$$1$saltsalt$qjXMvbEw8oaL.CzflDtaK/"
+        )
+
+    def test_bulk_create_users_tokens(self):
+        """Activation tokens should be issued if
+        ``MANIFEST_USE_TOKEN_TABLE`` setting is ``True``.
+        """
+        rows = [{"username": "alice", "email": "alice@example.com"}]
+        with self.defaults(MANIFEST_USE_TOKEN_TABLE=True):
+            get_user_model().objects.bulk_create_users(rows, workers=0)
+            self.assertEqual(
+                list(get_user_model().objects.pending_activation()),
+                [get_user_model().objects.get(username="alice")],
+            )
+
 
 class EmailConfirmationManagerTests(ManifestTestCase):
     """Tests for :class:`EmailConfirmationManager
@@ -160,6 +280,189 @@ class EmailConfirmationManagerTests(ManifestTestCase):
             get_user_model().objects.confirm_email("john", 10 * "a1b2")
         )
 
+    def expire_confirmation(self, user):
+        user.email_confirmation_key_created -= datetime.timedelta(
+            days=defaults.MANIFEST_EMAIL_CONFIRMATION_DAYS + 1
+        )
+        user.save()
+
+    def test_confirm_email_expired(self):
+        """The :func:`confirm_email
+        <manifest.managers.EmailConfirmationManager.confirm_email>`
+        method should return ``False`` if the key is expired.
+        """
+        user = get_user_model().objects.get(pk=1)
+        user.change_email("john@newexample.com")
+        self.expire_confirmation(user)
+        self.assertTrue(user.email_confirmation_key_expired())
+        self.assertFalse(
+            get_user_model().objects.confirm_email(
+                user.username, user.email_confirmation_key
+            )
+        )
+
+    def test_email_in_use(self):
+        """The :func:`email_in_use
+        <manifest.managers.EmailConfirmationManager.email_in_use>`
+        method should ignore expired unconfirmed emails.
+        """
+        user = get_user_model().objects.get(pk=1)
+        user.change_email("john@newexample.com")
+        self.assertTrue(
+            get_user_model().objects.email_in_use("JOHN@example.com")
+        )
+        self.assertTrue(
+            get_user_model().objects.email_in_use("john@newexample.com")
+        )
+        self.expire_confirmation(user)
+        self.assertFalse(
+            get_user_model().objects.email_in_use("john@newexample.com")
+        )
+
+    def test_delete_expired_confirmations(self):
+        """The :func:`delete_expired_confirmations
+        <manifest.managers.EmailConfirmationManager.delete_expired_confirmations>`
+        method should clear only the expired confirmations.
+        """
+        for user in get_user_model().objects.all():
+            user.change_email("%s@newexample.com" % user.username)
+            self.expire_confirmation(user)
+        pending = get_user_model().objects.get(pk=1)
+        pending.change_email("john@newexample.com")
+        count = get_user_model().objects.delete_expired_confirmations(
+            batch_size=1
+        )
+        self.assertEqual(count, get_user_model().objects.count() - 1)
+        self.assertEqual(
+            get_user_model()
+            .objects.exclude(email_confirmation_key="")
+            .get()
+            .pk,
+            pending.pk,
+        )
+
+
+class TokenManagerTests(ManifestTestCase):
+    """Tests for :class:`TokenManager <manifest.managers.TokenManager>`.
+    """
+
+    user_info = {
+        "username": "foo",
+        "password": "bar",
+        "email": "foo@example.com",
+    }
+
+    def test_create_user_single_insert(self):
+        """The :func:`create_user
+        <manifest.managers.AccountActivationManager.create_user>`
+        method should create the user with a single query.
+        """
+        with self.assertNumQueries(1):
+            get_user_model().objects.create_user(**self.user_info)
+
+    def test_activation(self):
+        """Activation keys should be stored hashed in the token table
+        and consumed on activation.
+        """
+        with self.defaults(MANIFEST_USE_TOKEN_TABLE=True):
+            user = get_user_model().objects.create_user(**self.user_info)
+            key = user.activation_key
+            self.assertTrue(re.match("^[a-f0-9]{40}$", key))
+            self.assertEqual(
+                get_user_model().objects.get(pk=user.pk).activation_key, ""
+            )
+            token = Token.objects.get(user=user)
+            self.assertEqual(token.key, Token.hash_key(key))
+            self.assertTrue(
+                get_user_model().objects.pending_activation().exists()
+            )
+            self.assertFalse(
+                get_user_model().objects.activate_user("foo", 10 * "a1b2")
+            )
+            self.assertTrue(get_user_model().objects.activate_user("foo", key))
+            self.assertFalse(Token.objects.exists())
+            self.assertFalse(
+                get_user_model().objects.activate_user("foo", key)
+            )
+
+    def test_consume_concurrent(self):
+        """A token deleted by a concurrent request should not return the
+        user again.
+        """
+        with self.defaults(MANIFEST_USE_TOKEN_TABLE=True):
+            user = get_user_model().objects.create_user(**self.user_info)
+            token = Token.objects.get(user=user)
+            # Both requests find the token, the other one deletes it first.
+            Token.objects.all().delete()
+            with mock.patch.object(QuerySet, "first", return_value=token):
+                self.assertIsNone(
+                    Token.objects.consume(
+                        Token.KIND_ACTIVATION, "foo", user.activation_key
+                    )
+                )
+
+    def test_email_confirmation(self):
+        """Email confirmation keys should be validated in the token table.
+        """
+        with self.defaults(MANIFEST_USE_TOKEN_TABLE=True):
+            user = get_user_model().objects.get(pk=1)
+            user.change_email("john@newexample.com")
+            self.assertEqual(
+                get_user_model().objects.get(pk=1).email_confirmation_key, ""
+            )
+            user = get_user_model().objects.confirm_email(
+                "john", user.email_confirmation_key
+            )
+            self.assertEqual(user.email, "john@newexample.com")
+
+    def test_delete_expired(self):
+        """Expired tokens should not be valid and should be deleted.
+        """
+        with self.defaults(MANIFEST_USE_TOKEN_TABLE=True):
+            user = get_user_model().objects.create_user(**self.user_info)
+            Token.objects.update(expires_at=timezone.now())
+            self.assertFalse(
+                get_user_model().objects.activate_user(
+                    "foo", user.activation_key
+                )
+            )
+            self.assertEqual(Token.objects.delete_expired(), 1)
+            self.assertFalse(Token.objects.exists())
+
+    def test_migrate_from_columns(self):
+        """Pending keys in user columns should be moved to the token table.
+        """
+        users = [
+            get_user_model().objects.create_user(
+                "user%d" % i, "user%d@example.com" % i, "pass"
+            )
+            for i in range(3)
+        ]
+        john = get_user_model().objects.get(pk=1)
+        john.change_email("john@newexample.com")
+        self.assertEqual(Token.objects.migrate_from_columns(batch_size=2), 4)
+        self.assertEqual(Token.objects.count(), 4)
+        self.assertFalse(
+            get_user_model()
+            .objects.filter(pk__in=[user.pk for user in users])
+            .exclude(activation_key="")
+        )
+        self.assertFalse(
+            get_user_model().objects.get(pk=1).email_confirmation_key
+        )
+        with self.defaults(MANIFEST_USE_TOKEN_TABLE=True):
+            for user in users:
+                self.assertTrue(
+                    get_user_model().objects.activate_user(
+                        user.username, user.activation_key
+                    )
+                )
+            self.assertTrue(
+                get_user_model().objects.confirm_email(
+                    "john", john.email_confirmation_key
+                )
+            )
+
 
 class UserProfileManagerTests(ManifestTestCase):
     """Tests for :class:`UserProfileManager
@@ -176,3 +479,93 @@ class UserProfileManagerTests(ManifestTestCase):
             AnonymousUser()
         )
         self.assertTrue(len(profiles) == 0)
+
+
+class OutboxManagerTests(ManifestTestCase):
+    """Tests for :class:`OutboxManager <manifest.managers.OutboxManager>`.
+    """
+
+    def enqueue(self, count=1):
+        for number in range(count):
+            email = EmailMultiAlternatives(
+                "Subject %s" % number,
+                "Message",
+                "from@example.com",
+                ["to@example.com"],
+                headers={"X-Test": "test"},
+            )
+            email.attach_alternative("<p>Message</p>", "text/html")
+            OutboxMessage.objects.enqueue(email)
+
+    def test_enqueue(self):
+        """Queued message should be rebuilt as the same email.
+        """
+        self.enqueue()
+        email = OutboxMessage.objects.get().as_email()
+        self.assertEqual(email.subject, "Subject 0")
+        self.assertEqual(email.to, ["to@example.com"])
+        self.assertEqual(email.extra_headers, {"X-Test": "test"})
+        self.assertEqual(email.alternatives, [("<p>Message</p>", "text/html")])
+
+    def test_claim(self):
+        """Claimed messages should be leased and not claimed again.
+        """
+        self.enqueue(3)
+        messages = OutboxMessage.objects.claim(batch_size=2)
+        self.assertEqual(len(messages), 2)
+        for message in messages:
+            self.assertEqual(message.status, OutboxMessage.STATUS_SENDING)
+            self.assertGreater(message.next_attempt, timezone.now())
+        self.assertEqual(len(OutboxMessage.objects.claim()), 1)
+        self.assertEqual(len(OutboxMessage.objects.claim()), 0)
+
+    def test_claim_concurrent(self):
+        """Messages selected by concurrent workers should be claimed only
+        by the first one.
+        """
+        self.enqueue(2)
+        pks = list(OutboxMessage.objects.values_list("pk", flat=True))
+        # Without row locks, both workers select the same due messages.
+        with mock.patch.object(
+            OutboxMessage.objects.__class__, "get_due_pks", return_value=pks
+        ):
+            self.assertEqual(len(OutboxMessage.objects.claim()), 2)
+            self.assertEqual(OutboxMessage.objects.claim(), [])
+
+    def test_deliver(self):
+        """Should send claimed messages and mark them as sent.
+        """
+        self.enqueue(3)
+        self.assertEqual(OutboxMessage.objects.deliver(), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            OutboxMessage.objects.filter(
+                status=OutboxMessage.STATUS_SENT
+            ).count(),
+            3,
+        )
+        self.assertEqual(OutboxMessage.objects.deliver(), (0, 0))
+
+    def test_deliver_retry(self):
+        """Failed messages should be retried with backoff until
+        ``MANIFEST_OUTBOX_MAX_ATTEMPTS``.
+        """
+        self.enqueue()
+        with self.defaults(MANIFEST_OUTBOX_MAX_ATTEMPTS=2):
+            result = OutboxMessage.objects.deliver(
+                connection=FailingEmailBackend()
+            )
+            self.assertEqual(result, (0, 1))
+            message = OutboxMessage.objects.get()
+            self.assertEqual(message.status, OutboxMessage.STATUS_PENDING)
+            self.assertEqual(message.attempts, 1)
+            self.assertEqual(message.last_error, "Connection refused.")
+            self.assertGreater(message.next_attempt, timezone.now())
+            # Not due yet.
+            self.assertEqual(OutboxMessage.objects.deliver(), (0, 0))
+            message.next_attempt = timezone.now()
+            message.save()
+            OutboxMessage.objects.deliver(connection=FailingEmailBackend())
+            message = OutboxMessage.objects.get()
+            self.assertEqual(message.status, OutboxMessage.STATUS_FAILED)
+            self.assertEqual(message.attempts, 2)
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+""" Manifest Metrics Tests
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+
+from manifest import metrics
+from manifest.backends import AuthenticationBackend
+from manifest.mixins import SendActivationMailMixin
+from manifest.models import OutboxMessage
+from manifest.storage import CachedStorage
+from tests.base import ManifestTestCase
+
+
+class RegistryTests(ManifestTestCase):
+    """Tests for :class:`Registry <manifest.metrics.Registry>`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.registry = metrics.Registry()
+        self.counter = metrics.Counter(
+            "test_requests_total",
+            "Test requests.",
+            ["method"],
+            registry=self.registry,
+        )
+        self.histogram = metrics.Histogram(
+            "test_seconds",
+            "Test seconds.",
+            buckets=(0.1, 1),
+            registry=self.registry,
+        )
+
+    def test_duplicate(self):
+        """Metrics should not be registered twice.
+        """
+        with self.assertRaises(ValueError):
+            metrics.Counter("test_seconds", "Test.", registry=self.registry)
+
+    def test_threads(self):
+        """Values of every thread should be summed.
+        """
+
+        def increment():
+            for _index in range(1000):
+                self.counter.inc(method="GET")
+
+        threads = [threading.Thread(target=increment) for _index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.counter.inc(2, method="POST")
+        self.assertEqual(self.counter.get_value(method="GET"), 4000)
+        self.assertEqual(self.counter.get_value(method="POST"), 2)
+        # Shards of the finished threads are merged.
+        self.assertEqual(len(self.registry.shards), 1)
+        self.assertEqual(self.counter.get_value(method="GET"), 4000)
+
+    def test_to_text(self):
+        """Values should be written in Prometheus text format.
+        """
+        self.counter.inc(method='"GET"')
+        self.histogram.observe(0.05)
+        self.histogram.observe(0.5)
+        self.histogram.observe(5)
+        self.assertEqual(
+            self.registry.to_text(),
+            "# HELP test_requests_total Test requests.\n"
+            "# TYPE test_requests_total counter\n"
+            'test_requests_total{method="\\"GET\\""} 1.0\n'
+            "# HELP test_seconds Test seconds.\n"
+            "# TYPE test_seconds histogram\n"
+            'test_seconds_bucket{le="0.1"} 1.0\n'
+            'test_seconds_bucket{le="1.0"} 2.0\n'
+            'test_seconds_bucket{le="+Inf"} 3.0\n'
+            "test_seconds_sum 5.55\n"
+            "test_seconds_count 3.0\n",
+        )
+
+    def test_directory(self):
+        """Values of the processes should be aggregated in a directory.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.counter.inc(method="GET")
+        with self.histogram.time():
+            pass
+        self.registry.flush(directory)
+        # A forked process starts with empty values and its own file.
+        self.registry.reset()
+        self.counter.inc(2, method="GET")
+        values = self.registry.collect_all(directory)
+        self.assertEqual(values["test_requests_total", ("GET",)], 3)
+        self.assertEqual(values["test_seconds", ()][0], 1)
+        with self.defaults(MANIFEST_METRICS_DIR=directory):
+            self.registry.flush()
+            values = self.registry.collect_all()
+            self.assertEqual(values["test_requests_total", ("GET",)], 3)
+            # Files of the previous runs are removed on start.
+            self.registry.clear()
+            self.registry.reset()
+            self.assertEqual(self.registry.collect_all(), {})
+        self.assertEqual(os.listdir(directory), [])
+
+
+class MetricsTests(ManifestTestCase):
+    """Tests for the metrics of :mod:`manifest.metrics`.
+    """
+
+    fixtures = ["test"]
+
+    def assertIncreases(self, metric, callable_, amount=1, **labels):
+        """Asserts ``callable_`` increases the value of ``metric`` with
+        ``labels`` by ``amount``.
+        """
+        before = metric.get_value(**labels) or 0
+        callable_()
+        self.assertEqual(metric.get_value(**labels) - before, amount)
+
+    def test_logins(self):
+        """Authentications should be counted by outcome.
+        """
+        backend = AuthenticationBackend()
+        for outcome, identification, password in (
+            ("success", "john", "pass"),
+            ("invalid_password", "john", "wrong"),
+            ("unknown_user", "nobody", "pass"),
+            ("unknown_user", "nobody@example.com", "pass"),
+        ):
+            self.assertIncreases(
+                metrics.LOGINS,
+                lambda: backend.authenticate(None, identification, password),
+                outcome=outcome,
+            )
+
+    def test_password_hash(self):
+        """Password hashing should be observed by operation.
+        """
+        user = get_user_model().objects.get(username="john")
+        before = metrics.PASSWORD_HASH_SECONDS.get_value(operation="set")
+        user.set_password("pass")
+        after = metrics.PASSWORD_HASH_SECONDS.get_value(operation="set")
+        self.assertEqual(sum(after[:-1]) - sum((before or [0])[:-1]), 1)
+
+    def test_activations(self):
+        """Activations should be counted by outcome.
+        """
+        manager = get_user_model().objects
+        user = manager.create_user("alice", "alice@example.com", "pass")
+        self.assertIncreases(
+            metrics.ACTIVATIONS,
+            lambda: manager.activate_user("alice", "invalid"),
+            outcome="invalid",
+        )
+        self.assertIncreases(
+            metrics.ACTIVATIONS,
+            lambda: manager.activate_user("alice", user.activation_key),
+            outcome="success",
+        )
+
+    def test_email_confirmations(self):
+        """Email confirmations should be counted by outcome.
+        """
+        manager = get_user_model().objects
+        user = manager.get(username="jane").change_email(
+            "jane.new@example.com"
+        )
+        self.assertIncreases(
+            metrics.EMAIL_CONFIRMATIONS,
+            lambda: manager.confirm_email("jane", "invalid"),
+            outcome="invalid",
+        )
+        self.assertIncreases(
+            metrics.EMAIL_CONFIRMATIONS,
+            lambda: manager.confirm_email("jane", user.email_confirmation_key),
+            outcome="success",
+        )
+
+    def test_emails(self):
+        """Rendered, sent and throttled emails should be counted.
+        """
+        cache.clear()
+        manager = get_user_model().objects
+        manager.create_user("alice", "alice@example.com", "pass")
+        mixin = SendActivationMailMixin()
+        mixin.email_subject_template_name = (
+            "manifest/emails/activation_email_subject.txt"
+        )
+        mixin.email_message_template_name = (
+            "manifest/emails/activation_email_message.txt"
+        )
+        self.assertIncreases(
+            metrics.EMAILS_RENDERED,
+            lambda: self.assertIncreases(
+                metrics.EMAILS_SENT,
+                lambda: mixin.resend_activation_mail("alice@example.com"),
+            ),
+            template="manifest/emails/activation_email_message.txt",
+        )
+        self.assertIncreases(
+            metrics.THROTTLED,
+            lambda: mixin.resend_activation_mail("alice@example.com"),
+            action="activation_resend",
+        )
+
+    def test_outbox_emails(self):
+        """Emails written to the outbox should be counted as queued, and as
+        sent when they are delivered.
+        """
+        cache.clear()
+        manager = get_user_model().objects
+        manager.create_user("alice", "alice@example.com", "pass")
+        mixin = SendActivationMailMixin()
+        mixin.email_subject_template_name = (
+            "manifest/emails/activation_email_subject.txt"
+        )
+        mixin.email_message_template_name = (
+            "manifest/emails/activation_email_message.txt"
+        )
+        with self.defaults(MANIFEST_EMAIL_OUTBOX=True):
+            self.assertIncreases(
+                metrics.EMAILS_QUEUED,
+                lambda: self.assertIncreases(
+                    metrics.EMAILS_SENT,
+                    lambda: mixin.resend_activation_mail("alice@example.com"),
+                    amount=0,
+                ),
+            )
+        self.assertIncreases(
+            metrics.EMAILS_SENT, OutboxMessage.objects.deliver
+        )
+
+    def test_reminder_emails(self):
+        """Activation reminders should be counted as sent.
+        """
+        manager = get_user_model().objects
+        manager.create_user("alice", "alice@example.com", "pass")
+        self.assertIncreases(
+            metrics.EMAILS_SENT,
+            lambda: call_command(
+                "manifest_remind_activation", stdout=io.StringIO()
+            ),
+        )
+
+    def test_mugshots(self):
+        """Files saved to the cache of imagekit should be counted as
+        generated mugshots.
+        """
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = CachedStorage(storage=FileSystemStorage(location=location))
+        self.assertIncreases(
+            metrics.MUGSHOTS_GENERATED,
+            lambda: storage.save(
+                "CACHE/images/mugshot.jpg", ContentFile(b"mugshot")
+            ),
+        )
+        self.assertIncreases(
+            metrics.MUGSHOTS_GENERATED,
+            lambda: storage.save("manifest/picture.jpg", ContentFile(b"")),
+            amount=0,
+        )
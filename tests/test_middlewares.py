@@ -2,11 +2,19 @@
 """ Manifest Middleware Tests
 """
 
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.http import HttpRequest
+from django.test import Client, override_settings
+from django.urls import reverse
 
+from manifest import profiling
 from manifest.middlewares import LocaleMiddleware
-from tests.base import ManifestTestCase
+from tests.base import ManifestAPIClient, ManifestTestCase
 
 
 class LocaleMiddlewareTests(ManifestTestCase):
@@ -52,3 +60,180 @@ class LocaleMiddlewareTests(ManifestTestCase):
             # Middleware should do nothing
             LocaleMiddleware().process_request(req)
             self.assertFalse(hasattr(req, "LANGUAGE_CODE"))
+
+
+@override_settings(
+    MIDDLEWARE=["manifest.middlewares.ServerTimingMiddleware"]
+    + settings.MIDDLEWARE
+)
+class ServerTimingMiddlewareTests(ManifestTestCase):
+    """Tests for :class:`ServerTimingMiddleware
+    <manifest.middlewares.ServerTimingMiddleware>`.
+    """
+
+    fixtures = ["test"]
+
+    def test_login(self):
+        """Logging in should time the queries, hashing and rendering.
+        """
+        with self.assertLogs("manifest.timing", "INFO") as logs:
+            response = self.client.post(
+                reverse("auth_login"),
+                data={"identification": "john", "password": "pass"},
+            )
+        metrics = [
+            metric.split(";")[0]
+            for metric in response["Server-Timing"].split(", ")
+        ]
+        self.assertEqual(metrics, ["db", "hash", "total"])
+        self.assertEqual(logs.records[0].status_code, 302)
+        self.assertEqual(list(logs.records[0].timings), ["db", "hash"])
+
+    def test_render(self):
+        """Template and API responses should time the rendering.
+        """
+        with self.assertLogs("manifest.timing", "INFO"):
+            response = self.client.get(reverse("auth_login"))
+        self.assertIn("render;dur=", response["Server-Timing"])
+        with self.assertLogs("manifest.timing", "INFO"):
+            response = ManifestAPIClient().get(reverse("user_list_api"))
+        self.assertIn("render;dur=", response["Server-Timing"])
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+    def test_without_header(self):
+        """Timings should only be logged if the header is disabled.
+        """
+        with self.defaults(MANIFEST_SERVER_TIMING_HEADER=False):
+            with self.assertLogs("manifest.timing", "INFO") as logs:
+                response = self.client.get(reverse("auth_login"))
+        self.assertNotIn("Server-Timing", response)
+        self.assertIn("render", logs.records[0].timings)
+
+
+@override_settings(
+    MIDDLEWARE=settings.MIDDLEWARE
+    + ["manifest.middlewares.ProfilerMiddleware"]
+)
+class ProfilerMiddlewareTests(ManifestTestCase):
+    """Tests for :class:`ProfilerMiddleware
+    <manifest.middlewares.ProfilerMiddleware>`.
+    """
+
+    fixtures = ["test"]
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_staff(self):
+        """Staff users should profile requests with the header or query.
+        """
+        self.client.login(username="john", password="pass")
+        with self.defaults(MANIFEST_PROFILE_DIR=self.directory):
+            response = self.client.get(
+                reverse("user_list"), HTTP_X_MANIFEST_PROFILE="cpu"
+            )
+            self.assertEqual(response.status_code, 200)
+            name = response["X-Manifest-Profile"]
+            response = self.client.get(
+                reverse("user_list_api"), {"_profile": "memory"}
+            )
+            self.assertEqual(response.status_code, 200)
+        dumps = profiling.list_dumps(self.directory)
+        self.assertEqual([info["mode"] for info in dumps], ["cpu", "memory"])
+        self.assertEqual(dumps[0]["name"], name)
+        self.assertEqual(dumps[0]["view"], "manifest.views.UserListView")
+        self.assertEqual(
+            dumps[1]["view"], "manifest.api_views.UserListAPIView"
+        )
+        self.assertIn(
+            "paginate_queryset",
+            profiling.summarize_dump(self.directory, dumps[0], limit=100),
+        )
+        self.assertIn(
+            "Kept", profiling.summarize_dump(self.directory, dumps[1])
+        )
+
+    def test_not_staff(self):
+        """Other users should not profile requests.
+        """
+        self.client.login(username="jane", password="pass")
+        with self.defaults(MANIFEST_PROFILE_DIR=self.directory):
+            response = self.client.get(
+                reverse("user_list"), HTTP_X_MANIFEST_PROFILE="cpu"
+            )
+        self.assertNotIn("X-Manifest-Profile", response)
+        self.assertEqual(profiling.list_dumps(self.directory), [])
+
+    def test_disabled(self):
+        """Requests should not be profiled without a directory.
+        """
+        self.client.login(username="john", password="pass")
+        with self.defaults(MANIFEST_PROFILE_DIR=None):
+            response = self.client.get(
+                reverse("user_list"), HTTP_X_MANIFEST_PROFILE="cpu"
+            )
+        self.assertNotIn("X-Manifest-Profile", response)
+
+    def test_sample(self):
+        """One in sample rate requests should be profiled, keeping the
+        maximum number of dumps.
+        """
+        with self.defaults(
+            MANIFEST_PROFILE_DIR=self.directory,
+            MANIFEST_PROFILE_SAMPLE_RATE=2,
+            MANIFEST_PROFILE_MAX_FILES=2,
+        ):
+            for _index in range(6):
+                response = self.client.get(reverse("auth_login"))
+                # Dumps of sampled requests are not named to the users.
+                self.assertNotIn("X-Manifest-Profile", response)
+            # Views of other apps are not profiled.
+            self.client.get("/")
+        dumps = profiling.list_dumps(self.directory)
+        self.assertEqual(len(dumps), 2)
+        self.assertEqual(len(os.listdir(self.directory)), 4)
+
+    def test_csrf(self):
+        """Profiled requests should be checked for CSRF.
+        """
+        client = Client(enforce_csrf_checks=True)
+        with self.defaults(
+            MANIFEST_PROFILE_DIR=self.directory,
+            MANIFEST_PROFILE_SAMPLE_RATE=1,
+        ):
+            response = client.post(
+                reverse("auth_login"),
+                data={"identification": "john", "password": "pass"},
+            )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(profiling.list_dumps(self.directory)), 1)
+
+
+@override_settings(
+    MIDDLEWARE=settings.MIDDLEWARE
+    + ["manifest.middlewares.QueryInspectorMiddleware"]
+)
+class QueryInspectorMiddlewareTests(ManifestTestCase):
+    """Tests for :class:`QueryInspectorMiddleware
+    <manifest.middlewares.QueryInspectorMiddleware>`.
+    """
+
+    fixtures = ["test"]
+
+    def test_operations(self):
+        """Queries should be tagged with the view and the operations.
+        """
+        with self.defaults(MANIFEST_SLOW_QUERY_MS=0):
+            with self.assertLogs("manifest.queries", "WARNING") as logs:
+                self.client.post(
+                    reverse("auth_login"),
+                    data={"identification": "john", "password": "pass"},
+                )
+        operations = [record.operation for record in logs.records]
+        self.assertIn("AuthLoginView/authenticate", operations)
+        self.assertIn("AuthLoginView", operations)
+        self.assertEqual(
+            logs.records[0].label, "POST %s" % reverse("auth_login")
+        )
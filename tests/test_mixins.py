@@ -7,6 +7,7 @@ from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse
 
 from manifest import messages
+from manifest.models import OutboxMessage
 from manifest.views import EmailChangeView
 from tests import data_dicts
 from tests.base import ManifestTestCase
@@ -93,3 +94,16 @@ class SendMailMixinTests(ManifestTestCase):
         self.assertTemplateUsed(
             response, "manifest/emails/confirmation_email_message_new.txt"
         )
+
+    def test_send_mail_mixin_outbox(self):
+        """Should write emails to the outbox if ``MANIFEST_EMAIL_OUTBOX``
+        setting is ``True``.
+        """
+        with self.defaults(MANIFEST_EMAIL_OUTBOX=True):
+            self.client.post(
+                reverse("password_reset"), data={"email": "john@example.com"}
+            )
+        self.assertEqual(len(mail.outbox), 0)
+        message = OutboxMessage.objects.get()
+        self.assertIn("john@example.com", message.recipients)
+        self.assertTrue(message.as_email().subject)
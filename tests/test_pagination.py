@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+""" Manifest Pagination Tests
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from manifest.pagination import (
+    EstimatedCountPaginator,
+    InvalidCursor,
+    KeysetPaginator,
+)
+from tests.base import ManifestAPITestCase, ManifestTestCase
+
+
+def create_users(count, start=0):
+    """Creates active users, sharing the same ``date_joined`` in pairs.
+    """
+    now = timezone.now()
+    get_user_model().objects.bulk_create(
+        [
+            get_user_model()(
+                username="user%d" % index,
+                email="user%d@example.com" % index,
+                is_active=True,
+                date_joined=now - timezone.timedelta(days=index // 2),
+            )
+            for index in range(start, start + count)
+        ]
+    )
+
+
+class KeysetPaginatorTests(ManifestTestCase):
+    """Tests for :class:`KeysetPaginator
+    <manifest.pagination.KeysetPaginator>`.
+    """
+
+    def setUp(self):
+        create_users(11)
+        self.queryset = get_user_model().objects.all()
+        super().setUp()
+
+    def test_traversal(self):
+        """Following the cursors should visit every row once, in order.
+        """
+        expected = list(self.queryset.order_by("-date_joined", "-pk"))
+        paginator = KeysetPaginator(self.queryset, 3)
+        pages = [paginator.page()]
+        self.assertFalse(pages[0].has_previous())
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([user for page in pages for user in page], expected)
+        # Walk back to the first page.
+        page = pages[-1]
+        for previous in reversed(pages[:-1]):
+            page = paginator.page(page.previous_cursor)
+            self.assertEqual(list(page), list(previous))
+        self.assertFalse(page.has_previous())
+
+    def test_single_query(self):
+        """A page should be fetched with a single query.
+        """
+        paginator = KeysetPaginator(self.queryset, 3)
+        cursor = paginator.page().next_cursor
+        with self.assertNumQueries(1):
+            paginator.page(cursor)
+
+    def test_invalid_cursor(self):
+        """Tampered cursors should raise ``InvalidCursor``.
+        """
+        paginator = KeysetPaginator(self.queryset, 3)
+        cursor = paginator.page().next_cursor
+        for invalid in ("invalid", cursor[:-4], "W1tdLCBmYWxzZV0"):
+            with self.assertRaises(InvalidCursor):
+                paginator.page(invalid)
+
+
+class EstimatedCountPaginatorTests(ManifestTestCase):
+    """Tests for :class:`EstimatedCountPaginator
+    <manifest.pagination.EstimatedCountPaginator>`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        create_users(11)
+        self.queryset = get_user_model().objects.order_by("pk")
+        super().setUp()
+
+    def test_cached_count(self):
+        """Counts should be cached if the database can't estimate them.
+        """
+        with self.defaults(MANIFEST_ESTIMATED_COUNT=True):
+            count = EstimatedCountPaginator(self.queryset, 5).count
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    EstimatedCountPaginator(self.queryset, 5).count, count
+                )
+
+    def test_pages_beyond_estimate(self):
+        """Pages should be served even if the count is underestimated.
+        """
+        with self.defaults(MANIFEST_ESTIMATED_COUNT=True):
+            EstimatedCountPaginator(self.queryset, 5).count
+            create_users(20, start=11)
+            paginator = EstimatedCountPaginator(self.queryset, 5)
+            page = paginator.page(paginator.num_pages + 1)
+            self.assertEqual(len(page), 5)
+            self.assertTrue(page.has_next())
+
+
+class UserListPaginationTests(ManifestAPITestCase):
+    """Tests for the cursor pagination of the user list views.
+    """
+
+    def setUp(self):
+        create_users(11)
+        super().setUp()
+
+    def test_user_list_view(self):
+        """The view should link to the next page with a cursor.
+        """
+        with self.defaults(MANIFEST_CURSOR_PAGINATION=True):
+            response = self.client.get(reverse("user_list"))
+            page = response.context["page_obj"]
+            self.assertTrue(response.context["is_keyset"])
+            self.assertContains(response, "?cursor=%s" % page.next_cursor)
+            response = self.client.get(
+                reverse("user_list"), {"cursor": page.next_cursor}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.context["page_obj"].has_previous())
+            response = self.client.get(
+                reverse("user_list"), {"cursor": "invalid"}
+            )
+            self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("user_list"))
+        self.assertFalse(response.context["is_keyset"])
+        self.assertContains(response, "?page=2")
+
+    def test_user_list_api_view(self):
+        """The API should return cursor links instead of a count.
+        """
+        with self.defaults(MANIFEST_CURSOR_PAGINATION=True):
+            response = self.client.get(reverse("user_list_api"))
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            self.assertIn("cursor=", response.data["next"])
+            response = self.client.get(response.data["next"])
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("cursor=", response.data["previous"])
+            response = self.client.get(
+                reverse("user_list_api"), {"cursor": "invalid"}
+            )
+            self.assertEqual(response.status_code, 404)
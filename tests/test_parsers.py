@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+""" Manifest Parser Tests
+"""
+
+import io
+from unittest import mock
+
+from djangorestframework_camel_case.parser import (
+    CamelCaseJSONParser as LibraryParser,
+)
+from rest_framework.exceptions import ParseError
+
+from manifest import parsers
+from manifest.parsers import CamelCaseJSONParser
+from tests.base import ManifestTestCase
+
+BODY = (
+    b'{"userName": "john", "profile": {"lastLogin": null, "loginCount2": 3},'
+    b' "groups": [{"groupName": "\\u00fc"}], "ratio": NaN,'
+    b' "bigNumber": 123456789012345678901234567890}'
+)
+
+
+class CamelCaseJSONParserTests(ManifestTestCase):
+    """Tests for :class:`CamelCaseJSONParser
+    <manifest.parsers.CamelCaseJSONParser>`.
+    """
+
+    def parse(self, parser, body):
+        try:
+            return parser.parse(io.BytesIO(body))
+        except ParseError as exc:
+            return exc.detail
+
+    def assertSameData(self, body):
+        self.assertEqual(
+            repr(self.parse(CamelCaseJSONParser(), body)),
+            repr(self.parse(LibraryParser(), body)),
+        )
+
+    def test_parse(self):
+        """Parsed data should be same as the camel case library.
+        """
+        self.assertSameData(BODY)
+        self.assertSameData(b'[{"firstName": "John"}, 1, "lastName"]')
+        self.assertSameData(b'{"firstName": ')
+
+    def test_parse_without_orjson(self):
+        """Data should be parsed with ``json`` if ``orjson`` is missing.
+        """
+        with mock.patch.object(parsers, "orjson", None):
+            self.assertSameData(BODY)
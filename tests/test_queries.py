@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+""" Manifest Query Tests
+
+Query budget tests request every route of ``manifest.urls`` and
+``manifest.endpoints`` and compare the number of their queries with the
+budgets in ``tests/query_budgets.json``.
+After an intended change, record the budgets again with::
+
+    MANIFEST_UPDATE_QUERY_BUDGETS=1 python -m django test tests.test_queries
+"""
+
+import io
+import json
+import os
+from importlib import import_module
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from PIL import Image
+
+from manifest import defaults, queries
+from tests import data_dicts
+from tests.base import (
+    TEMPFILE_MEDIA_ROOT,
+    ManifestAPIClient,
+    ManifestTestCase,
+)
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "query_budgets.json")
+
+UPDATE_BUDGETS = bool(os.environ.get("MANIFEST_UPDATE_QUERY_BUDGETS"))
+
+# Users created in addition to the fixture, so that queries per row of the
+# user lists exceed the budgets.
+LIST_USERS = 12
+
+
+def get_route_names(urlconf):
+    return {
+        pattern.name
+        for pattern in import_module(urlconf).urlpatterns
+        if pattern.name
+    }
+
+
+@override_settings(MEDIA_ROOT=TEMPFILE_MEDIA_ROOT)
+class QueryBudgetTests(ManifestTestCase):
+    """Tests for the queries of every manifest view and endpoint.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(BUDGETS_PATH) as file:
+            cls.budgets = json.load(file)
+
+    def setUp(self):
+        super().setUp()
+        manager = get_user_model().objects
+        manager.bulk_create(
+            [
+                get_user_model()(
+                    username="budget%d" % index,
+                    email="budget%d@example.com" % index,
+                    is_active=True,
+                )
+                for index in range(LIST_USERS)
+            ]
+        )
+        self.john = manager.get(username="john")
+        self.pending = manager.create_user(
+            "pending", "pending@example.com", "pass"
+        )
+        self.jane = manager.get(username="jane").change_email(
+            "jane.new@example.com"
+        )
+        self.uid = urlsafe_base64_encode(force_bytes(self.john.pk))
+        self.token = default_token_generator.make_token(self.john)
+        self.api_client = ManifestAPIClient()
+        # Optional views are enabled to measure them.
+        self.addCleanup(
+            setattr,
+            defaults,
+            "MANIFEST_METRICS_VIEW",
+            defaults.MANIFEST_METRICS_VIEW,
+        )
+        defaults.MANIFEST_METRICS_VIEW = True
+
+    @staticmethod
+    def get_picture():
+        buffer = io.BytesIO()
+        Image.new("RGB", (200, 200), "white").save(buffer, "PNG")
+        return {
+            "picture": SimpleUploadedFile(
+                "picture.png", buffer.getvalue(), content_type="image/png"
+            )
+        }
+
+    def get_view_requests(self):
+        """Returns the requests of ``manifest.urls`` as tuples of route,
+        method, url kwargs, data and if the user is logged in. Callable data
+        is called for each request and posted as multipart.
+        """
+        activate = {
+            "username": "pending",
+            "token": self.pending.activation_key,
+        }
+        confirm = {
+            "username": "jane",
+            "token": self.jane.email_confirmation_key,
+        }
+        return [
+            ("auth_login", "get", None, None, False),
+            (
+                "auth_login",
+                "post",
+                None,
+                data_dicts.LOGIN_FORM["valid"][0],
+                False,
+            ),
+            ("auth_logout", "get", None, None, True),
+            ("auth_register", "get", None, None, False),
+            (
+                "auth_register",
+                "post",
+                None,
+                data_dicts.REGISTER_FORM["valid"][0],
+                False,
+            ),
+            ("auth_register_complete", "get", None, None, False),
+            ("auth_activate_resend", "get", None, None, False),
+            (
+                "auth_activate_resend",
+                "post",
+                None,
+                {"email": "pending@example.com"},
+                False,
+            ),
+            ("auth_activate_resend_done", "get", None, None, False),
+            ("auth_activate", "get", activate, None, False),
+            ("auth_disabled", "get", None, None, False),
+            ("password_reset", "get", None, None, False),
+            (
+                "password_reset",
+                "post",
+                None,
+                {"email": "john@example.com"},
+                False,
+            ),
+            ("password_reset_done", "get", None, None, False),
+            (
+                "password_reset_confirm",
+                "get",
+                {"uidb64": self.uid, "token": self.token},
+                None,
+                False,
+            ),
+            ("password_reset_complete", "get", None, None, False),
+            ("user_profile", "get", None, None, True),
+            ("profile_settings", "get", None, None, True),
+            ("profile_update", "get", None, None, True),
+            (
+                "profile_update",
+                "post",
+                None,
+                data_dicts.PROFILE_UPDATE_FORM["valid"][0],
+                True,
+            ),
+            ("picture_upload", "get", None, None, True),
+            ("picture_upload", "post", None, self.get_picture, True),
+            ("region_update", "get", None, None, True),
+            (
+                "region_update",
+                "post",
+                None,
+                data_dicts.REGION_UPDATE_FORM["valid"][0],
+                True,
+            ),
+            ("email_change", "get", None, None, True),
+            (
+                "email_change",
+                "post",
+                None,
+                data_dicts.EMAIL_CHANGE_FORM["valid"][0],
+                True,
+            ),
+            ("email_change_done", "get", None, None, True),
+            ("email_change_confirm", "get", confirm, None, False),
+            ("email_change_complete", "get", None, None, False),
+            ("password_change", "get", None, None, True),
+            (
+                "password_change",
+                "post",
+                None,
+                data_dicts.PASSWORD_CHANGE_FORM["valid"][0],
+                True,
+            ),
+            ("password_change_done", "get", None, None, True),
+            ("user_list", "get", None, None, False),
+            ("user_detail", "get", {"username": "john"}, None, False),
+            ("metrics", "get", None, None, True),
+        ]
+
+    def get_endpoint_requests(self):
+        """Returns the requests of ``manifest.endpoints`` as tuples of
+        route, method, url kwargs, data and if the user is logged in.
+        """
+        reset = {"uid": self.uid, "token": self.token}
+        activate = {
+            "username": "pending",
+            "token": self.pending.activation_key,
+        }
+        return [
+            (
+                "auth_login_api",
+                "post",
+                None,
+                data_dicts.LOGIN_SERIALIZER["valid"][0],
+                False,
+            ),
+            ("auth_logout_api", "post", None, None, True),
+            (
+                "auth_register_api",
+                "post",
+                None,
+                data_dicts.REGISTER_FORM["valid"][0],
+                False,
+            ),
+            ("auth_activate_api", "post", None, activate, False),
+            (
+                "auth_activate_resend_api",
+                "post",
+                None,
+                {"email": "pending@example.com"},
+                False,
+            ),
+            (
+                "password_reset_api",
+                "post",
+                None,
+                {"email": "john@example.com"},
+                False,
+            ),
+            ("password_reset_verify_api", "post", None, reset, False),
+            (
+                "password_reset_confirm_api",
+                "post",
+                None,
+                dict(reset, new_password1="newpass", new_password2="newpass"),
+                False,
+            ),
+            ("auth_profile_api", "get", None, None, True),
+            ("profile_options_api", "get", None, None, True),
+            ("profile_update_api", "get", None, None, True),
+            (
+                "profile_update_api",
+                "patch",
+                None,
+                {"first_name": "John", "last_name": "Smith"},
+                True,
+            ),
+            ("region_update_api", "get", None, None, True),
+            (
+                "region_update_api",
+                "patch",
+                None,
+                data_dicts.REGION_UPDATE_SERIALIZER["valid"][0],
+                True,
+            ),
+            ("picture_upload_api", "post", None, self.get_picture, True),
+            (
+                "email_change_api",
+                "post",
+                None,
+                data_dicts.EMAIL_CHANGE_SERIALIZER["valid"][0],
+                True,
+            ),
+            (
+                "email_change_confirm_api",
+                "post",
+                None,
+                {
+                    "username": "jane",
+                    "token": self.jane.email_confirmation_key,
+                },
+                False,
+            ),
+            (
+                "password_change_api",
+                "patch",
+                None,
+                data_dicts.PASSWORD_CHANGE_SERIALIZER["valid"][0],
+                True,
+            ),
+            ("user_list_api", "get", None, None, False),
+            ("user_detail_api", "get", {"username": "john"}, None, False),
+        ]
+
+    def run_request(self, client, route, method, kwargs, data, login):
+        """Returns the status code and the queries of a request, which is
+        rolled back afterwards. Caches are cleared so the queries don't
+        depend on the previous requests.
+        """
+        cache.clear()
+        Site.objects.clear_cache()
+        client.logout()
+        url = reverse(route, kwargs=kwargs)
+        options = {}
+        if callable(data):
+            data = data()
+            if isinstance(client, ManifestAPIClient):
+                options["format"] = "multipart"
+        with transaction.atomic():
+            # Logging in updates the last login, which invalidates tokens.
+            if login:
+                client.force_login(self.john)
+            with CaptureQueriesContext(connection) as context:
+                response = getattr(client, method)(url, data=data, **options)
+            transaction.set_rollback(True)
+        return (
+            response.status_code,
+            [query["sql"] for query in context.captured_queries],
+        )
+
+    def get_requests(self):
+        return [
+            (self.client,) + request for request in self.get_view_requests()
+        ] + [
+            (self.api_client,) + request
+            for request in self.get_endpoint_requests()
+        ]
+
+    def test_routes_covered(self):
+        """Every route should be requested and have a budget.
+        """
+        routes = get_route_names("manifest.urls") | get_route_names(
+            "manifest.endpoints"
+        )
+        requested = {request[1] for request in self.get_requests()}
+        self.assertEqual(routes - requested, set())
+        budgeted = {key.split()[0] for key in self.budgets}
+        self.assertEqual(routes - budgeted, set())
+
+    def test_query_budgets(self):
+        """Requests should not run more queries than their budgets.
+        """
+        recorded = {}
+        for client, route, method, kwargs, data, login in self.get_requests():
+            key = "%s %s" % (route, method.upper())
+            status, queries = self.run_request(
+                client, route, method, kwargs, data, login
+            )
+            recorded[key] = {"budget": len(queries), "status": status}
+            if UPDATE_BUDGETS:
+                continue
+            with self.subTest(key):
+                self.assertIn(key, self.budgets)
+                budget = self.budgets[key]
+                self.assertEqual(status, budget["status"])
+                if len(queries) > budget["budget"]:
+                    self.fail(
+                        "%s ran %d queries, budget is %d.\n%s"
+                        % (
+                            key,
+                            len(queries),
+                            budget["budget"],
+                            "\n".join(
+                                "%d. %s" % (number, sql)
+                                for number, sql in enumerate(queries, 1)
+                            ),
+                        )
+                    )
+        if UPDATE_BUDGETS:
+            with open(BUDGETS_PATH, "w") as file:
+                json.dump(recorded, file, indent=2, sort_keys=True)
+                file.write("\n")
+
+
+class QueryInspectorTests(ManifestTestCase):
+    """Tests for :class:`QueryInspector <manifest.queries.QueryInspector>`.
+    """
+
+    def test_operation(self):
+        """Operations should be nested and reset.
+        """
+        self.assertIsNone(queries.get_operation())
+        with queries.operation("UserListView"):
+            self.assertEqual(
+                queries.operation("authenticate")(queries.get_operation)(),
+                "UserListView/authenticate",
+            )
+            self.assertEqual(queries.get_operation(), "UserListView")
+        self.assertIsNone(queries.get_operation())
+
+    def test_slow_query(self):
+        """Slow queries should be logged with the operation and the plan.
+        """
+        with self.defaults(
+            MANIFEST_SLOW_QUERY_MS=0, MANIFEST_SLOW_QUERY_EXPLAIN=True
+        ):
+            with self.assertLogs("manifest.queries", "WARNING") as logs:
+                with queries.inspect_queries("test") as inspector:
+                    get_user_model().objects.activate_user("john", "a" * 40)
+        self.assertEqual(inspector.count, 1)
+        record = logs.records[0]
+        self.assertEqual(record.operation, "activate_user")
+        self.assertEqual(record.label, "test")
+        self.assertIn("manifest_user", record.plan)
+        self.assertIn("Slow query in activate_user of test", logs.output[0])
+
+    def test_count_limit(self):
+        """Crossing the query count limit should be logged once.
+        """
+        manager = get_user_model().objects
+        with self.defaults(MANIFEST_QUERY_COUNT_LIMIT=2):
+            with self.assertLogs("manifest.queries", "WARNING") as logs:
+                with queries.inspect_queries() as inspector:
+                    for _index in range(5):
+                        manager.confirm_email("jane", "a" * 40)
+        self.assertEqual(inspector.count, 5)
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(logs.records[0].operation, "confirm_email")
+        self.assertEqual(logs.records[0].count, 3)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+""" Manifest Renderer Tests
+"""
+
+import datetime
+import decimal
+import uuid
+from unittest import mock
+
+from django.utils.translation import ugettext_lazy as _
+
+from djangorestframework_camel_case.render import (
+    CamelCaseJSONRenderer as LibraryRenderer,
+)
+
+from manifest import renderers
+from manifest.renderers import CamelCaseJSONRenderer
+from tests.base import ManifestTestCase
+
+DATA = {
+    "user_name": "john",
+    "first_name": "John   ü \x1f",
+    "is_active": True,
+    "profile": {"last_login": None, "login_count_2": 3},
+    "date_joined": datetime.datetime(2020, 1, 2, 3, 4, 5, 678912),
+    "last_login": datetime.datetime(2020, 1, 2, tzinfo=datetime.timezone.utc),
+    "birth_date": datetime.date(1980, 1, 2),
+    "key": uuid.UUID("12345678123456781234567812345678"),
+    "groups": ("admin_group", {"group_name": _("Name")}),
+    "big_number": 2 ** 70,
+}
+
+
+class CamelCaseJSONRendererTests(ManifestTestCase):
+    """Tests for :class:`CamelCaseJSONRenderer
+    <manifest.renderers.CamelCaseJSONRenderer>`.
+    """
+
+    def assertSameBytes(self, data, accepted_media_type=None):
+        self.assertEqual(
+            CamelCaseJSONRenderer().render(data, accepted_media_type),
+            LibraryRenderer().render(data, accepted_media_type),
+        )
+
+    def test_render(self):
+        """Rendered bytes should be same as the camel case library.
+        """
+        self.assertSameBytes(DATA)
+        self.assertSameBytes(
+            {key: value for key, value in DATA.items() if key != "big_number"}
+        )
+        self.assertSameBytes([DATA, DATA])
+        self.assertSameBytes(DATA, "application/json; indent=4")
+        self.assertSameBytes(
+            {"float_value": 1e-7, "price": decimal.Decimal(2)}
+        )
+        self.assertSameBytes(None)
+
+    def test_render_without_orjson(self):
+        """Data should be rendered with ``json`` if ``orjson`` is missing.
+        """
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertSameBytes(DATA)
+
+    def test_camelize_key(self):
+        """Keys should be converted once.
+        """
+        renderers.camelize_key.cache_clear()
+        CamelCaseJSONRenderer().render([{"first_name": 1}] * 10)
+        info = renderers.camelize_key.cache_info()
+        self.assertEqual((info.hits, info.misses), (9, 1))
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+""" Manifest User Seeder Tests
+"""
+
+from django.contrib.auth import get_user_model
+
+from manifest.models import Token
+from manifest.seeders import UserSeeder
+from tests.base import ManifestTestCase
+
+
+class UserSeederTests(ManifestTestCase):
+    """Tests for :class:`UserSeeder <manifest.seeders.UserSeeder>`.
+    """
+
+    def test_seed_users(self):
+        """Should create users in states which the managers agree with.
+        """
+        counts = UserSeeder(200, batch_size=64).seed_users()
+        self.assertEqual(sum(counts.values()), 200)
+        self.assertTrue(all(counts.values()))
+        users = get_user_model().objects.filter(username__startswith="user")
+        self.assertEqual(
+            get_user_model().objects.pending_activation().count(),
+            counts["pending"],
+        )
+        self.assertEqual(
+            users.exclude(email_unconfirmed="").count(),
+            counts["email_change"],
+        )
+        self.assertTrue(users.exclude(picture="").exists())
+        user = users.filter(is_active=True).first()
+        self.assertTrue(user.check_password("password"))
+        self.assertEqual(
+            len(get_user_model().objects.delete_expired_users()),
+            counts["expired"],
+        )
+
+    def test_long_activation(self):
+        """Should seed expired users with any activation days.
+        """
+        with self.defaults(MANIFEST_ACTIVATION_DAYS=400):
+            counts = UserSeeder(50).seed_users()
+            self.assertEqual(
+                len(get_user_model().objects.delete_expired_users()),
+                counts["expired"],
+            )
+
+    def test_deterministic(self):
+        """Should generate the same users from the same seed.
+        """
+
+        def generate(seed):
+            return [
+                (user.email, user.first_name, user.activation_key, state)
+                for user, state in UserSeeder(50, seed=seed).iter_users()
+            ]
+
+        self.assertEqual(generate(1), generate(1))
+        self.assertNotEqual(generate(1), generate(2))
+
+    def test_token_table(self):
+        """Keys should be stored as tokens if ``MANIFEST_USE_TOKEN_TABLE``
+        setting is ``True``.
+        """
+        with self.defaults(MANIFEST_USE_TOKEN_TABLE=True):
+            counts = UserSeeder(100, batch_size=30).seed_users()
+            self.assertEqual(
+                get_user_model().objects.pending_activation().count(),
+                counts["pending"],
+            )
+        self.assertEqual(
+            Token.objects.filter(kind=Token.KIND_EMAIL_CONFIRMATION).count(),
+            counts["email_change"],
+        )
+        self.assertFalse(
+            get_user_model()
+            .objects.filter(username__startswith="user")
+            .exclude(email_confirmation_key="")
+            .exists()
+        )
@@ -4,7 +4,13 @@
 
 from django.contrib.auth import get_user_model
 
-from rest_framework.serializers import ModelSerializer, Serializer
+from rest_framework.request import Request
+from rest_framework.serializers import (
+    ModelSerializer,
+    Serializer,
+    SerializerMethodField,
+)
+from rest_framework.test import APIRequestFactory
 
 from manifest import serializers
 from tests import data_dicts
@@ -236,3 +242,57 @@ class PictureUploadSerializerTests(SerializerTestCase, ManifestUploadTestCase):
                 self.data_dicts["invalid_file_extension"]["error"][0]
             ][0]
         )
+
+
+class AuthProfileSerializerTests(ManifestTestCase):
+    """Tests for :class:`AuthProfileSerializer
+    <manifest.serializers.AuthProfileSerializer>`.
+    """
+
+    fixtures = ["test"]
+
+    def test_avatar_fields(self):
+        """Requested ``avatar`` should only load the fields it reads.
+        """
+        request = Request(APIRequestFactory().get("/", {"fields": "avatar"}))
+        fields = serializers.AuthProfileSerializer.get_model_fields(request)
+        self.assertEqual(fields, ["email", "id", "picture"])
+        user = get_user_model().objects.only(*fields).get(username="john")
+        self.assertIn("first_name", user.get_deferred_fields())
+        with self.assertNumQueries(0):
+            data = serializers.AuthProfileSerializer(
+                user, context={"request": request}
+            ).data
+        self.assertEqual(list(data), ["avatar"])
+        self.assertEqual(data["avatar"], user.avatar)
+
+
+class ValuesListSerializerTests(ManifestTestCase):
+    """Tests for :class:`ValuesListSerializer
+    <manifest.serializers.ValuesListSerializer>`.
+    """
+
+    def test_values(self):
+        """Rows of ``values()`` should serialize same as model instances.
+        """
+        queryset = get_user_model().objects.order_by("pk")
+        serializer = serializers.UserSerializer(many=True)
+        columns = serializer.get_columns()
+        self.assertEqual(
+            serializers.UserSerializer(
+                queryset.values(*columns), many=True
+            ).data,
+            serializers.UserSerializer(queryset, many=True).data,
+        )
+
+    def test_columns(self):
+        """Fields which are not model fields should disable the values.
+        """
+
+        class AvatarSerializer(serializers.UserSerializer):
+            avatar = SerializerMethodField()
+
+            class Meta(serializers.UserSerializer.Meta):
+                fields = ("username", "avatar")
+
+        self.assertIsNone(AvatarSerializer(many=True).get_columns())
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+""" Manifest Storage Tests
+"""
+
+import os
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+
+from manifest.storage import CachedStorage, LocalCache
+from tests.base import ManifestTestCase
+
+
+class CountingStorage(FileSystemStorage):
+    """Local stand-in for a remote storage which counts the reads.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.reads = 0
+        super().__init__(*args, **kwargs)
+
+    def _open(self, name, mode="rb"):
+        self.reads += 1
+        return super()._open(name, mode)
+
+
+class CachedStorageTests(ManifestTestCase):
+    """Tests for :class:`CachedStorage <manifest.storage.CachedStorage>`.
+    """
+
+    def setUp(self):
+        self.backend = CountingStorage(location=tempfile.mkdtemp())
+        self.cache_dir = tempfile.mkdtemp()
+        self.storage = CachedStorage(
+            storage=self.backend, location=self.cache_dir, max_size=1024
+        )
+        super().setUp()
+
+    def read(self, name):
+        with self.storage.open(name) as file:
+            return file.read()
+
+    def test_cached_read(self):
+        """Repeated reads should hit the wrapped storage only once.
+        """
+        name = self.storage.save("picture.png", ContentFile(b"picture"))
+        self.assertEqual(self.read(name), b"picture")
+        self.assertEqual(self.read(name), b"picture")
+        self.assertEqual(self.backend.reads, 1)
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.storage.size(name), len(b"picture"))
+
+    def test_save_and_delete_invalidate(self):
+        """Saving or deleting a file should drop its cached copy.
+        """
+        name = self.storage.save("picture.png", ContentFile(b"old"))
+        self.read(name)
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        name = self.storage.save(name, ContentFile(b"new"))
+        self.assertEqual(self.read(name), b"new")
+        self.assertEqual(self.backend.reads, 2)
+
+    def test_eviction(self):
+        """Least recently used files should be evicted first.
+        """
+        names = [
+            self.storage.save("%s.png" % key, ContentFile(b"x" * 400))
+            for key in ("a", "b", "c")
+        ]
+        self.read(names[0])
+        self.read(names[1])
+        # Touch the first one, so the second is least recently used.
+        self.read(names[0])
+        self.read(names[2])
+        self.assertIn(names[0], self.storage.cache)
+        self.assertNotIn(names[1], self.storage.cache)
+        self.assertIn(names[2], self.storage.cache)
+        self.assertLessEqual(self.storage.cache.size, 1024)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_too_large(self):
+        """Files larger than the cache should be read from the storage.
+        """
+        name = self.storage.save("large.png", ContentFile(b"x" * 2048))
+        self.assertEqual(len(self.read(name)), 2048)
+        self.assertEqual(len(self.read(name)), 2048)
+        self.assertNotIn(name, self.storage.cache)
+        # No temporary files should be left behind.
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_reload(self):
+        """A new cache should be warm with the files already on disk.
+        """
+        name = self.storage.save("picture.png", ContentFile(b"picture"))
+        self.read(name)
+        # Simulate an interrupted write.
+        open(os.path.join(self.cache_dir, LocalCache.temp_prefix), "w").close()
+        cache = LocalCache(self.cache_dir, 1024)
+        self.assertIn(name, cache)
+        self.assertEqual(cache.size, len(b"picture"))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_without_cache(self):
+        """Should proxy the default storage if no cache is configured.
+        """
+        with self.defaults(
+            MANIFEST_PICTURE_STORAGE=None, MANIFEST_STORAGE_CACHE_DIR=None
+        ):
+            storage = CachedStorage()
+            self.assertIsNone(storage.cache)
+            self.assertIs(storage.storage, default_storage)
+            self.assertEqual(
+                storage.url("a.png"), default_storage.url("a.png")
+            )
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+""" Manifest Timing Tests
+"""
+
+from django.contrib.auth import get_user_model
+
+from manifest import timing
+from tests.base import ManifestTestCase
+
+
+class TimingTests(ManifestTestCase):
+    """Tests for :mod:`manifest.timing`.
+    """
+
+    fixtures = ["test"]
+
+    def test_not_started(self):
+        """Phases should not be timed if timing is not started.
+        """
+        self.assertIsNone(timing.get_timings())
+        with timing.timed("db") as timer:
+            self.assertIsNone(timer.timings)
+        self.assertIsNone(timing.get_timings())
+
+    def test_timed(self):
+        """Phases should be timed by context managers and decorators.
+        """
+        token = timing.start()
+        try:
+            with timing.timed("db"):
+                pass
+            timing.timed("email")(lambda: None)()
+            timing.timed("email")(lambda: None)()
+        finally:
+            timings = timing.stop(token)
+        self.assertIsNone(timing.get_timings())
+        self.assertEqual(timings.counts, {"db": 1, "email": 2})
+        self.assertEqual(list(timings.as_dict()), ["db", "email"])
+
+    def test_nested(self):
+        """Nested phases with the same name should be timed once.
+        """
+        token = timing.start()
+        try:
+            with timing.timed("hash"):
+                with timing.timed("hash"):
+                    pass
+        finally:
+            timings = timing.stop(token)
+        self.assertEqual(timings.counts, {"hash": 1})
+
+    def test_check_password(self):
+        """Password checks of users should be timed as hashing.
+        """
+        user = get_user_model().objects.get(username="john")
+        token = timing.start()
+        try:
+            self.assertTrue(user.check_password("pass"))
+        finally:
+            timings = timing.stop(token)
+        self.assertEqual(timings.counts, {"hash": 1})
+
+    def test_as_header(self):
+        """Header should list the phases in order with the total.
+        """
+        timings = timing.Timings()
+        timings.add("storage", 0.002)
+        timings.add("db", 0.0015)
+        self.assertEqual(
+            timings.as_header(0.01),
+            'db;dur=1.50;desc="Database", '
+            'storage;dur=2.00;desc="Storage", '
+            'total;dur=10.00;desc="Total"',
+        )
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+""" Manifest Signed Token Tests
+"""
+
+import re
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.urls import reverse
+
+from manifest.tokens import (
+    activation_token_generator,
+    email_confirmation_token_generator,
+)
+from tests import data_dicts
+from tests.base import ManifestTestCase
+
+
+class SignedTokenTests(ManifestTestCase):
+    """Tests for :mod:`manifest.tokens` signed tokens.
+    """
+
+    user_info = {
+        "username": "foo",
+        "password": "bar",
+        "email": "foo@example.com",
+    }
+
+    def create_user(self):
+        with self.defaults(MANIFEST_SIGNED_TOKENS=True):
+            return get_user_model().objects.create_user(**self.user_info)
+
+    def test_create_user(self):
+        """No activation key should be stored at registration.
+        """
+        user = self.create_user()
+        saved_user = get_user_model().objects.get(pk=user.pk)
+        self.assertEqual(saved_user.activation_key, "")
+        self.assertTrue(
+            activation_token_generator.check_token(
+                saved_user, user.activation_key
+            )
+        )
+
+    def test_invalid_token(self):
+        """Forged tokens should be rejected without a database query.
+        """
+        user = self.create_user()
+        timestamp, state, signature = user.activation_key.split("_")
+        with self.defaults(MANIFEST_SIGNED_TOKENS=True):
+            for token in (
+                "invalid",
+                "_".join([timestamp, state, signature[::-1]]),
+                "_".join(["1", state, signature]),
+                user.activation_key,
+            ):
+                with self.assertNumQueries(0):
+                    self.assertFalse(
+                        get_user_model().objects.activate_user("bar", token)
+                    )
+
+    def test_expired_token(self):
+        """Tokens should expire after ``MANIFEST_ACTIVATION_DAYS``.
+        """
+        user = self.create_user()
+        timestamp = activation_token_generator.get_timestamp()
+        # pylint: disable=bad-continuation
+        with mock.patch.object(
+            activation_token_generator,
+            "get_timestamp",
+            return_value=timestamp + activation_token_generator.get_timeout(),
+        ):
+            self.assertFalse(
+                activation_token_generator.check_signature(
+                    user.username, user.activation_key
+                )
+            )
+
+    def test_activation(self):
+        """A token should activate the user only once.
+        """
+        user = self.create_user()
+        with self.defaults(MANIFEST_SIGNED_TOKENS=True):
+            self.assertTrue(
+                get_user_model().objects.activate_user(
+                    user.username, user.activation_key
+                )
+            )
+            self.assertFalse(
+                get_user_model().objects.activate_user(
+                    user.username, user.activation_key
+                )
+            )
+
+    def test_activation_view(self):
+        """Activation link in the email should activate the user.
+        """
+        form_data = data_dicts.REGISTER_FORM["valid"][0]
+        with self.defaults(MANIFEST_SIGNED_TOKENS=True):
+            self.client.post(reverse("auth_register"), data=form_data)
+            user = get_user_model().objects.get(email=form_data["email"])
+            token = re.search(
+                r"/activate/\w+/(\w+)/", mail.outbox[0].body
+            ).group(1)
+            response = self.client.get(
+                reverse(
+                    "auth_activate",
+                    kwargs={"username": user.username, "token": token},
+                )
+            )
+        self.assertRedirects(response, reverse("profile_settings"))
+        self.assertTrue(get_user_model().objects.get(pk=user.pk).is_active)
+
+    def test_email_confirmation(self):
+        """A token should confirm the email only once.
+        """
+        with self.defaults(MANIFEST_SIGNED_TOKENS=True):
+            user = get_user_model().objects.get(pk=1)
+            user.change_email("john@newexample.com")
+            self.assertEqual(
+                get_user_model().objects.get(pk=1).email_confirmation_key, ""
+            )
+            token = user.email_confirmation_key
+            self.assertTrue(
+                email_confirmation_token_generator.check_token(
+                    get_user_model().objects.get(pk=1), token
+                )
+            )
+            user = get_user_model().objects.confirm_email("john", token)
+            self.assertEqual(user.email, "john@newexample.com")
+            self.assertFalse(
+                get_user_model().objects.confirm_email("john", token)
+            )
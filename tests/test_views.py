@@ -9,6 +9,7 @@ from django.contrib.auth.forms import (
     SetPasswordForm,
 )
 from django.core import mail
+from django.core.cache import cache
 from django.test import override_settings
 from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
@@ -229,6 +230,59 @@ class AuthActivateViewTests(ManifestTestCase):
         self.assertRedirects(response, TEST_SUCCESS_URL)
 
 
+class AuthActivateResendViewTests(ManifestTestCase):
+    """Tests for :class:`AuthActivateResendView
+    <manifest.views.AuthActivateResendView>`.
+    """
+
+    form_data = data_dicts.REGISTER_FORM["valid"][0]
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client.post(reverse("auth_register"), data=self.form_data)
+        mail.outbox = []
+
+    def test_auth_activate_resend_view(self):
+        """A ``GET`` to the view should render the correct form.
+        """
+        response = self.client.get(reverse("auth_activate_resend"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "manifest/auth_activate_resend.html")
+        self.assertIsInstance(
+            response.context["form"], forms.ActivateResendForm
+        )
+
+    def test_auth_activate_resend_coalesced(self):
+        """Repeated ``POST`` requests in the cooldown should send one email.
+        """
+        for _i in range(3):
+            response = self.client.post(
+                reverse("auth_activate_resend"),
+                data={"email": self.form_data["email"].upper()},
+            )
+            self.assertRedirects(
+                response, reverse("auth_activate_resend_done")
+            )
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.form_data["email"]])
+        cache.clear()
+        self.client.post(
+            reverse("auth_activate_resend"),
+            data={"email": self.form_data["email"]},
+        )
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_auth_activate_resend_active(self):
+        """Active accounts should not get an activation email.
+        """
+        response = self.client.post(
+            reverse("auth_activate_resend"), data={"email": "john@example.com"}
+        )
+        self.assertRedirects(response, reverse("auth_activate_resend_done"))
+        self.assertEqual(len(mail.outbox), 0)
+
+
 class PasswordResetTests(ManifestTestCase):
     """Tests for :class:`PasswordResetView
     <manifest.views.PasswordResetView>`.
@@ -798,3 +852,43 @@ class UserDetailViewTests(ManifestTestCase):
                 reverse("user_detail", kwargs={"username": "john"})
             )
             self.assertEqual(response.status_code, 404)
+
+
+class MetricsViewTests(ManifestTestCase):
+    """Tests for :class:`MetricsView <manifest.views.MetricsView>`.
+    """
+
+    def test_metrics_view(self):
+        """A ``GET`` to the view should return the metrics to staff users.
+        """
+        with self.defaults(MANIFEST_METRICS_VIEW=True):
+            self.client.login(username="john", password="pass")
+            response = self.client.get(reverse("metrics"))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response["Content-Type"],
+                "text/plain; version=0.0.4; charset=utf-8",
+            )
+            self.assertContains(
+                response, 'manifest_logins_total{outcome="success"}'
+            )
+
+    def test_metrics_not_staff(self):
+        """A ``GET`` to the view should return ``403`` if the user is not a
+        staff member.
+        """
+        with self.defaults(MANIFEST_METRICS_VIEW=True):
+            response = self.client.get(reverse("metrics"))
+            self.assertEqual(response.status_code, 403)
+            self.client.login(username="jane", password="pass")
+            response = self.client.get(reverse("metrics"))
+            self.assertEqual(response.status_code, 403)
+
+    def test_metrics_disabled(self):
+        """A ``GET`` to the view should return ``404`` if
+        ``MANIFEST_METRICS_VIEW`` setting is ``False``.
+        """
+        with self.defaults(MANIFEST_METRICS_VIEW=False):
+            self.client.login(username="john", password="pass")
+            response = self.client.get(reverse("metrics"))
+            self.assertEqual(response.status_code, 404)